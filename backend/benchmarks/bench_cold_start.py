@@ -0,0 +1,164 @@
+"""
+Benchmark de cold start por handler.
+
+Para cada función declarada en serverless.yml lanza un intérprete nuevo
+(como un contenedor Lambda recién creado) y mide:
+  - import_ms: tiempo de importar el módulo del handler
+  - invoke_ms: tiempo de la primera invocación (con --invoke), que incluye
+               la creación perezosa de los clientes de AWS
+
+Sin --invoke no se hace ninguna llamada de red. Con --invoke conviene apuntar
+a un stand-in local (DynamoDB Local, moto, LocalStack) con --endpoint-url;
+los errores de la llamada se reportan pero el tiempo se mide igual.
+
+Uso (desde backend/):
+    python benchmarks/bench_cold_start.py [--runs 5] [--invoke] [--endpoint-url http://localhost:8000] [--json]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Variables que el código lee al importar (valores de prueba)
+BENCH_ENV = {
+    "TENANTS_TABLE": "bench-Tenants",
+    "MENU_TABLE": "bench-MenuItems",
+    "ORDERS_TABLE": "bench-Orders",
+    "ORDER_EVENTS_TABLE": "bench-OrderEvents",
+    "DASHBOARD_TABLE": "bench-DashboardRollups",
+    "DASHBOARD_APPLIED_TABLE": "bench-DashboardApplied",
+    "CONNECTIONS_TABLE": "bench-WebSocketConnections",
+    "IDEMPOTENCY_TABLE": "bench-IdempotencyKeys",
+    "ORDERS_ARCHIVE_TABLE": "bench-OrdersArchive",
+    "EVENTS_BUS_NAME": "bench-pardos-orders-bus",
+    "REPORTS_BUCKET": "bench-pardos-orders-reports",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "bench",
+    "AWS_SECRET_ACCESS_KEY": "bench",
+}
+
+API_EVENT = {
+    "pathParameters": {"tenantId": "pardos-chicken", "orderId": "bench-order"},
+    "queryStringParameters": {},
+    "headers": {},
+    "body": json.dumps({
+        "items": [{"product_id": "p1", "name": "Pollo Entero", "quantity": 1}],
+        "name": "Pollo Entero",
+        "price": 62.9,
+        "status": "COOKING",
+    }),
+}
+WORKFLOW_EVENT = {"tenant_id": "pardos-chicken", "order_id": "bench-order", "known_status": "RECEIVED", "task_token": "bench"}
+RECORDS_EVENT = {"Records": []}
+
+CHILD = r"""
+import importlib, json, sys, time
+module_name, function_name, event = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+invoke = sys.argv[4] == "1"
+result = {}
+start = time.perf_counter()
+module = importlib.import_module(module_name)
+result["import_ms"] = (time.perf_counter() - start) * 1000
+if invoke:
+    start = time.perf_counter()
+    try:
+        getattr(module, function_name)(event, None)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"[:200]
+    result["invoke_ms"] = (time.perf_counter() - start) * 1000
+print(json.dumps(result))
+"""
+
+
+def load_handlers():
+    """Lee los handlers (no comentados) de serverless.yml: [(nombre, módulo, función)]."""
+    with open(os.path.join(SRC_DIR, "serverless.yml"), encoding="utf-8") as f:
+        text = f.read()
+    handlers = []
+    for name, path in re.findall(r"^  (\w+):\n    handler: ([\w/]+\.\w+)", text, re.M):
+        module_path, function_name = path.rsplit(".", 1)
+        handlers.append((name, module_path.replace("/", "."), function_name))
+    return handlers
+
+
+# Handlers que no son endpoints HTTP: evento de ejemplo por módulo
+SAMPLE_EVENTS = {
+    "ms_orders.publish_outbox": RECORDS_EVENT,
+    "ms_orders.backfill_order_indexes": {},
+    "ms_orders.migrate_order_shards": {},
+    "ms_notifications.send_email_batch": RECORDS_EVENT,
+    "ms_workflow.update_dashboard_rollup": RECORDS_EVENT,
+    "ms_workflow.check_order_status": WORKFLOW_EVENT,
+    "ms_workflow.calculate_order_metrics": WORKFLOW_EVENT,
+    "ms_workflow.await_order_status": WORKFLOW_EVENT,
+    "ms_workflow.export_daily_report": {"tenant_ids": ["pardos-chicken"]},
+    "ms_realtime.ws_connect": {"requestContext": {"connectionId": "bench"}, "queryStringParameters": {"tenantId": "pardos-chicken"}},
+    "ms_realtime.ws_disconnect": {"requestContext": {"connectionId": "bench"}},
+    "ms_realtime.push_order_updates": {"detail-type": "order.updated", "detail": {"tenant_id": "pardos-chicken", "order_id": "bench-order"}},
+}
+
+
+def sample_event(module_name):
+    return SAMPLE_EVENTS.get(module_name, API_EVENT)
+
+
+def measure(module_name, function_name, invoke, env):
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, module_name, function_name,
+         json.dumps(sample_event(module_name)), "1" if invoke else "0"],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ["unknown error"])[-1]}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="procesos nuevos por handler")
+    parser.add_argument("--invoke", action="store_true", help="medir también la primera invocación")
+    parser.add_argument("--endpoint-url", help="endpoint local para todos los servicios (AWS_ENDPOINT_URL)")
+    parser.add_argument("--only", help="filtrar handlers por nombre (substring)")
+    parser.add_argument("--json", action="store_true", help="salida JSON para seguimiento")
+    args = parser.parse_args()
+
+    env = {**os.environ, **BENCH_ENV, "PYTHONDONTWRITEBYTECODE": "1"}
+    if args.endpoint_url:
+        env["AWS_ENDPOINT_URL"] = args.endpoint_url
+        env["STEPFUNCTIONS_ENDPOINT"] = args.endpoint_url
+
+    results = []
+    for name, module_name, function_name in load_handlers():
+        if args.only and args.only not in name:
+            continue
+        runs = [measure(module_name, function_name, args.invoke, env) for _ in range(args.runs)]
+        ok = [r for r in runs if "import_ms" in r]
+        row = {"function": name, "module": module_name}
+        if ok:
+            row["import_ms"] = round(statistics.median(r["import_ms"] for r in ok), 1)
+            if args.invoke:
+                row["invoke_ms"] = round(statistics.median(r["invoke_ms"] for r in ok), 1)
+        errors = [r["error"] for r in runs if "error" in r]
+        if errors:
+            row["error"] = errors[-1]
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'función':<24} {'import (ms)':>12} {'1ª invocación (ms)':>20}  error")
+    for row in results:
+        invoke_ms = f"{row['invoke_ms']:.1f}" if "invoke_ms" in row else "-"
+        import_ms = f"{row['import_ms']:.1f}" if "import_ms" in row else "-"
+        print(f"{row['function']:<24} {import_ms:>12} {invoke_ms:>20}  {row.get('error', '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+"""
+Benchmark de carga de extremo a extremo.
+
+Llama a los handlers en proceso (los mismos de serverless.yml) contra un
+stand-in local de DynamoDB y EventBridge:
+  - por defecto moto en memoria:  pip install "moto[dynamodb,events]"
+  - con --endpoint-url, un LocalStack (u otro emulador con ambos servicios)
+
+Las tablas se crean a partir de la sección resources de serverless.yml
+(requiere PyYAML), así el esquema y los índices son los del deploy.
+
+Fases:
+  1. setup:  tenants, menús y agregados del dashboard (putMenuItemsBatch /
+             putMenuItem, seedDashboardRollups como después del deploy)
+  2. write:  órdenes con transiciones realistas (createOrder, updateOrderStep)
+             y los consumidores asíncronos (updateDashboardRollup por evento,
+             publishOrderOutbox desde el stream de OrderEvents)
+  3. read:   mezcla de lecturas de las apps (menú, órdenes, métricas,
+             dashboard), incluidas revalidaciones con If-None-Match
+
+Por endpoint reporta p50/p95/p99 de latencia, items leídos y escritos en
+DynamoDB por request y tamaño de la respuesta.
+
+Uso (desde backend/):
+    python benchmarks/bench_load.py [--tenants 3] [--orders 10000] [--reads 5000] [--seed 7] [--json]
+    python benchmarks/bench_load.py --endpoint-url http://localhost:4566
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_cold_start import BENCH_ENV, SRC_DIR, load_handlers  # noqa: E402
+
+CATEGORIES = ["Pollos", "Parrillas", "Entradas", "Ensaladas", "Bebidas", "Postres"]
+STATUSES = ["RECEIVED", "COOKING", "PACKING", "DELIVERING", "DELIVERED"]
+# Estado final de cada orden al terminar la fase de escritura
+FINAL_STATUS_WEIGHTS = {"RECEIVED": 5, "COOKING": 7, "PACKING": 5, "DELIVERING": 8, "DELIVERED": 75}
+ROLES = {
+    "COOKING": "KITCHEN_STAFF",
+    "PACKING": "PACKER",
+    "DELIVERING": "DELIVERY_DRIVER",
+    "DELIVERED": "DELIVERY_DRIVER",
+}
+# Mezcla de la fase de lectura (peso relativo)
+READ_MIX = {
+    "getOrderMetrics": 30,
+    "getOrderMetrics (304)": 20,
+    "getOrder": 15,
+    "getDashboardSummary": 10,
+    "listOrders": 8,
+    "listOrders ?status": 7,
+    "getMenu": 4,
+    "getMenu (304)": 5,
+    "getTenants": 1,
+}
+STREAM_BATCH_SIZE = 100  # batchSize de publishOrderOutbox en serverless.yml
+
+
+# ---------------------------------------------------------------- medición
+
+class Recorder:
+    """
+    Cuenta lo que hace DynamoDB durante cada request con los eventos de
+    botocore de la sesión por defecto (la que usa common.aws).
+    """
+
+    WRITE_OPS = {"PutItem": 1, "UpdateItem": 1, "DeleteItem": 1}
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+        self._reads = 0
+        self._writes = 0
+        self._calls = 0
+
+    def install(self, session):
+        session.events.register("provide-client-params.dynamodb", self._on_params)
+        session.events.register("after-call.dynamodb", self._on_response)
+
+    def _on_params(self, params, model, **kwargs):
+        if model.name in self.WRITE_OPS:
+            writes = 1
+        elif model.name == "BatchWriteItem":
+            writes = sum(len(requests) for requests in params.get("RequestItems", {}).values())
+        elif model.name == "TransactWriteItems":
+            writes = len(params.get("TransactItems", []))
+        else:
+            writes = 0
+        with self._lock:
+            self._calls += 1
+            self._writes += writes
+
+    def _on_response(self, parsed, model, **kwargs):
+        if model.name == "GetItem":
+            reads = 1 if "Item" in parsed else 0
+        elif model.name in ("Query", "Scan"):
+            reads = parsed.get("Count", 0)
+        elif model.name == "BatchGetItem":
+            reads = sum(len(items) for items in parsed.get("Responses", {}).values())
+        elif model.name == "TransactGetItems":
+            reads = sum(1 for r in parsed.get("Responses", []) if r.get("Item"))
+        else:
+            reads = 0
+        unprocessed = parsed.get("UnprocessedItems") or {}
+        with self._lock:
+            self._reads += reads
+            self._writes -= sum(len(requests) for requests in unprocessed.values())
+
+    def call(self, label, fn, event):
+        with self._lock:
+            self._reads = self._writes = self._calls = 0
+        start = time.perf_counter()
+        error = None
+        try:
+            result = fn(event, None)
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        body = (result or {}).get("body") if isinstance(result, dict) else None
+        status = (result or {}).get("statusCode") if isinstance(result, dict) else None
+        with self._lock:
+            self.samples[label].append({
+                "ms": elapsed_ms,
+                "reads": self._reads,
+                "writes": self._writes,
+                "calls": self._calls,
+                "bytes": len(body.encode("utf-8")) if isinstance(body, str) else 0,
+                "status": status,
+                "error": error,
+            })
+        if error:
+            print(f"  {label}: {error}", file=sys.stderr)
+        return result
+
+
+def percentile(sorted_values, p):
+    """Percentil por rango más cercano."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples):
+    rows = []
+    for label, runs in samples.items():
+        latencies = sorted(r["ms"] for r in runs)
+        n = len(runs)
+        rows.append({
+            "endpoint": label,
+            "requests": n,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2),
+            "reads_per_req": round(sum(r["reads"] for r in runs) / n, 2),
+            "writes_per_req": round(sum(r["writes"] for r in runs) / n, 2),
+            "ddb_calls_per_req": round(sum(r["calls"] for r in runs) / n, 2),
+            "avg_bytes": round(sum(r["bytes"] for r in runs) / n),
+            "max_bytes": max(r["bytes"] for r in runs),
+            "errors": sum(1 for r in runs if r["error"] or (r["status"] or 200) >= 500),
+        })
+    return rows
+
+
+# ---------------------------------------------------------------- stand-in
+
+# Condiciones de serverless.yml que usan las tablas, con su valor por defecto
+TABLE_CONDITIONS = {"OrdersShardCreatedIndex": True}
+
+
+def resolve_conditions(value):
+    """Aplica Fn::If con TABLE_CONDITIONS y quita los AWS::NoValue."""
+    if isinstance(value, list):
+        resolved = [resolve_conditions(v) for v in value]
+        return [v for v in resolved if v is not None]
+    if isinstance(value, dict):
+        if "Fn::If" in value:
+            condition, if_true, if_false = value["Fn::If"]
+            return resolve_conditions(if_true if TABLE_CONDITIONS[condition] else if_false)
+        if value == {"Ref": "AWS::NoValue"}:
+            return None
+        return {k: resolve_conditions(v) for k, v in value.items()}
+    return value
+
+
+def table_definitions():
+    """Parámetros de create_table para cada AWS::DynamoDB::Table de serverless.yml."""
+    import yaml
+
+    class Loader(yaml.SafeLoader):
+        pass
+
+    # !Ref, !GetAtt, ... no hacen falta para las tablas
+    Loader.add_multi_constructor("!", lambda loader, suffix, node: None)
+
+    with open(os.path.join(SRC_DIR, "serverless.yml"), encoding="utf-8") as f:
+        doc = yaml.load(f, Loader=Loader)
+
+    for resource in doc["resources"]["Resources"].values():
+        if resource.get("Type") != "AWS::DynamoDB::Table":
+            continue
+        props = resolve_conditions(resource["Properties"])
+        env_name = re.search(r"environment\.(\w+)", props["TableName"]).group(1)
+        definition = {
+            "TableName": os.environ[env_name],
+            "AttributeDefinitions": props["AttributeDefinitions"],
+            "KeySchema": props["KeySchema"],
+            "BillingMode": props.get("BillingMode", "PAY_PER_REQUEST"),
+        }
+        if props.get("GlobalSecondaryIndexes"):
+            definition["GlobalSecondaryIndexes"] = props["GlobalSecondaryIndexes"]
+        if props.get("StreamSpecification"):
+            definition["StreamSpecification"] = {
+                "StreamEnabled": True,
+                "StreamViewType": props["StreamSpecification"]["StreamViewType"],
+            }
+        yield definition
+
+
+def create_stand_in():
+    from common.aws import client
+
+    dynamodb = client("dynamodb")
+    existing = set(dynamodb.list_tables().get("TableNames", []))
+    for definition in table_definitions():
+        if definition["TableName"] in existing:
+            dynamodb.delete_table(TableName=definition["TableName"])
+            dynamodb.get_waiter("table_not_exists").wait(TableName=definition["TableName"])
+        dynamodb.create_table(**definition)
+        dynamodb.get_waiter("table_exists").wait(TableName=definition["TableName"])
+
+    events = client("events")
+    try:
+        events.create_event_bus(Name=os.environ["EVENTS_BUS_NAME"])
+    except events.exceptions.ResourceAlreadyExistsException:
+        pass
+
+
+class StreamReader:
+    """Lee el stream de una tabla del stand-in y lo entrega en lotes como Lambda."""
+
+    def __init__(self, table_name):
+        import boto3
+
+        self.streams = boto3.client("dynamodbstreams")
+        stream_arn = boto3.client("dynamodb").describe_table(TableName=table_name)["Table"]["LatestStreamArn"]
+        shards = self.streams.describe_stream(StreamArn=stream_arn)["StreamDescription"]["Shards"]
+        self.iterators = [
+            self.streams.get_shard_iterator(
+                StreamArn=stream_arn, ShardId=shard["ShardId"], ShardIteratorType="TRIM_HORIZON"
+            )["ShardIterator"]
+            for shard in shards
+        ]
+
+    def batches(self, size):
+        for iterator in self.iterators:
+            while iterator:
+                resp = self.streams.get_records(ShardIterator=iterator, Limit=size)
+                records = resp.get("Records", [])
+                if not records:
+                    break
+                yield records
+                iterator = resp.get("NextShardIterator")
+
+
+# ---------------------------------------------------------------- escenario
+
+def api_event(tenant_id, order_id=None, body=None, query=None, headers=None):
+    path_params = {"tenantId": tenant_id}
+    if order_id:
+        path_params["orderId"] = order_id
+    return {
+        "pathParameters": path_params,
+        "queryStringParameters": query or {},
+        "headers": headers or {},
+        "body": json.dumps(body) if body is not None else None,
+    }
+
+
+def bus_event(detail_type, detail):
+    return {"detail-type": detail_type, "source": "pardos.orders", "detail": detail}
+
+
+def synthetic_menu(rng, count):
+    items = []
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        items.append({
+            "name": f"{category} {i:03d}",
+            # Como string: boto3 no acepta float (los handlers lo pasan a Decimal)
+            "price": f"{rng.uniform(5, 90):.2f}",
+            "category": category,
+            "description": "x" * rng.randint(20, 160),
+            "image_url": f"https://images.example.com/{i}.jpg",
+        })
+    return items
+
+
+class Scenario:
+    def __init__(self, args, handlers, recorder):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.handlers = handlers
+        self.recorder = recorder
+        self.tenants = [f"bench-tenant-{i}" for i in range(args.tenants)]
+        self.menus = {}
+        self.orders = []        # (tenant_id, order_id)
+        self.etags = {}         # (tenant_id, order_id) -> ETag de metrics
+        self.menu_etags = {}
+
+    def call(self, label, function_name, event):
+        return self.recorder.call(label, self.handlers[function_name], event)
+
+    def setup(self):
+        from common.db import tenants_table
+
+        for tenant_id in self.tenants:
+            tenants_table().put_item(Item={"tenant_id": tenant_id, "name": tenant_id, "active": True})
+            menu = synthetic_menu(self.rng, self.args.menu_items)
+            result = self.call("putMenuItemsBatch", "putMenuItemsBatch",
+                               api_event(tenant_id, body={"items": menu}))
+            written = json.loads(result["body"])["results"] if result else []
+            self.menus[tenant_id] = [
+                {**item, "product_id": r["product_id"]} for item, r in zip(menu, written)
+            ]
+            for item in menu[:3]:
+                self.call("putMenuItem", "putMenuItem", api_event(tenant_id, body=item))
+        if not all(self.menus.values()):
+            sys.exit("setup: putMenuItemsBatch no creó items de menú (ver los errores arriba)")
+        # Registros del dashboard creados antes de los eventos (como después del deploy)
+        self.call("seedDashboardRollups", "seedDashboardRollups", {"tenant_ids": self.tenants})
+
+    def _create_order(self):
+        tenant_id = self.rng.choice(self.tenants)
+        lines = self.rng.sample(self.menus[tenant_id], k=self.rng.randint(1, 4))
+        body = {
+            "items": [
+                {"product_id": i["product_id"], "name": i["name"], "price": i["price"],
+                 "quantity": self.rng.randint(1, 3)}
+                for i in lines
+            ],
+            "customer_name": f"Cliente {self.rng.randint(1, 99999)}",
+            "customer_address": "Av. Siempre Viva 742",
+            "customer_phone": "999999999",
+            "customer_email": "",
+        }
+        result = self.call("createOrder", "createOrder", api_event(tenant_id, body=body))
+        if not result or result.get("statusCode") != 201:
+            return None
+        order_id = json.loads(result["body"])["order_id"]
+        self.orders.append((tenant_id, order_id))
+        self.call("updateDashboardRollup (event)", "updateDashboardRollup", bus_event(
+            "order.created", {"tenant_id": tenant_id, "order_id": order_id, "status": "RECEIVED"}
+        ))
+        target = self.rng.choices(list(FINAL_STATUS_WEIGHTS), weights=FINAL_STATUS_WEIGHTS.values())[0]
+        return {"tenant_id": tenant_id, "order_id": order_id, "status": "RECEIVED", "target": target}
+
+    def _advance(self, order):
+        next_status = STATUSES[STATUSES.index(order["status"]) + 1]
+        result = self.call("updateOrderStep", "updateOrderStep", api_event(
+            order["tenant_id"], order["order_id"],
+            body={"status": next_status, "attended_by": "bench", "role": ROLES[next_status]},
+        ))
+        if not result or result.get("statusCode") != 200:
+            order["target"] = order["status"]  # No insistir con esta orden
+            return
+        self.call("updateDashboardRollup (event)", "updateDashboardRollup", bus_event("order.updated", {
+            "tenant_id": order["tenant_id"], "order_id": order["order_id"],
+            "status": next_status, "previous_status": order["status"],
+        }))
+        order["status"] = next_status
+
+    def write(self):
+        """Crea órdenes y avanza órdenes activas al azar entre creaciones."""
+        active = []
+        for created in range(self.args.orders):
+            order = self._create_order()
+            if order and order["target"] != order["status"]:
+                active.append(order)
+            for _ in range(self.rng.randint(0, 6)):
+                if not active:
+                    break
+                order = active[self.rng.randrange(len(active))]
+                self._advance(order)
+                if order["status"] == order["target"]:
+                    active.remove(order)
+            if (created + 1) % 1000 == 0:
+                print(f"  {created + 1} órdenes creadas", file=sys.stderr)
+
+        while active:
+            order = active.pop()
+            while order["status"] != order["target"]:
+                self._advance(order)
+
+        if not self.orders:
+            sys.exit("write: createOrder no creó ninguna orden (ver los errores arriba)")
+
+    def drain_outbox(self):
+        try:
+            reader = StreamReader(os.environ["ORDER_EVENTS_TABLE"])
+        except Exception as e:
+            print(f"  stream de OrderEvents no disponible ({e}); se omite publishOrderOutbox", file=sys.stderr)
+            return
+        for records in reader.batches(STREAM_BATCH_SIZE):
+            self.call(f"publishOrderOutbox (x{STREAM_BATCH_SIZE})", "publishOrderOutbox", {"Records": records})
+
+    def read(self):
+        labels = list(READ_MIX)
+        weights = list(READ_MIX.values())
+        for _ in range(self.args.reads):
+            label = self.rng.choices(labels, weights=weights)[0]
+            getattr(self, "_read_" + re.sub(r"\W+", "_", label).strip("_"))(label)
+
+    def _random_order(self):
+        return self.rng.choice(self.orders)
+
+    def _read_getOrderMetrics(self, label, revalidate=False):
+        tenant_id, order_id = self._random_order()
+        headers = {}
+        if revalidate and (tenant_id, order_id) in self.etags:
+            headers["If-None-Match"] = self.etags[(tenant_id, order_id)]
+        result = self.call(label, "getOrderMetrics", api_event(tenant_id, order_id, headers=headers))
+        etag = ((result or {}).get("headers") or {}).get("ETag")
+        if etag:
+            self.etags[(tenant_id, order_id)] = etag
+
+    def _read_getOrderMetrics_304(self, label):
+        self._read_getOrderMetrics(label, revalidate=True)
+
+    def _read_getOrder(self, label):
+        tenant_id, order_id = self._random_order()
+        self.call(label, "getOrder", api_event(tenant_id, order_id))
+
+    def _read_getDashboardSummary(self, label):
+        self.call(label, "getDashboardSummary", api_event(self.rng.choice(self.tenants)))
+
+    def _read_listOrders(self, label, status=None):
+        tenant_id = self.rng.choice(self.tenants)
+        query = {"limit": "50"}
+        if status:
+            query["status"] = status
+        result = self.call(label, "listOrders", api_event(tenant_id, query=query))
+        next_token = (result.get("headers") or {}).get("X-Next-Token") if result else None
+        if next_token and self.rng.random() < 0.3:  # Algunos piden la segunda página
+            self.call(label, "listOrders", api_event(tenant_id, query={**query, "next_token": next_token}))
+
+    def _read_listOrders_status(self, label):
+        self._read_listOrders(label, status=self.rng.choice(STATUSES[:-1]))
+
+    def _read_getMenu(self, label, revalidate=False):
+        tenant_id = self.rng.choice(self.tenants)
+        headers = {"If-None-Match": self.menu_etags[tenant_id]} if revalidate and tenant_id in self.menu_etags else {}
+        result = self.call(label, "getMenu", api_event(tenant_id, headers=headers))
+        etag = ((result or {}).get("headers") or {}).get("ETag")
+        if etag:
+            self.menu_etags[tenant_id] = etag
+
+    def _read_getMenu_304(self, label):
+        self._read_getMenu(label, revalidate=True)
+
+    def _read_getTenants(self, label):
+        self.call(label, "getTenants", {})
+
+
+# ---------------------------------------------------------------- main
+
+def load_handler_functions():
+    handlers = {}
+    for name, module_name, function_name in load_handlers():
+        handlers[name] = getattr(importlib.import_module(module_name), function_name)
+    return handlers
+
+
+def print_table(rows):
+    header = (f"{'endpoint':<34} {'n':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'reads':>7} {'writes':>7} {'calls':>6} {'bytes':>8} {'err':>5}")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['endpoint']:<34} {r['requests']:>7} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['reads_per_req']:>7.2f} {r['writes_per_req']:>7.2f} "
+              f"{r['ddb_calls_per_req']:>6.2f} {r['avg_bytes']:>8} {r['errors']:>5}")
+    print("(latencias en ms; reads/writes: items de DynamoDB por request)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=3)
+    parser.add_argument("--menu-items", type=int, default=60, help="items de menú por tenant")
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--reads", type=int, default=5000, help="requests de la fase de lectura")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--order-shards", type=int, default=1, help="shards de escritura por tenant (ORDER_SHARDS)")
+    parser.add_argument("--endpoint-url", help="LocalStack u otro stand-in con DynamoDB y EventBridge")
+    parser.add_argument("--json", action="store_true", help="salida JSON para seguimiento")
+    args = parser.parse_args()
+
+    os.environ.update(BENCH_ENV)
+    # Las líneas EMF de common.metrics por request taparían el reporte
+    os.environ.setdefault("DDB_METRICS", "0")
+    if args.order_shards > 1:
+        os.environ["ORDER_SHARDS"] = ",".join(
+            f"bench-tenant-{i}={args.order_shards}" for i in range(args.tenants)
+        )
+    if args.endpoint_url:
+        os.environ["AWS_ENDPOINT_URL"] = args.endpoint_url
+        stand_in = contextlib.nullcontext()
+    else:
+        try:
+            from moto import mock_aws
+        except ImportError:
+            sys.exit('moto no está instalado: pip install "moto[dynamodb,events]" o usa --endpoint-url')
+        stand_in = mock_aws()
+    sys.path.insert(0, SRC_DIR)
+
+    import boto3
+
+    with stand_in:
+        boto3.setup_default_session()
+        recorder = Recorder()
+        recorder.install(boto3.DEFAULT_SESSION)
+
+        create_stand_in()
+        handlers = load_handler_functions()
+        scenario = Scenario(args, handlers, recorder)
+
+        phases = [("setup", scenario.setup), ("write", scenario.write),
+                  ("outbox", scenario.drain_outbox), ("read", scenario.read)]
+        timings = {}
+        for name, phase in phases:
+            print(f"fase {name}...", file=sys.stderr)
+            start = time.perf_counter()
+            phase()
+            timings[name] = round(time.perf_counter() - start, 2)
+
+    rows = summarize(recorder.samples)
+    if args.json:
+        print(json.dumps({"args": vars(args), "phase_seconds": timings, "endpoints": rows}, indent=2))
+        return
+    print_table(rows)
+    print("fases (s): " + ", ".join(f"{k}={v}" for k, v in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
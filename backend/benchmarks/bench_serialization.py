@@ -0,0 +1,133 @@
+"""
+Micro-benchmark de serialización de respuestas.
+
+Compara, sobre payloads con la forma de los que devuelve DynamoDB (Decimal,
+listas y mapas anidados), el enfoque anterior (decimal_to_native + json.dumps
+y json.dumps(default=str)) con common.serialization.dumps.
+
+Uso (desde backend/):
+    python benchmarks/bench_serialization.py [--menu-items 60] [--orders 10]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from common import serialization  # noqa: E402
+
+CATEGORIES = ["Pollos", "Parrillas", "Entradas", "Ensaladas", "Bebidas", "Postres"]
+STATUSES = ["RECEIVED", "COOKING", "PACKING", "DELIVERING", "DELIVERED"]
+
+
+def decimal_to_native(obj):
+    """Implementación anterior (copiada en get_order.py y get_menu.py)."""
+    if isinstance(obj, list):
+        return [decimal_to_native(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: decimal_to_native(v) for k, v in obj.items()}
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    return obj
+
+
+def menu_payload(n_items, rng):
+    return [
+        {
+            "tenant_id": "pardos-chicken",
+            "product_id": f"{rng.getrandbits(128):032x}",
+            "name": f"Producto {i}",
+            "price": Decimal(f"{rng.randint(5, 80)}.90"),
+            "category": rng.choice(CATEGORIES),
+            "description": "Pollo a la brasa con papas fritas y ensalada fresca",
+            "image_url": f"https://images.unsplash.com/photo-{rng.getrandbits(40)}?w=500&q=80",
+            "available": True,
+        }
+        for i in range(n_items)
+    ]
+
+
+def dashboard_payload(n_orders, rng):
+    recent = []
+    for _ in range(n_orders):
+        recent.append({
+            "order_id": f"{rng.getrandbits(128):032x}",
+            "status": rng.choice(STATUSES),
+            "created_at": "2025-01-28T10:00:00.000000+00:00",
+            "customer_name": "Juan Pérez",
+            "customer_address": "Av. Principal 123, Lima",
+            "customer_phone": "+51999999999",
+            "customer_email": "juan@example.com",
+            "items": [
+                {
+                    "product_id": f"{rng.getrandbits(64):016x}",
+                    "name": "Pollo Entero",
+                    "quantity": Decimal(rng.randint(1, 4)),
+                    "price": Decimal("62.90"),
+                }
+                for _ in range(rng.randint(1, 5))
+            ],
+            "phases": {
+                phase: {
+                    "started_at": "2025-01-28T10:05:00.000000+00:00",
+                    "time_from_creation_minutes": Decimal(f"{rng.uniform(1, 60):.2f}"),
+                    "attended_by": "Chef Carlos",
+                }
+                for phase in ("cooking", "packing", "delivering")
+            },
+        })
+    return {
+        "tenant_id": "pardos-chicken",
+        "total_orders": 12873,
+        "by_status": {s: Decimal(rng.randint(0, 5000)) for s in STATUSES},
+        "completed_orders": 12000,
+        "in_progress_orders": 873,
+        "average_times": {
+            "total_delivery_minutes": 41.3,
+            "total_delivery_hours": 0.69,
+            "phases": {"cooking_minutes": 18.2, "packing_minutes": 4.1, "delivering_minutes": 19.0},
+        },
+        "recent_orders": recent,
+        "tags": {"lunch", "dinner", "weekend"},
+    }
+
+
+def bench(label, fn, number):
+    seconds = min(timeit.repeat(fn, number=number, repeat=5))
+    per_call_us = seconds / number * 1e6
+    print(f"  {label:<42} {per_call_us:10.1f} µs/llamada")
+    return per_call_us
+
+
+def run(name, payload, number):
+    print(f"{name} ({len(serialization.dumps(payload))} bytes)")
+    candidates = [
+        ("decimal_to_native + json.dumps", lambda: json.dumps(decimal_to_native(payload), default=sorted)),
+        ("json.dumps(default=str)", lambda: json.dumps(payload, default=str)),
+        (f"common.serialization.dumps [{serialization.BACKEND}]", lambda: serialization.dumps(payload)),
+    ]
+    baseline = None
+    for label, fn in candidates:
+        elapsed = bench(label, fn, number)
+        baseline = baseline or elapsed
+    print(f"  -> speedup vs decimal_to_native: {baseline / elapsed:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--menu-items", type=int, default=60)
+    parser.add_argument("--orders", type=int, default=10)
+    parser.add_argument("--number", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    run(f"Menú ({args.menu_items} productos)", menu_payload(args.menu_items, rng), args.number)
+    run(f"Dashboard ({args.orders} órdenes recientes)", dashboard_payload(args.orders, rng), args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Analítica de tiempos de entrega sobre muchas órdenes a la vez.
+
+Las órdenes guardan cada instante también en milisegundos epoch
+(created_at_ms, <fase>_started_at_ms; ver common.timeline), así que las
+duraciones salen de restar columnas de enteros en lugar de parsear dos
+strings ISO por fase y por orden. Las órdenes anteriores a esos campos se
+leen del ISO como antes.
+
+Además del promedio se reportan percentiles (p50/p90/p99), un histograma
+con buckets fijos y el desglose por hora de creación (UTC): el promedio
+esconde justo la cola de pedidos lentos que importa en la operación.
+
+Si numpy está instalado los cálculos son vectorizados; si no, se hacen en
+Python puro con el mismo resultado (como orjson en common.serialization).
+
+Para muchas órdenes (el export diario, el seed del dashboard)
+DeliveryTimeStats acumula por tandas de CHUNK_SIZE solo conteos, sumas e
+histogramas, sin guardar las órdenes ni armar columnas de todas a la vez;
+sus percentiles salen del histograma, como en el dashboard.
+"""
+import math
+from itertools import islice
+
+from common.timeline import epoch_ms
+
+try:
+    import numpy as np
+except ImportError:  # Dependencia opcional
+    np = None
+
+# Fases cronometradas: (nombre, inicio, fin)
+TIMED_PHASES = [
+    ("total", "created_at", "delivered_started_at"),
+    ("cooking", "cooking_started_at", "packing_started_at"),
+    ("packing", "packing_started_at", "delivering_started_at"),
+    ("delivering", "delivering_started_at", "delivered_started_at"),
+]
+TIMING_FIELDS = ["created_at", "cooking_started_at", "packing_started_at",
+                 "delivering_started_at", "delivered_started_at"]
+
+PERCENTILES = (50, 90, 99)
+# Bordes inferiores (minutos) de los buckets del histograma; el último es abierto
+HISTOGRAM_EDGES = (0, 5, 10, 15, 20, 30, 45, 60, 90, 120)
+
+# Órdenes por tanda en los cálculos acumulados (tamaño de las columnas numpy)
+CHUNK_SIZE = 5000
+
+MS_PER_MINUTE = 60_000
+MS_PER_HOUR = 3_600_000
+
+
+def order_ms(order, field):
+    """Instante `field` de la orden en ms epoch (o None)."""
+    value = order.get(f"{field}_ms")
+    if value is not None:
+        return int(value)
+    return epoch_ms(order.get(field))  # Órdenes anteriores a los campos _ms
+
+
+def order_phase_minutes(order):
+    """Minutos de cada fase cronometrada de una orden (solo las que tienen inicio y fin)."""
+    durations = {}
+    for phase, start_field, end_field in TIMED_PHASES:
+        start, end = order_ms(order, start_field), order_ms(order, end_field)
+        if start is not None and end is not None and end > start:
+            durations[phase] = round((end - start) / MS_PER_MINUTE, 2)
+    return durations
+
+
+def phase_columns(orders):
+    """
+    (created_ms, {fase: minutos}) como columnas alineadas con `orders`.
+    Con numpy son arrays float (NaN = la fase no aplica); sin numpy, listas
+    con None.
+    """
+    columns = {field: [order_ms(o, field) for o in orders] for field in TIMING_FIELDS}
+
+    if np is not None:
+        ms = {
+            field: np.array([math.nan if v is None else v for v in values], dtype=np.float64)
+            for field, values in columns.items()
+        }
+        return ms["created_at"], minutes_from_ms(ms)
+
+    minutes = {}
+    for phase, start_field, end_field in TIMED_PHASES:
+        minutes[phase] = [
+            (end - start) / MS_PER_MINUTE
+            if start is not None and end is not None and end > start else None
+            for start, end in zip(columns[start_field], columns[end_field])
+        ]
+    return columns["created_at"], minutes
+
+
+def minutes_from_ms(ms):
+    """
+    {fase: minutos} a partir de columnas numpy {campo: ms epoch} (NaN si
+    falta el instante). Requiere numpy.
+    """
+    minutes = {}
+    for phase, start_field, end_field in TIMED_PHASES:
+        diff = (ms[end_field] - ms[start_field]) / MS_PER_MINUTE
+        diff[~(diff > 0)] = math.nan  # Sin fin, sin inicio o fuera de orden
+        minutes[phase] = diff
+    return minutes
+
+
+def _valid(values):
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        return values[~np.isnan(values)]
+    return sorted(v for v in values if v is not None)
+
+
+def _percentile(ordered, q):
+    """Percentil con interpolación lineal entre vecinos (como numpy.percentile)."""
+    position = (len(ordered) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def bucket_index(minutes, edges=HISTOGRAM_EDGES):
+    """Bucket del histograma al que pertenece una duración."""
+    index = 0
+    for i, edge in enumerate(edges):
+        if minutes >= edge:
+            index = i
+    return index
+
+
+def histogram(values, edges=HISTOGRAM_EDGES):
+    """Cantidad de valores en cada bucket [edges[i], edges[i+1]) (el último sin tope)."""
+    valid = _valid(values)
+    if np is not None:
+        indexes = np.searchsorted(np.asarray(edges, dtype=np.float64), valid, side="right") - 1
+        return np.bincount(indexes[indexes >= 0], minlength=len(edges)).tolist()
+    counts = [0] * len(edges)
+    for v in valid:
+        if v >= edges[0]:
+            counts[bucket_index(v, edges)] += 1
+    return counts
+
+
+def describe(values, percentiles=PERCENTILES):
+    """{"count", "mean_minutes", "p50", "p90", "p99"} de una columna de minutos."""
+    valid = _valid(values)
+    stats = {"count": int(len(valid)), "mean_minutes": None}
+    stats.update({f"p{q}": None for q in percentiles})
+    if not len(valid):
+        return stats
+
+    if np is not None:
+        stats["mean_minutes"] = round(float(valid.mean()), 2)
+        for q, value in zip(percentiles, np.percentile(valid, percentiles)):
+            stats[f"p{q}"] = round(float(value), 2)
+    else:
+        stats["mean_minutes"] = round(sum(valid) / len(valid), 2)
+        for q in percentiles:
+            stats[f"p{q}"] = round(_percentile(valid, q), 2)
+    return stats
+
+
+def histogram_buckets(counts, edges=HISTOGRAM_EDGES):
+    """Histograma en formato de respuesta: [{"from", "to", "orders"}, ...] en minutos."""
+    return [
+        {
+            "from": edge,
+            "to": edges[i + 1] if i + 1 < len(edges) else None,
+            "orders": int(count),
+        }
+        for i, (edge, count) in enumerate(zip(edges, counts))
+    ]
+
+
+def percentiles_from_histogram(counts, edges=HISTOGRAM_EDGES, percentiles=PERCENTILES):
+    """
+    Percentiles aproximados a partir de un histograma (para agregados que
+    solo guardan conteos por bucket). Interpola dentro del bucket; en el
+    último, que no tiene tope, devuelve su borde inferior.
+    """
+    counts = [int(c) for c in counts]
+    total = sum(counts)
+    result = {}
+    for q in percentiles:
+        if not total:
+            result[f"p{q}"] = None
+            continue
+        target = total * q / 100
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= target:
+                if i + 1 == len(edges):
+                    value = edges[i]
+                else:
+                    value = edges[i] + (edges[i + 1] - edges[i]) * (target - seen) / count
+                break
+            seen += count
+        result[f"p{q}"] = round(value, 2)
+    return result
+
+
+def _hours(created_ms):
+    """Hora del día (UTC, 0-23) de cada orden; -1 si no tiene created_at."""
+    if np is not None:
+        hours = np.full(len(created_ms), -1, dtype=np.int64)
+        known = ~np.isnan(created_ms)
+        hours[known] = (created_ms[known] // MS_PER_HOUR).astype(np.int64) % 24
+        return hours
+    return [-1 if ms is None else (ms // MS_PER_HOUR) % 24 for ms in created_ms]
+
+
+def chunks(orders, size=CHUNK_SIZE):
+    """Tandas (listas) de hasta `size` órdenes de cualquier iterable."""
+    orders = iter(orders)
+    while True:
+        chunk = list(islice(orders, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def delivery_time_report(orders, chunk_size=CHUNK_SIZE):
+    """
+    Reporte de tiempos de un conjunto de órdenes (cualquier iterable, se
+    recorre por tandas):
+      - phases:  por fase, count / mean / p50 / p90 / p99 e histograma
+      - by_hour: por hora de creación (UTC), órdenes y las mismas estadísticas
+    """
+    stats = DeliveryTimeStats()
+    for chunk in chunks(orders, chunk_size):
+        stats.add(chunk)
+    return stats.report()
+
+
+class PhaseStats:
+    """Conteo, suma e histograma de una fase, acumulados por tandas de valores."""
+
+    def __init__(self, edges=HISTOGRAM_EDGES):
+        self.edges = edges
+        self.count = 0
+        self.total = 0.0
+        self.counts = [0] * len(edges)
+
+    def add(self, values):
+        valid = _valid(values)
+        self.count += int(len(valid))
+        self.total += float(valid.sum()) if np is not None else sum(valid)
+        for i, count in enumerate(histogram(valid, self.edges)):
+            self.counts[i] += count
+
+    def describe(self, percentiles=PERCENTILES):
+        """Como describe(), con los percentiles aproximados del histograma."""
+        stats = {
+            "count": self.count,
+            "mean_minutes": round(self.total / self.count, 2) if self.count else None,
+        }
+        stats.update(percentiles_from_histogram(self.counts, self.edges, percentiles))
+        return stats
+
+
+class DeliveryTimeStats:
+    """
+    Reporte de tiempos (ver delivery_time_report) que se va sumando con
+    add(orders) por tandas o páginas, sin guardar las órdenes.
+    """
+
+    def __init__(self):
+        self.orders = 0
+        self.phases = {phase: PhaseStats() for phase, _, _ in TIMED_PHASES}
+        self.hours = {}  # hora -> [órdenes, {fase: PhaseStats}]
+
+    def _hour(self, hour):
+        if hour not in self.hours:
+            self.hours[hour] = [0, {phase: PhaseStats() for phase, _, _ in TIMED_PHASES}]
+        return self.hours[hour]
+
+    def add(self, orders):
+        created_ms, minutes = phase_columns(orders)
+        hours = _hours(created_ms)
+        self.orders += len(orders)
+        for phase, values in minutes.items():
+            self.phases[phase].add(values)
+
+        if np is not None:
+            for hour in np.unique(hours[hours >= 0]).tolist():
+                mask = hours == hour
+                entry = self._hour(hour)
+                entry[0] += int(mask.sum())
+                for phase, values in minutes.items():
+                    entry[1][phase].add(values[mask])
+            return
+
+        for hour in {h for h in hours if h >= 0}:
+            rows = [i for i, h in enumerate(hours) if h == hour]
+            entry = self._hour(hour)
+            entry[0] += len(rows)
+            for phase, values in minutes.items():
+                entry[1][phase].add([values[i] for i in rows])
+
+    def report(self):
+        return {
+            "orders": self.orders,
+            "phases": {
+                phase: dict(stats.describe(), histogram=histogram_buckets(stats.counts))
+                for phase, stats in self.phases.items()
+            },
+            "by_hour": {
+                f"{hour:02d}": {
+                    "orders": orders,
+                    "phases": {phase: stats.describe() for phase, stats in phases.items()},
+                }
+                for hour, (orders, phases) in sorted(self.hours.items())
+            },
+        }
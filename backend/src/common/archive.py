@@ -0,0 +1,111 @@
+"""
+Archivo de órdenes entregadas (tier frío).
+
+Al entregarse, la orden recibe archive_at (epoch en segundos) =
+entrega + ORDER_RETENTION_DAYS. Es el atributo TTL de Orders: DynamoDB la
+borra después de esa fecha y el borrado llega por el stream a
+ms_orders/archive_orders, que la guarda en OrdersArchive junto con su
+historial de OrderEvents (comprimido en events_gz) y borra esos eventos.
+
+Así Orders y OrderEvents solo tienen las órdenes en curso y las
+entregadas recientes: list_orders, las vistas de cocina y los seeds del
+dashboard leen cada vez menos historia. get_order y get_order_metrics
+buscan en el archivo cuando la orden ya no está en Orders.
+
+ORDER_RETENTION_DAYS=0 desactiva el archivo (las órdenes no expiran).
+"""
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from boto3.dynamodb.conditions import Key
+
+from common.db import PRIVATE_ORDER_FIELDS, order_events_table, orders_archive_table
+from common.event_log import read_events
+from common.serialization import dumps_bytes
+
+ORDER_RETENTION_DAYS = int(os.environ.get("ORDER_RETENTION_DAYS", "30"))
+
+# Atributo TTL de Orders (ver serverless.yml)
+ARCHIVE_TTL_FIELD = "archive_at"
+EVENTS_FIELD = "events_gz"
+
+# Atributos de la orden que no pasan al archivo
+NOT_ARCHIVED_FIELDS = (ARCHIVE_TTL_FIELD,) + PRIVATE_ORDER_FIELDS
+
+
+def archive_time(delivered_at):
+    """Epoch (segundos) desde el que la orden entregada puede archivarse, o None si no se archiva."""
+    if ORDER_RETENTION_DAYS <= 0:
+        return None
+    return int((delivered_at + timedelta(days=ORDER_RETENTION_DAYS)).timestamp())
+
+
+def _pack_events(events):
+    return gzip.compress(dumps_bytes(events))
+
+
+def archived_events(item):
+    """Historial de OrderEvents guardado con la orden archivada (lista de eventos)."""
+    packed = item.get(EVENTS_FIELD)
+    if packed is None:
+        return []
+    return json.loads(gzip.decompress(bytes(packed)))
+
+
+def _without_events(item):
+    return {k: v for k, v in item.items() if k != EVENTS_FIELD}
+
+
+def get_archived_order(tenant_id, order_id, with_events=False):
+    """
+    Orden archivada (sin events_gz), o None. Con with_events=True devuelve
+    (orden, eventos).
+    """
+    item = orders_archive_table().get_item(
+        Key={"tenant_id": tenant_id, "order_id": order_id}
+    ).get("Item")
+    if item is None:
+        return (None, []) if with_events else None
+    order = _without_events(item)
+    return (order, archived_events(item)) if with_events else order
+
+
+def archived_tenant_orders(tenant_id):
+    """Todas las órdenes archivadas del tenant (para reconstruir agregados)."""
+    orders = []
+    query_kwargs = {"KeyConditionExpression": Key("tenant_id").eq(tenant_id)}
+    while True:
+        resp = orders_archive_table().query(**query_kwargs)
+        orders.extend(_without_events(item) for item in resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return orders
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def archive_order(order):
+    """
+    Guarda en el archivo una orden ya borrada de Orders (imagen del stream)
+    con sus eventos, y después borra los eventos de OrderEvents.
+
+    Es idempotente: si un reintento encuentra la orden ya archivada no la
+    sobrescribe (sus eventos pueden estar borrados a medias) y solo termina
+    de borrar los eventos. Devuelve la cantidad de eventos borrados.
+    """
+    order_id = order["order_id"]
+    events = read_events(order_id)
+
+    table = orders_archive_table()
+    item = {k: v for k, v in order.items() if k not in NOT_ARCHIVED_FIELDS}
+    # El outbox ya se publicó: no hace falta en el archivo
+    item[EVENTS_FIELD] = _pack_events([{k: v for k, v in e.items() if k != "outbox"} for e in events])
+    try:
+        table.put_item(Item=item, ConditionExpression="attribute_not_exists(order_id)")
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        print(f"Orden {order_id} ya archivada, se terminan de borrar sus eventos")
+
+    with order_events_table().batch_writer() as batch:
+        for event in events:
+            batch.delete_item(Key={"order_id": order_id, "ts": event["ts"]})
+    return len(events)
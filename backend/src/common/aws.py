@@ -0,0 +1,44 @@
+"""
+Clientes de AWS creados bajo demanda.
+
+Construir un cliente o resource de boto3 cuesta decenas de milisegundos
+(carga del modelo del servicio, credenciales, endpoints). Hacerlo al importar
+los módulos lo sumaba al cold start de todos los handlers, incluso de los que
+nunca usan ese servicio. Aquí se crean en el primer uso y se reutilizan
+mientras el contenedor siga vivo.
+"""
+import threading
+
+import boto3
+
+_clients = {}
+_resources = {}
+_lock = threading.Lock()
+
+
+def client(service_name, **kwargs):
+    """
+    Cliente low-level de boto3 (thread-safe), uno por servicio y argumentos:
+    client("stepfunctions", endpoint_url=...) no devuelve el cliente creado
+    sin endpoint_url (ni al revés). Los valores de kwargs deben ser hashables
+    (endpoint_url, region_name, un botocore Config).
+    """
+    key = (service_name, tuple(sorted(kwargs.items())))
+    found = _clients.get(key)
+    if found is None:
+        with _lock:
+            found = _clients.get(key)
+            if found is None:
+                found = _clients[key] = boto3.client(service_name, **kwargs)
+    return found
+
+
+def resource(service_name):
+    """Resource de boto3 (p. ej. dynamodb.Table), uno por servicio."""
+    found = _resources.get(service_name)
+    if found is None:
+        with _lock:
+            found = _resources.get(service_name)
+            if found is None:
+                found = _resources[service_name] = boto3.resource(service_name)
+    return found
@@ -1,21 +1,93 @@
 import os
-import boto3
 
-_dynamodb = boto3.resource("dynamodb")
+from common.aws import resource
+from common.metrics import instrument_client
 
 TENANTS_TABLE = os.environ["TENANTS_TABLE"]
 MENU_TABLE = os.environ["MENU_TABLE"]
 ORDERS_TABLE = os.environ["ORDERS_TABLE"]
 ORDER_EVENTS_TABLE = os.environ["ORDER_EVENTS_TABLE"]
+DASHBOARD_TABLE = os.environ["DASHBOARD_TABLE"]
+DASHBOARD_APPLIED_TABLE = os.environ["DASHBOARD_APPLIED_TABLE"]
+CONNECTIONS_TABLE = os.environ["CONNECTIONS_TABLE"]
+IDEMPOTENCY_TABLE = os.environ["IDEMPOTENCY_TABLE"]
+ORDERS_ARCHIVE_TABLE = os.environ["ORDERS_ARCHIVE_TABLE"]
+
+_tables = {}
+
+def _dynamodb():
+    """Resource de DynamoDB con el cliente instrumentado (ver common.metrics)."""
+    dynamodb = resource("dynamodb")
+    instrument_client(dynamodb.meta.client)
+    return dynamodb
+
+def _table(name):
+    table = _tables.get(name)
+    if table is None:
+        table = _tables[name] = _dynamodb().Table(name)
+    return table
 
 def tenants_table():
-    return _dynamodb.Table(TENANTS_TABLE)
+    return _table(TENANTS_TABLE)
 
 def menu_table():
-    return _dynamodb.Table(MENU_TABLE)
+    return _table(MENU_TABLE)
 
 def orders_table():
-    return _dynamodb.Table(ORDERS_TABLE)
+    return _table(ORDERS_TABLE)
 
 def order_events_table():
-    return _dynamodb.Table(ORDER_EVENTS_TABLE)
+    return _table(ORDER_EVENTS_TABLE)
+
+def dashboard_table():
+    return _table(DASHBOARD_TABLE)
+
+def dashboard_applied_table():
+    return _table(DASHBOARD_APPLIED_TABLE)
+
+def connections_table():
+    return _table(CONNECTIONS_TABLE)
+
+def idempotency_table():
+    return _table(IDEMPOTENCY_TABLE)
+
+def orders_archive_table():
+    return _table(ORDERS_ARCHIVE_TABLE)
+
+def tenant_ids():
+    """tenant_id de la tabla Tenants; si está vacía, Pardos por defecto (como get_tenants)."""
+    ids = []
+    scan_kwargs = {"ProjectionExpression": "tenant_id"}
+    while True:
+        resp = tenants_table().scan(**scan_kwargs)
+        ids.extend(t["tenant_id"] for t in resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    return ids or ["pardos-chicken"]
+
+def transact_write(actions):
+    """
+    TransactWriteItems con tipos nativos de Python (como Table.put_item).
+    Cada acción es {"Put": {...}}, {"Update": {...}}, etc. con TableName.
+    """
+    return _dynamodb().meta.client.transact_write_items(TransactItems=actions)
+
+def transaction_canceled_error():
+    """Excepción de transact_write cuando alguna condición falla (ver CancellationReasons)."""
+    return _dynamodb().meta.client.exceptions.TransactionCanceledException
+
+# Índices secundarios de Orders (ver serverless.yml). La partition key es
+# order_shard ("<tenant_id>#<n>", ver common.sharding), no tenant_id.
+ORDERS_STATUS_INDEX = "shard-status-created-index"
+ORDERS_CREATED_INDEX = "shard-created-index"
+
+def order_status_key(status, created_at):
+    """Clave de ordenamiento del índice por estado: "<STATUS>#<created_at>"."""
+    return f"{status}#{created_at}"
+
+# Atributos internos de la orden que no se devuelven por la API
+PRIVATE_ORDER_FIELDS = ("workflow_task_token", "workflow_task_status")
+
+def public_order(order):
+    return {k: v for k, v in order.items() if k not in PRIVATE_ORDER_FIELDS}
@@ -0,0 +1,46 @@
+"""
+Lectura del historial de una orden en OrderEvents (partition key order_id,
+sort key ts).
+
+Las consultas sin proyección traen el item completo (incluido `outbox` del
+evento de creación) y una sola query corta en 1 MB; aquí se pide solo lo
+que se usa y se sigue LastEvaluatedKey hasta el final.
+"""
+from boto3.dynamodb.conditions import Key
+
+from common.db import order_events_table
+
+
+def _projection(attributes):
+    """ProjectionExpression con alias para todo (status, by, ... son palabras reservadas)."""
+    names = {f"#a{i}": attr for i, attr in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+
+
+def read_events(order_id, attributes=None):
+    """
+    Eventos de la orden en orden cronológico. `attributes` limita los campos
+    leídos (None = item completo).
+    """
+    query_kwargs = {"KeyConditionExpression": Key("order_id").eq(order_id)}
+    if attributes:
+        query_kwargs.update(_projection(attributes))
+
+    events = []
+    while True:
+        resp = order_events_table().query(ScanIndexForward=True, **query_kwargs)
+        events.extend(resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return events
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def transition_times(order_id):
+    """[{"status", "ts"}, ...]: cuándo entró la orden a cada estado."""
+    return [
+        {"status": event.get("status"), "ts": event.get("ts")}
+        for event in read_events(order_id, ("status", "ts"))
+    ]
@@ -1,22 +1,88 @@
 import os
-import json
-import boto3
+import random
+import time
 from datetime import datetime, timezone
 
-_events = boto3.client("events")
+from common.aws import client
+from common.serialization import dumps
+
 EVENTS_BUS_NAME = os.environ["EVENTS_BUS_NAME"]
 
-def publish_event(source: str, detail_type: str, detail: dict):
+# Los eventos de órdenes se guardan en el outbox de OrderEvents
+# (outbox_record) y publish_outbox los envía por lotes con put_entries.
+
+# put_events acepta hasta 10 entradas y 256 KB por llamada
+MAX_ENTRIES_PER_CALL = 10
+MAX_REQUEST_BYTES = 256 * 1024
+# Reintentos de las entradas rechazadas (throttling, errores internos)
+MAX_PUBLISH_ATTEMPTS = int(os.environ.get("EVENTS_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_SECONDS = 0.05
+BACKOFF_MAX_SECONDS = 1.0
+
+
+def build_entry(source: str, detail_type: str, detail: dict) -> dict:
     if "timestamp" not in detail:
         detail["timestamp"] = datetime.now(timezone.utc).isoformat()
 
-    _events.put_events(
-        Entries=[
-            {
-                "Source": source,
-                "DetailType": detail_type,
-                "Detail": json.dumps(detail),
-                "EventBusName": EVENTS_BUS_NAME,
-            }
-        ]
+    return {
+        "Source": source,
+        "DetailType": detail_type,
+        "Detail": dumps(detail),
+        "EventBusName": EVENTS_BUS_NAME,
+    }
+
+def outbox_record(source: str, detail_type: str, detail: dict) -> dict:
+    """
+    Evento pendiente de publicar, guardado junto al registro de OrderEvents
+    en la misma transacción. publish_outbox lo envía a EventBridge desde el
+    stream de la tabla.
+    """
+    if "timestamp" not in detail:
+        detail["timestamp"] = datetime.now(timezone.utc).isoformat()
+    return {"source": source, "detail_type": detail_type, "detail": detail}
+
+def _entry_size(entry: dict) -> int:
+    # Cálculo de tamaño de PutEvents (los 14 bytes son del campo Time)
+    return 14 + sum(
+        len(entry.get(field, "").encode("utf-8")) for field in ("Source", "DetailType", "Detail")
     )
+
+def _chunks(indices: list, entries: list):
+    """Agrupa índices en llamadas de hasta MAX_ENTRIES_PER_CALL y MAX_REQUEST_BYTES."""
+    chunk, size = [], 0
+    for i in indices:
+        entry_size = _entry_size(entries[i])
+        if chunk and (len(chunk) == MAX_ENTRIES_PER_CALL or size + entry_size > MAX_REQUEST_BYTES):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(i)
+        size += entry_size
+    if chunk:
+        yield chunk
+
+def put_entries(entries: list, max_attempts: int = MAX_PUBLISH_ATTEMPTS) -> list:
+    """
+    Publica entradas en lotes y reintenta solo las que EventBridge rechazó,
+    con backoff exponencial con jitter. Devuelve los índices de las entradas
+    que siguen rechazadas después de max_attempts intentos.
+    """
+    pending = list(range(len(entries)))
+    for attempt in range(max_attempts):
+        failed = []
+        codes = set()
+        for chunk in _chunks(pending, entries):
+            resp = client("events").put_events(Entries=[entries[i] for i in chunk])
+            if resp.get("FailedEntryCount"):
+                for i, result in zip(chunk, resp.get("Entries", [])):
+                    if result.get("ErrorCode"):
+                        failed.append(i)
+                        codes.add(result["ErrorCode"])
+        if not failed:
+            return []
+
+        print(f"EventBridge rechazó {len(failed)} de {len(pending)} entradas ({', '.join(sorted(codes))}), intento {attempt + 1}")
+        pending = failed
+        if attempt + 1 < max_attempts:
+            # Full jitter: evita que todos los reintentos lleguen a la vez
+            time.sleep(random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)))
+    return sorted(pending)
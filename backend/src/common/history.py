@@ -0,0 +1,231 @@
+"""
+Histórico columnar de órdenes (Parquet) para análisis de largo plazo.
+
+export_daily_report escribe, además del NDJSON, un archivo Parquet por día
+y tenant con columnas tipadas (timestamps en ms UTC, estado como
+diccionario, personal por fase e items):
+
+    history/date=YYYY-MM-DD/tenant=<tenant_id>/orders.parquet
+
+Las consultas de varias semanas leen solo las particiones y columnas que
+necesitan, sin tocar las tablas de producción. `location` es
+"s3://<bucket>/history" o un directorio local con el mismo layout, así
+que se pueden probar con archivos locales:
+
+    python -m common.history ./history pardos-chicken 2025-01-01 2025-01-31
+
+Requiere pyarrow y numpy (dependencias opcionales: sin ellas la
+exportación omite el Parquet y este módulo no se puede consultar).
+"""
+import math
+import sys
+from datetime import date
+
+from common.analytics import TIMING_FIELDS, describe, minutes_from_ms, order_ms
+from common.serialization import dumps
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Dependencias opcionales
+    pa = None
+
+HISTORY_PREFIX = "history"
+
+# Personal que atiende cada fase cronometrada: (fase, campo de la orden)
+STAFF_FIELDS = [
+    ("cooking", "cooking_by"),
+    ("packing", "packing_by"),
+    ("delivering", "delivering_by"),
+]
+
+
+def history_key(tenant_id, date_str):
+    return f"{HISTORY_PREFIX}/date={date_str}/tenant={tenant_id}/orders.parquet"
+
+
+def available():
+    return pa is not None
+
+
+def _require():
+    if pa is None:
+        raise RuntimeError("pyarrow and numpy are required for the columnar history")
+
+
+def order_row(order):
+    """Fila del histórico: solo los campos que se analizan (sin datos del cliente)."""
+    row = {
+        "order_id": order.get("order_id"),
+        "status": order.get("status"),
+        "items": [
+            {
+                "product_id": item.get("product_id"),
+                "name": item.get("name"),
+                "quantity": int(item.get("quantity") or 0),
+                "price": None if item.get("price") is None else float(item["price"]),
+            }
+            for item in order.get("items") or []
+        ],
+    }
+    for field in TIMING_FIELDS:
+        row[field] = order_ms(order, field)
+    for _, by_field in STAFF_FIELDS:
+        row[by_field] = order.get(by_field) or None
+    return row
+
+
+def _schema():
+    timestamp = pa.timestamp("ms", tz="UTC")
+    return pa.schema(
+        [
+            ("order_id", pa.string()),
+            ("status", pa.dictionary(pa.int8(), pa.string())),
+        ]
+        + [(field, timestamp) for field in TIMING_FIELDS]
+        + [(by_field, pa.string()) for _, by_field in STAFF_FIELDS]
+        + [
+            ("items", pa.list_(pa.struct([
+                ("product_id", pa.string()),
+                ("name", pa.string()),
+                ("quantity", pa.int32()),
+                ("price", pa.float64()),
+            ]))),
+        ]
+    )
+
+
+class HistoryWriter:
+    """
+    Escribe el Parquet en `sink` (un archivo o cualquier objeto con
+    write()) a medida que llegan las órdenes: cada write(orders) es un row
+    group, así que nunca se tiene el archivo completo en memoria.
+    """
+
+    def __init__(self, sink):
+        _require()
+        self.schema = _schema()
+        self.writer = pq.ParquetWriter(sink, self.schema, compression="zstd")
+
+    def write(self, orders):
+        rows = [order_row(order) for order in orders]
+        self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def read_history(location, tenant_id, start_date, end_date, columns=None):
+    """Órdenes del tenant con date entre start_date y end_date (inclusive) como pyarrow.Table."""
+    _require()
+    partitioning = ds.partitioning(
+        pa.schema([("date", pa.string()), ("tenant", pa.string())]), flavor="hive"
+    )
+    dataset = ds.dataset(location, format="parquet", partitioning=partitioning)
+    where = (
+        (ds.field("tenant") == tenant_id)
+        & (ds.field("date") >= str(start_date))
+        & (ds.field("date") <= str(end_date))
+    )
+    return dataset.to_table(columns=columns, filter=where)
+
+
+def _ms_columns(table):
+    """{campo: ms epoch como float, NaN si falta} para analytics.minutes_from_ms."""
+    return {
+        field: pc.fill_null(pc.cast(pc.cast(table[field], pa.int64()), pa.float64()), math.nan)
+        .to_numpy()
+        for field in TIMING_FIELDS
+    }
+
+
+def phase_stats(minutes):
+    return {phase: describe(values) for phase, values in minutes.items()}
+
+
+def weekly_stats(table, minutes):
+    """Por semana ISO de creación ("2025-W05"): órdenes y estadísticas por fase."""
+    created = table["created_at"]
+    weeks = pc.binary_join_element_wise(
+        pc.cast(pc.iso_year(created), pa.string()),
+        pc.utf8_lpad(pc.cast(pc.iso_week(created), pa.string()), 2, "0"),
+        "-W",
+    ).to_numpy(zero_copy_only=False)
+
+    result = {}
+    for week in sorted({w for w in weeks if w is not None}):
+        mask = weeks == week
+        result[week] = {
+            "orders": int(mask.sum()),
+            "phases": {phase: describe(values[mask]) for phase, values in minutes.items()},
+        }
+    return result
+
+
+def staff_stats(table, minutes):
+    """Por persona, la fase que atendió: órdenes y tiempos de esa fase."""
+    result = {}
+    for phase, by_field in STAFF_FIELDS:
+        staff = table[by_field].to_numpy(zero_copy_only=False)
+        by_person = {}
+        for person in sorted({p for p in staff if p}):
+            mask = staff == person
+            by_person[person] = dict(describe(minutes[phase][mask]), orders=int(mask.sum()))
+        result[phase] = by_person
+    return result
+
+
+def product_stats(table, minutes):
+    """
+    Por producto: órdenes que lo incluyen, unidades, ingresos (si hay
+    precio) y tiempos de cocina y totales de esas órdenes.
+    """
+    items = table["items"].combine_chunks()
+    flat = pc.list_flatten(items)
+    parents = pc.list_parent_indices(items).to_numpy()
+    product_ids = flat.field("product_id").to_numpy(zero_copy_only=False)
+    names = flat.field("name").to_numpy(zero_copy_only=False)
+    quantities = pc.fill_null(flat.field("quantity"), 0).to_numpy()
+    prices = pc.fill_null(flat.field("price"), math.nan).to_numpy()
+
+    result = {}
+    for product_id in sorted({p for p in product_ids if p}):
+        mask = product_ids == product_id
+        orders = np.unique(parents[mask])
+        revenue = quantities[mask] * prices[mask]
+        result[product_id] = {
+            "name": next((n for n in names[mask] if n), None),
+            "orders": int(len(orders)),
+            "units": int(quantities[mask].sum()),
+            "revenue": round(float(np.nansum(revenue)), 2) if not np.isnan(revenue).all() else None,
+            "cooking": describe(minutes["cooking"][orders]),
+            "total": describe(minutes["total"][orders]),
+        }
+    return result
+
+
+def history_report(location, tenant_id, start_date, end_date):
+    """Reporte de un rango de fechas: por fase, por semana, por personal y por producto."""
+    table = read_history(location, tenant_id, start_date, end_date)
+    minutes = minutes_from_ms(_ms_columns(table))
+    statuses = pc.value_counts(pc.cast(table["status"], pa.string())).to_pylist()
+    return {
+        "tenant_id": tenant_id,
+        "from": str(start_date),
+        "to": str(end_date),
+        "orders": table.num_rows,
+        "by_status": {s["values"]: s["counts"] for s in statuses if s["values"]},
+        "phases": phase_stats(minutes),
+        "weekly": weekly_stats(table, minutes),
+        "staff": staff_stats(table, minutes),
+        "products": product_stats(table, minutes),
+    }
+
+
+if __name__ == "__main__":
+    location, tenant_id, start, end = sys.argv[1:5]
+    report = history_report(location, tenant_id, date.fromisoformat(start), date.fromisoformat(end))
+    print(dumps(report))
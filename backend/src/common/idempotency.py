@@ -0,0 +1,94 @@
+"""
+Idempotencia de POST con el header Idempotency-Key.
+
+Un cliente que reintenta el mismo request (misma key) recibe la respuesta
+guardada del primero, sin volver a escribir nada: ni orden ni evento, ni
+order.created, ni workflow, ni email.
+
+El registro ({tenant_id}#{key}) se escribe con attribute_not_exists dentro
+de la misma transacción que el resto de la operación, así que solo uno de
+dos reintentos concurrentes puede ganar; el otro ve la transacción
+cancelada y responde con el registro del ganador. Expira por TTL
+(expires_at) después de IDEMPOTENCY_TTL_SECONDS; como DynamoDB borra los
+vencidos con hasta días de atraso, un registro vencido se trata como si
+no existiera (no se responde con él y se puede reemplazar).
+"""
+import hashlib
+import json
+import os
+import time
+
+from common.db import IDEMPOTENCY_TABLE, idempotency_table
+from common.serialization import dumps
+
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+
+
+class IdempotencyKeyError(ValueError):
+    pass
+
+
+def request_key(event, tenant_id):
+    """Clave del registro para el request, o None si no trae Idempotency-Key."""
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    key = (headers.get(HEADER) or "").strip()
+    if not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyKeyError(f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters")
+    return f"{tenant_id}#{key}"
+
+
+def fingerprint(body):
+    """Hash del body: la misma key con otro contenido es un error del cliente."""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load(key):
+    """Registro vigente para la key (lectura consistente), o None si no hay o ya venció."""
+    record = idempotency_table().get_item(Key={"idempotency_key": key}, ConsistentRead=True).get("Item")
+    if record and int(record.get("expires_at", 0)) <= int(time.time()):
+        return None  # Vencido, todavía sin borrar por el TTL
+    return record
+
+
+def put_action(key, request_hash, response):
+    """Put para transact_write que guarda la respuesta; falla si la key ya tiene un registro vigente."""
+    now = int(time.time())
+    return {
+        "Put": {
+            "TableName": IDEMPOTENCY_TABLE,
+            "Item": {
+                "idempotency_key": key,
+                "request_hash": request_hash,
+                "response": response,
+                "expires_at": now + IDEMPOTENCY_TTL_SECONDS,
+            },
+            "ConditionExpression": "attribute_not_exists(idempotency_key) OR expires_at <= :now",
+            "ExpressionAttributeValues": {":now": now},
+        }
+    }
+
+
+def replay(record, request_hash):
+    """Respuesta a devolver para un reintento con un registro ya guardado."""
+    if record.get("request_hash") != request_hash:
+        return {
+            "statusCode": 422,
+            "body": dumps({"message": "Idempotency-Key already used with a different request"}),
+        }
+    response = record["response"]
+    return {
+        "statusCode": int(response["statusCode"]),
+        "headers": dict(response.get("headers") or {}, **{"Idempotent-Replayed": "true"}),
+        "body": response.get("body"),
+    }
+
+
+def lost_race(error, index):
+    """True si la transacción se canceló por la condición de la acción `index` (la key ya existía)."""
+    reasons = error.response.get("CancellationReasons") or []
+    return index < len(reasons) and reasons[index].get("Code") == "ConditionalCheckFailed"
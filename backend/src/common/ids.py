@@ -0,0 +1,88 @@
+"""
+IDs de orden ordenables por tiempo (formato ULID).
+
+26 caracteres en base32 de Crockford: 10 del timestamp en milisegundos y 16
+aleatorios (80 bits), p. ej. "01JD3M9Y5G7Q2K8V4T6X1B0NCE". Ordenados como
+string quedan en orden de creación: entre órdenes con el mismo created_at
+(desempate en los listados) y dentro de la partición del tenant.
+
+Las órdenes antiguas tienen UUID4; las búsquedas por order_id exacto siguen
+funcionando igual.
+
+create_order toma created_at del propio ID (order_time), así quien tiene
+el order_id conoce created_at sin leer la orden (ver update_order_step).
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {c: i for i, c in enumerate(CROCKFORD)}
+ID_LENGTH = 26
+RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        chars.append(CROCKFORD[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def _timestamp_ms(moment=None):
+    if moment is None:
+        return time.time_ns() // 1_000_000
+    return int(moment.timestamp() * 1000)
+
+
+def new_order_id(moment=None):
+    """
+    ULID para `moment` (datetime, por defecto ahora). Dentro del mismo
+    milisegundo la parte aleatoria se incrementa, así los IDs generados por
+    un contenedor son estrictamente crecientes.
+    """
+    global _last_ms, _last_random
+    ms = _timestamp_ms(moment)
+    with _lock:
+        if ms == _last_ms and _last_random + 1 < (1 << RANDOM_BITS):
+            random_part = _last_random + 1
+        else:
+            random_part = int.from_bytes(os.urandom(RANDOM_BITS // 8), "big")
+        _last_ms, _last_random = ms, random_part
+    return _encode(ms, 10) + _encode(random_part, 16)
+
+
+def order_time(order_id):
+    """Instante (UTC, precisión de ms) codificado en un ULID; None para los UUID antiguos."""
+    if not is_time_ordered(order_id):
+        return None
+    ms = 0
+    for c in order_id[:10]:
+        ms = ms * 32 + _DECODE[c]
+    return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(milliseconds=ms)
+
+
+def is_time_ordered(order_id):
+    return (
+        isinstance(order_id, str)
+        and len(order_id) == ID_LENGTH
+        and all(c in _DECODE for c in order_id)
+    )
+
+
+def short_order_ref(order_id):
+    """
+    Número corto para mostrar al cliente. En un ULID los primeros caracteres
+    son el timestamp (casi iguales entre órdenes cercanas), así que se usan
+    los últimos; en los UUID antiguos, los 8 primeros como hasta ahora.
+    """
+    order_id = order_id or ""
+    if is_time_ordered(order_id):
+        return order_id[-8:]
+    return order_id[:8]
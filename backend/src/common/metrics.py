@@ -0,0 +1,215 @@
+"""
+Instrumentación de las llamadas a DynamoDB.
+
+Se engancha a los eventos de botocore del cliente de DynamoDB (el mismo que
+usan los Table de common.db), así que no cambia la forma de llamar a
+get_item / query / update_item:
+  - pide ReturnConsumedCapacity=TOTAL en las operaciones que lo aceptan
+  - mide la latencia de cada llamada (incluye los reintentos de botocore)
+  - guarda operación, tabla, índice, items devueltos y capacidad consumida
+
+Los handlers decorados con @instrumented_handler escriben al terminar una
+línea en formato CloudWatch Embedded Metric Format (EMF) con los totales de
+la invocación, con dimensiones Function y Tenant. CloudWatch la convierte en
+métricas sin llamar a PutMetricData, y el detalle de cada llamada queda en el
+log para consultarlo con Logs Insights.
+
+DDB_METRICS=0 desactiva la instrumentación.
+"""
+import functools
+import os
+import threading
+import time
+
+from common.serialization import dumps
+
+METRICS_ENABLED = os.environ.get("DDB_METRICS", "1") != "0"
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "PardosOrders")
+# Máximo de llamadas detalladas por línea de log (los totales incluyen todas)
+MAX_LOGGED_CALLS = 50
+# EMF acepta como máximo 100 valores por métrica en una línea
+MAX_METRIC_VALUES = 100
+
+READ_OPERATIONS = {"GetItem", "Query", "Scan", "BatchGetItem", "TransactGetItems"}
+WRITE_OPERATIONS = {"PutItem", "UpdateItem", "DeleteItem", "BatchWriteItem", "TransactWriteItems"}
+
+_calls = []
+_calls_lock = threading.Lock()
+
+
+def _tables_in(params):
+    if "TableName" in params:
+        return params["TableName"]
+    if "RequestItems" in params:
+        return ",".join(sorted(params["RequestItems"]))
+    if "TransactItems" in params:
+        names = {
+            action.get("TableName")
+            for item in params["TransactItems"]
+            for action in item.values()
+        }
+        return ",".join(sorted(n for n in names if n))
+    return None
+
+
+def _items_returned(parsed):
+    if "Item" in parsed:
+        return 1
+    if "Count" in parsed:
+        return parsed["Count"]
+    if "Responses" in parsed:
+        responses = parsed["Responses"]
+        if isinstance(responses, dict):  # BatchGetItem
+            return sum(len(items) for items in responses.values())
+        return sum(1 for r in responses if r.get("Item"))  # TransactGetItems
+    return 0
+
+
+def _capacity(consumed):
+    """Suma CapacityUnits de ConsumedCapacity (dict o lista por tabla)."""
+    if not consumed:
+        return 0.0
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return float(sum(c.get("CapacityUnits", 0) for c in consumed))
+
+
+def _on_params(params, model, context, **kwargs):
+    if model.name not in READ_OPERATIONS and model.name not in WRITE_OPERATIONS:
+        return
+    params.setdefault("ReturnConsumedCapacity", "TOTAL")
+    context["ddb_metrics"] = {
+        "table": _tables_in(params),
+        "index": params.get("IndexName"),
+    }
+
+
+def _on_before_call(context, **kwargs):
+    if "ddb_metrics" in context:
+        context["ddb_metrics"]["start"] = time.perf_counter()
+
+
+def _on_after_call(parsed, model, context, **kwargs):
+    call = context.get("ddb_metrics")
+    if call is None or "start" not in call:
+        return
+    capacity = _capacity(parsed.get("ConsumedCapacity"))
+    record = {
+        "op": model.name,
+        "table": call["table"],
+        "ms": round((time.perf_counter() - call["start"]) * 1000, 2),
+        "items": _items_returned(parsed),
+        "rcu": capacity if model.name in READ_OPERATIONS else 0.0,
+        "wcu": capacity if model.name in WRITE_OPERATIONS else 0.0,
+    }
+    if call["index"]:
+        record["index"] = call["index"]
+    error_code = parsed.get("Error", {}).get("Code")
+    if error_code:
+        record["error"] = error_code
+    with _calls_lock:
+        _calls.append(record)
+
+
+def instrument_client(ddb_client):
+    """Registra los hooks en un cliente de DynamoDB (una sola vez)."""
+    if not METRICS_ENABLED or getattr(ddb_client, "_pardos_instrumented", False):
+        return ddb_client
+    events = ddb_client.meta.events
+    events.register("provide-client-params.dynamodb", _on_params)
+    events.register("before-call.dynamodb", _on_before_call)
+    events.register("after-call.dynamodb", _on_after_call)
+    ddb_client._pardos_instrumented = True
+    return ddb_client
+
+
+def drain_calls():
+    """Devuelve y limpia las llamadas registradas desde el último drain."""
+    with _calls_lock:
+        calls = list(_calls)
+        _calls.clear()
+    return calls
+
+
+def tenant_of(event):
+    """tenant_id de un evento de API Gateway, EventBridge o Step Functions."""
+    if not isinstance(event, dict):
+        return None
+    return (
+        (event.get("pathParameters") or {}).get("tenantId")
+        or (event.get("detail") or {}).get("tenant_id")
+        or event.get("tenant_id")
+    )
+
+
+def latency_values(calls):
+    """
+    Latencias de las llamadas para DynamoDBLatency. Con más de
+    MAX_METRIC_VALUES llamadas se toman valores a intervalos regulares de la
+    lista ordenada (mínimo y máximo incluidos): la distribución, y con ella
+    los percentiles que calcula CloudWatch, se mantiene aproximadamente.
+    """
+    values = sorted(c["ms"] for c in calls)
+    if len(values) <= MAX_METRIC_VALUES:
+        return values or [0]
+    step = (len(values) - 1) / (MAX_METRIC_VALUES - 1)
+    return [values[round(i * step)] for i in range(MAX_METRIC_VALUES)]
+
+
+def emf_record(function_name, tenant_id, calls, duration_ms):
+    """Línea EMF con los totales de DynamoDB de una invocación."""
+    dimensions = [["Function"]]
+    record = {"Function": function_name}
+    if tenant_id:
+        dimensions.append(["Function", "Tenant"])
+        record["Tenant"] = tenant_id
+
+    record["_aws"] = {
+        "Timestamp": int(time.time() * 1000),
+        "CloudWatchMetrics": [{
+            "Namespace": METRICS_NAMESPACE,
+            "Dimensions": dimensions,
+            "Metrics": [
+                {"Name": "DynamoDBCalls", "Unit": "Count"},
+                {"Name": "DynamoDBLatency", "Unit": "Milliseconds"},
+                {"Name": "DynamoDBItemsReturned", "Unit": "Count"},
+                {"Name": "DynamoDBReadCapacityUnits", "Unit": "Count"},
+                {"Name": "DynamoDBWriteCapacityUnits", "Unit": "Count"},
+                {"Name": "InvocationDuration", "Unit": "Milliseconds"},
+            ],
+        }],
+    }
+    record.update({
+        "DynamoDBCalls": len(calls),
+        # Un valor por llamada (hasta 100): CloudWatch calcula p50/p99 de la latencia
+        "DynamoDBLatency": latency_values(calls),
+        "DynamoDBItemsReturned": sum(c["items"] for c in calls),
+        "DynamoDBReadCapacityUnits": round(sum(c["rcu"] for c in calls), 2),
+        "DynamoDBWriteCapacityUnits": round(sum(c["wcu"] for c in calls), 2),
+        "InvocationDuration": round(duration_ms, 2),
+        "calls": calls[:MAX_LOGGED_CALLS],
+    })
+    return record
+
+
+def instrumented_handler(fn):
+    """
+    Decorador para handlers de Lambda: al terminar la invocación (también si
+    falla) escribe la línea EMF con las llamadas a DynamoDB que hizo.
+    """
+    if not METRICS_ENABLED:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(event, context):
+        drain_calls()  # Restos de una invocación anterior en el mismo contenedor
+        start = time.perf_counter()
+        try:
+            return fn(event, context)
+        finally:
+            function_name = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") or fn.__module__
+            calls = drain_calls()
+            print(dumps(emf_record(function_name, tenant_of(event), calls,
+                                   (time.perf_counter() - start) * 1000)))
+
+    return wrapper
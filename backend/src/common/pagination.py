@@ -0,0 +1,54 @@
+import base64
+import json
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 100
+
+
+class InvalidPageRequest(ValueError):
+    """El cliente envió un limit o next_token que no se puede usar."""
+
+
+def parse_limit(raw_limit, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Convierte el query param ?limit= en un entero dentro de [1, maximum]."""
+    if raw_limit in (None, ""):
+        return default
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        raise InvalidPageRequest("limit must be an integer")
+    if limit < 1:
+        raise InvalidPageRequest("limit must be greater than 0")
+    return min(limit, maximum)
+
+
+def encode_token(last_evaluated_key):
+    """Serializa el LastEvaluatedKey de DynamoDB como un cursor opaco."""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(",", ":"), sort_keys=True, default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_token(token, tenant_id=None, scope=None):
+    """
+    Reconstruye el ExclusiveStartKey a partir de un cursor.
+    Si se pasa tenant_id, se rechaza un cursor emitido para otro tenant.
+    scope ({"index": ..., "status": ...}) son los campos que el cursor debe
+    traer iguales: un cursor de otro índice o filtro no se puede reanudar.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        start_key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise InvalidPageRequest("next_token is not valid")
+    if not isinstance(start_key, dict):
+        raise InvalidPageRequest("next_token is not valid")
+    if tenant_id is not None and start_key.get("tenant_id") != tenant_id:
+        raise InvalidPageRequest("next_token does not belong to this tenant")
+    for field, value in (scope or {}).items():
+        if start_key.get(field) != value:
+            raise InvalidPageRequest("next_token does not match this query")
+    return start_key
@@ -0,0 +1,53 @@
+"""
+Serialización JSON de items de DynamoDB para las respuestas de la API.
+
+boto3 devuelve números como Decimal, sets para SS/NS/BS y Binary para B.
+En lugar de recorrer y copiar el item (decimal_to_native) antes de
+json.dumps, el encoder convierte esos tipos al vuelo con un hook `default`.
+
+Si orjson está instalado se usa como backend (bastante más rápido); si no,
+se usa json de la librería estándar con la misma salida.
+"""
+import base64
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        # Entero si no tiene parte decimal; si no, float
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=lambda v: (isinstance(v, str), v))
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(bytes(obj)).decode("ascii")
+    value = getattr(obj, "value", None)  # boto3.dynamodb.types.Binary
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_std_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+if orjson is not None:
+    def dumps_bytes(obj) -> bytes:
+        return orjson.dumps(obj, default=_default)
+else:
+    def dumps_bytes(obj) -> bytes:
+        return _std_encoder.encode(obj).encode("utf-8")
+
+
+def dumps(obj) -> str:
+    """Serializa a str (lo que espera el body de una respuesta Lambda)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default).decode("utf-8")
+    return _std_encoder.encode(obj)
+
+
+BACKEND = "orjson" if orjson is not None else "json"
@@ -0,0 +1,118 @@
+"""
+Sharding de escritura de las órdenes de un tenant.
+
+Los índices de Orders usan como partition key `order_shard` = "<tenant_id>#<n>"
+en lugar de tenant_id. Con created_at / status#created_at como sort key
+(siempre crecientes) todas las escrituras de un tenant caían en la misma
+partición del índice; repartidas en N shards se reparten en N particiones
+de cada índice.
+
+Solo se reparten los índices. La tabla base sigue con (tenant_id, order_id)
+y order_id es un ULID creciente, así que las escrituras de un tenant en la
+tabla base siguen cayendo al final del rango de una sola partition key:
+su techo es el de una partición (~1000 WCU/s), con o sin shards. Repartir
+también la tabla base obligaría a cambiar su clave (y reemplazarla).
+
+El shard sale de un hash estable del order_id, así que GetItem / UpdateItem
+por (tenant_id, order_id) no cambian. Las lecturas por tenant consultan los
+N shards en paralelo y mezclan los resultados (scatter-gather).
+
+ORDER_SHARDS configura los tenants con más de un shard:
+    ORDER_SHARDS="pardos-chicken=8,otro-tenant=4"
+El resto usa un solo shard ("<tenant_id>#0"). Después de cambiar la
+configuración hay que correr migrateOrderShards para reubicar las órdenes
+existentes y reconstruir los agregados del dashboard.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_SHARDS = 32
+
+
+def _parse_shards(raw):
+    shards = {}
+    for part in (raw or "").split(","):
+        if not part.strip():
+            continue
+        tenant_id, _, count = part.partition("=")
+        shards[tenant_id.strip()] = max(1, min(int(count), MAX_SHARDS))
+    return shards
+
+
+ORDER_SHARDS = _parse_shards(os.environ.get("ORDER_SHARDS", ""))
+
+
+def shard_count(tenant_id):
+    return ORDER_SHARDS.get(tenant_id, 1)
+
+
+def shard_of(order_id, shards):
+    """Número de shard estable para un order_id (hash() de Python no lo es)."""
+    if shards <= 1:
+        return 0
+    digest = hashlib.md5(order_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % shards
+
+
+def order_shard(tenant_id, order_id):
+    return f"{tenant_id}#{shard_of(order_id, shard_count(tenant_id))}"
+
+
+def tenant_shards(tenant_id):
+    return [f"{tenant_id}#{n}" for n in range(shard_count(tenant_id))]
+
+
+def scatter(fn, shards):
+    """Ejecuta fn(shard) en paralelo. Devuelve los resultados en el orden de shards."""
+    if len(shards) == 1:
+        return [fn(shards[0])]
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        return list(pool.map(fn, shards))
+
+
+def query_page(query_shard, shards, cursors, limit, sort_attr, key_attrs):
+    """
+    Página de `limit` items, de mayor a menor `sort_attr`, mezclando los shards.
+
+    query_shard(shard, start_key) hace la query de un shard (Limit=limit,
+    ScanIndexForward=False). `cursors` es {shard: ExclusiveStartKey | "done"}
+    (un shard sin entrada empieza desde el principio). Devuelve
+    (items, cursors) para la siguiente página, o cursors=None si no hay más.
+
+    Cada shard avanza solo hasta el último item que se devolvió de él, así
+    los que se leyeron y no entraron en la página se vuelven a leer después.
+    """
+    cursors = dict(cursors or {})
+    pending = [s for s in shards if cursors.get(s) != "done"]
+    responses = dict(zip(pending, scatter(lambda s: query_shard(s, cursors.get(s)), pending)))
+
+    candidates = []
+    # Un shard cortado antes de `limit` (tope de 1 MB) puede tener items
+    # mayores que los de otro shard: no se devuelve nada por debajo de su corte.
+    cutoff = None
+    for shard, resp in responses.items():
+        items = resp.get("Items", [])
+        candidates.extend((item.get(sort_attr, ""), item.get("order_id", ""), shard, item) for item in items)
+        if items and "LastEvaluatedKey" in resp and len(items) < limit:
+            last = items[-1].get(sort_attr, "")
+            cutoff = last if cutoff is None else max(cutoff, last)
+
+    candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+    page = [c for c in candidates if cutoff is None or c[0] >= cutoff][:limit]
+
+    taken = {}
+    for _, _, shard, item in page:
+        taken.setdefault(shard, []).append(item)
+
+    for shard, resp in responses.items():
+        items = resp.get("Items", [])
+        used = taken.get(shard, [])
+        if len(used) == len(items):
+            cursors[shard] = resp.get("LastEvaluatedKey") or "done"
+        elif used:
+            cursors[shard] = {attr: used[-1][attr] for attr in key_attrs}
+
+    if all(cursors.get(s) == "done" for s in shards):
+        cursors = None
+    return [c[3] for c in page], cursors
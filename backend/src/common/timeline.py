@@ -0,0 +1,104 @@
+"""
+Timeline y tiempos por fase desnormalizados en el item de la orden.
+
+create_order guarda el primer paso y update_order_step agrega uno por cada
+cambio de estado, así get_order_metrics responde con un solo get_item en
+lugar de consultar OrderEvents completo.
+
+Atributos en la orden:
+  - timeline:      [{"status", "timestamp", "attended_by", "role"}, ...]
+  - phase_metrics: {"COOKING": {"started_at", "attended_by", "seconds"}, ...}
+                   `seconds` es el tiempo desde la creación de la orden.
+  - created_at_ms, <fase>_started_at_ms: los mismos instantes que los
+                   campos ISO, en milisegundos epoch (ver common.analytics).
+"""
+from datetime import datetime
+from decimal import Decimal
+
+# Fases con tiempo medido: (prefijo de atributos, estado, descripción)
+PHASES = [
+    ("cooking", "COOKING", "Cocinero preparando"),
+    ("packing", "PACKING", "Empacando pedido"),
+    ("delivering", "DELIVERING", "En camino al cliente"),
+    ("delivered", "DELIVERED", "Pedido entregado"),
+]
+PHASE_DESCRIPTIONS = {status: description for _, status, description in PHASES}
+
+
+def calculate_time_diff(start_time_str, end_time_str):
+    """Calcula diferencia en minutos entre dos timestamps ISO"""
+    try:
+        start = datetime.fromisoformat(start_time_str)
+        end = datetime.fromisoformat(end_time_str)
+        diff_seconds = (end - start).total_seconds()
+        return {
+            "seconds": round(diff_seconds, 2),
+            "minutes": round(diff_seconds / 60, 2),
+            "hours": round(diff_seconds / 3600, 2)
+        }
+    except:
+        return None
+
+
+def epoch_ms(moment):
+    """Milisegundos epoch de un datetime o timestamp ISO; None si no se puede leer."""
+    if isinstance(moment, str):
+        try:
+            moment = datetime.fromisoformat(moment)
+        except ValueError:
+            return None
+    if moment is None:
+        return None
+    return int(moment.timestamp() * 1000)
+
+
+def timeline_entry(status, timestamp, attended_by="N/A", role="N/A"):
+    return {
+        "status": status,
+        "timestamp": timestamp,
+        "attended_by": attended_by or "N/A",
+        "role": role or "N/A",
+    }
+
+
+def phase_entry(created_at, started_at, attended_by):
+    """Entrada de phase_metrics lista para DynamoDB (segundos como Decimal)."""
+    diff = calculate_time_diff(created_at, started_at)
+    return {
+        "started_at": started_at,
+        "attended_by": attended_by or "N/A",
+        "seconds": Decimal(str(diff["seconds"])) if diff else None,
+    }
+
+
+def legacy_phase_metrics(order):
+    """phase_metrics a partir de los campos <fase>_started_at / <fase>_by."""
+    metrics = {}
+    for phase_key, phase_status, _ in PHASES:
+        started_at = order.get(f"{phase_key}_started_at")
+        if started_at:
+            metrics[phase_status] = phase_entry(
+                order.get("created_at"), started_at, order.get(f"{phase_key}_by")
+            )
+    return metrics
+
+
+def expand_phase_metrics(stored):
+    """Formato de respuesta de la API a partir de phase_metrics guardado."""
+    phase_metrics = {}
+    for _, phase_status, description in PHASES:
+        entry = stored.get(phase_status)
+        if not entry:
+            continue
+        seconds = entry.get("seconds")
+        phase_metrics[phase_status] = {
+            "description": description,
+            "started_at": entry.get("started_at"),
+            "time_from_order_creation": None if seconds is None else {
+                "seconds": round(float(seconds), 2),
+                "minutes": round(float(seconds) / 60, 2),
+                "hours": round(float(seconds) / 3600, 2),
+            },
+            "attended_by": entry.get("attended_by", "N/A"),
+        }
+    return phase_metrics
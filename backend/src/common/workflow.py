@@ -0,0 +1,53 @@
+import os
+
+from common.aws import client
+from common.db import orders_table
+from common.serialization import dumps
+
+# STEPFUNCTIONS_ENDPOINT permite apuntar a Step Functions Local en pruebas
+STEPFUNCTIONS_ENDPOINT = os.environ.get("STEPFUNCTIONS_ENDPOINT") or None
+
+def _client():
+    return client("stepfunctions", endpoint_url=STEPFUNCTIONS_ENDPOINT)
+
+def resume_workflow(task_token: str, output: dict) -> bool:
+    """
+    Reanuda una ejecución detenida en un estado waitForTaskToken.
+    Devuelve False si el token ya no es válido (ejecución terminada o
+    expirada); en ese caso no hay nada que reanudar.
+    """
+    client = _client()
+    try:
+        client.send_task_success(taskToken=task_token, output=dumps(output))
+    except (client.exceptions.TaskTimedOut, client.exceptions.InvalidToken, client.exceptions.TaskDoesNotExist) as e:
+        print(f"Workflow token no válido, se ignora: {e}")
+        return False
+    return True
+
+def resume_order_workflow(tenant_id: str, order: dict) -> bool:
+    """
+    Reanuda el workflow que espera un cambio de estado de `order` (leída
+    después del cambio) con el estado actual. No hace nada si no hay token
+    o si el workflow ya conoce ese estado (guardó el token después del cambio).
+
+    Se reanuda y después se quita el token condicionado a que sea el mismo:
+    si algo falla en medio, el reintento vuelve a reanudar (resume_workflow
+    ignora el token ya usado) y el token no se pierde.
+    """
+    task_token = order.get("workflow_task_token")
+    if not task_token or order.get("workflow_task_status") == order.get("status"):
+        return False
+
+    resume_workflow(task_token, {"current_status": order.get("status"), "updated_at": order.get("updated_at")})
+
+    table = orders_table()
+    try:
+        table.update_item(
+            Key={"tenant_id": tenant_id, "order_id": order["order_id"]},
+            UpdateExpression="REMOVE workflow_task_token, workflow_task_status",
+            ConditionExpression="workflow_task_token = :t",
+            ExpressionAttributeValues={":t": task_token},
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        pass  # El workflow ya guardó un token nuevo
+    return True
@@ -0,0 +1,136 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from common.ids import short_order_ref
+from ms_notifications.sendgrid_client import (
+    SENDGRID_API_KEY,
+    SENDGRID_POOL_SIZE,
+    MAX_PERSONALIZATIONS,
+)
+from ms_notifications import sendgrid_client
+from ms_notifications.send_email_notification import (
+    build_sendgrid_payload,
+    generate_email_content,
+)
+
+# Tags reemplazados por SendGrid en cada personalization
+NAME_TAG = '-customer_name-'
+ORDER_TAG = '-order_ref-'
+
+
+def parse_message(record):
+    """
+    Extrae el evento de EventBridge del body de un mensaje SQS.
+    Devuelve (message_id, detail_type, detail).
+    """
+    event = json.loads(record['body'])
+    return record['messageId'], event.get('detail-type', ''), event.get('detail', {})
+
+
+def group_messages(records):
+    """
+    Agrupa los mensajes que comparten asunto y contenido (mismo tipo de evento
+    y estado) para enviarlos en un solo request con varias personalizations.
+    Devuelve (grupos, fallidos, omitidos).
+    """
+    groups = {}
+    failed = []
+    skipped = []
+
+    for record in records:
+        try:
+            message_id, detail_type, detail = parse_message(record)
+        except (KeyError, ValueError) as e:
+            print(f"Mensaje inválido {record.get('messageId')}: {e}")
+            failed.append(record.get('messageId'))
+            continue
+
+        if not detail.get('customer_email'):
+            print(f"No email provided for order {detail.get('order_id')}, skipping notification")
+            skipped.append(message_id)
+            continue
+
+        key = (detail_type, detail.get('status'))
+        groups.setdefault(key, []).append((message_id, detail))
+
+    return groups, failed, skipped
+
+
+def send_group(detail_type, status, messages):
+    """
+    Envía un grupo de mensajes en requests de hasta MAX_PERSONALIZATIONS.
+    Devuelve la lista de messageId que fallaron.
+    """
+    subject, text_template = generate_email_content(
+        detail_type=detail_type,
+        status=status,
+        order_id='',
+        customer_name=NAME_TAG,
+        order_ref=ORDER_TAG
+    )
+
+    failed = []
+    for start in range(0, len(messages), MAX_PERSONALIZATIONS):
+        chunk = messages[start:start + MAX_PERSONALIZATIONS]
+        personalizations = []
+        for _, detail in chunk:
+            customer_name = detail.get('customer_name', 'Cliente')
+            personalizations.append({
+                'to': [{'email': detail['customer_email'], 'name': customer_name}],
+                'substitutions': {
+                    NAME_TAG: customer_name,
+                    ORDER_TAG: short_order_ref(detail.get('order_id')),
+                },
+            })
+
+        try:
+            message_id = sendgrid_client.post_mail(
+                build_sendgrid_payload(personalizations, subject, text_template)
+            )
+            print(f"📧 {len(chunk)} emails {status} enviados via SendGrid (MessageId: {message_id})")
+        except Exception as e:
+            print(f"Error enviando {len(chunk)} emails {status} via SendGrid: {str(e)}")
+            failed.extend(message_id for message_id, _ in chunk)
+
+    return failed
+
+
+def handler(event, context):
+    """
+    Consumidor SQS de notificaciones por email.
+    EventBridge deja cada order.created / order.updated en la cola y esta
+    Lambda los procesa en lotes: agrupa los destinatarios con el mismo
+    contenido en un solo request de SendGrid y reutiliza las conexiones HTTP.
+
+    Responde con batchItemFailures para que SQS reintente solo los mensajes
+    que fallaron (ReportBatchItemFailures).
+    """
+    records = event.get('Records', [])
+    groups, failed, skipped = group_messages(records)
+
+    if not SENDGRID_API_KEY:
+        # Fallback: Log simulado si no hay SendGrid configurado
+        for (detail_type, status), messages in groups.items():
+            for _, detail in messages:
+                print(f"📧 EMAIL NOTIFICATION (Log - SendGrid no configurado) "
+                      f"Para: {detail['customer_email']} Estado: {status} "
+                      f"Order ID: {detail.get('order_id')}")
+        groups = {}
+
+    if groups:
+        workers = min(SENDGRID_POOL_SIZE, len(groups))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(send_group, detail_type, status, messages)
+                for (detail_type, status), messages in groups.items()
+            ]
+            for future in futures:
+                failed.extend(future.result())
+
+    print(f"Lote de {len(records)} mensajes: {len(failed)} fallidos, {len(skipped)} sin email")
+
+    return {
+        'batchItemFailures': [
+            {'itemIdentifier': message_id} for message_id in failed if message_id
+        ]
+    }
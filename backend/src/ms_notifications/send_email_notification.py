@@ -1,11 +1,10 @@
 import json
-import os
-from datetime import datetime
-import urllib.request
-import urllib.error
 
-# SendGrid API Key desde variables de entorno
-SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY', '')
+from common.ids import short_order_ref
+
+# SendGrid API Key y endpoint desde variables de entorno (ver sendgrid_client)
+from ms_notifications.sendgrid_client import SENDGRID_API_KEY, SendGridError, post_mail
+
 SENDGRID_FROM_EMAIL = 'eliseo.velasquez@utec.edu.pe'
 SENDGRID_FROM_NAME = 'Pardos Chicken'
 
@@ -120,24 +119,14 @@ def handler(event, context):
         }
 
 
-def send_email_sendgrid(to_email, to_name, subject, text_content):
+def build_sendgrid_payload(personalizations, subject, text_content):
     """
-    Envía un email usando la API de SendGrid
+    Construye el payload v3 de SendGrid. Cada personalization es un dict con
+    'to' y opcionalmente 'substitutions' (para envíos agrupados).
     """
-    url = 'https://api.sendgrid.com/v3/mail/send'
-
-    # Construir el payload según la API de SendGrid
-    payload = {
+    return {
         'personalizations': [
-            {
-                'to': [
-                    {
-                        'email': to_email,
-                        'name': to_name
-                    }
-                ],
-                'subject': subject
-            }
+            {**p, 'subject': p.get('subject', subject)} for p in personalizations
         ],
         'from': {
             'email': SENDGRID_FROM_EMAIL,
@@ -151,37 +140,30 @@ def send_email_sendgrid(to_email, to_name, subject, text_content):
         ]
     }
 
-    # Preparar la petición HTTP
-    headers = {
-        'Authorization': f'Bearer {SENDGRID_API_KEY}',
-        'Content-Type': 'application/json'
-    }
 
-    data = json.dumps(payload).encode('utf-8')
-    req = urllib.request.Request(url, data=data, headers=headers, method='POST')
+def send_email_sendgrid(to_email, to_name, subject, text_content):
+    """
+    Envía un email usando la API de SendGrid
+    """
+    payload = build_sendgrid_payload(
+        [{'to': [{'email': to_email, 'name': to_name}]}],
+        subject,
+        text_content
+    )
 
     try:
-        with urllib.request.urlopen(req) as response:
-            response_body = response.read().decode('utf-8')
-
-            # SendGrid retorna 202 Accepted para emails enviados exitosamente
-            if response.status == 202:
-                # Obtener el Message ID del header
-                message_id = response.headers.get('X-Message-Id', 'unknown')
-                return message_id
-            else:
-                raise Exception(f"SendGrid returned status {response.status}: {response_body}")
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        raise Exception(f"SendGrid API error ({e.code}): {error_body}")
+        return post_mail(payload)
+    except SendGridError:
+        raise
     except Exception as e:
         raise Exception(f"Error calling SendGrid: {str(e)}")
 
 
-def generate_email_content(detail_type, status, order_id, customer_name):
+def generate_email_content(detail_type, status, order_id, customer_name, order_ref=None):
     """
     Genera el asunto y contenido de texto del email según el tipo de evento.
+    order_ref es el número corto que se muestra (por defecto
+    common.ids.short_order_ref(order_id)).
     """
 
     status_info = {
@@ -231,7 +213,7 @@ Hola {customer_name},
 ----------------------------------------
 DETALLES DEL PEDIDO
 ----------------------------------------
-Número de Pedido: #{order_id[:8]}
+Número de Pedido: #{order_ref or short_order_ref(order_id)}
 Estado Actual: {get_status_text(status)}
 
 ----------------------------------------
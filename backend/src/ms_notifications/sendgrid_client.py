@@ -0,0 +1,120 @@
+"""
+Cliente HTTP para SendGrid con conexiones persistentes (keep-alive).
+
+Las conexiones se guardan en un pool a nivel de módulo, así que sobreviven
+entre invocaciones de un mismo contenedor Lambda y no se repite el handshake
+TLS por cada email. El endpoint es configurable (SENDGRID_API_URL) para poder
+apuntar a un servidor HTTP local en pruebas.
+"""
+import http.client
+import json
+import os
+import queue
+import threading
+from urllib.parse import urlsplit
+
+SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY', '')
+SENDGRID_API_URL = os.environ.get('SENDGRID_API_URL', 'https://api.sendgrid.com/v3/mail/send')
+SENDGRID_POOL_SIZE = int(os.environ.get('SENDGRID_POOL_SIZE', '4'))
+SENDGRID_TIMEOUT = float(os.environ.get('SENDGRID_TIMEOUT', '10'))
+
+# SendGrid acepta hasta 1000 personalizations por request
+MAX_PERSONALIZATIONS = 1000
+
+
+class SendGridError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"SendGrid API error ({status}): {body}")
+        self.status = status
+        self.body = body
+
+
+class ConnectionPool:
+    """Pool simple de http.client.HTTP(S)Connection hacia un solo host."""
+
+    def __init__(self, url, size=SENDGRID_POOL_SIZE, timeout=SENDGRID_TIMEOUT):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += f'?{parts.query}'
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _new_connection(self):
+        conn_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return conn_class(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._new_connection()
+
+    def _release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def post(self, body, headers):
+        """
+        POST al endpoint reutilizando una conexión del pool. Si una conexión
+        reciclada fue cerrada por el servidor se reintenta una vez con otra nueva.
+        Devuelve (status, headers, body).
+        """
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                conn.request('POST', self.path, body=body, headers=headers)
+                response = conn.getresponse()
+                response_body = response.read().decode('utf-8')
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, response.headers, response_body
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(SENDGRID_API_URL)
+    return _pool
+
+
+def post_mail(payload):
+    """
+    Envía un payload v3 /mail/send. Devuelve el X-Message-Id si SendGrid
+    responde 202; lanza SendGridError en cualquier otro caso.
+    """
+    headers = {
+        'Authorization': f'Bearer {SENDGRID_API_KEY}',
+        'Content-Type': 'application/json',
+        'Connection': 'keep-alive',
+    }
+    status, response_headers, response_body = get_pool().post(
+        json.dumps(payload).encode('utf-8'), headers
+    )
+
+    # SendGrid retorna 202 Accepted para emails enviados exitosamente
+    if status != 202:
+        raise SendGridError(status, response_body)
+    return response_headers.get('X-Message-Id', 'unknown')
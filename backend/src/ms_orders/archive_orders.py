@@ -0,0 +1,46 @@
+from boto3.dynamodb.types import TypeDeserializer
+
+from common.archive import archive_order
+from common.metrics import instrumented_handler
+
+_deserializer = TypeDeserializer()
+
+# Borrados hechos por el TTL de DynamoDB (no por la aplicación)
+TTL_PRINCIPAL = "dynamodb.amazonaws.com"
+
+
+def _expired_by_ttl(record):
+    identity = record.get("userIdentity") or {}
+    return record.get("eventName") == "REMOVE" and identity.get("principalId") == TTL_PRINCIPAL
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Consumidor del stream de Orders: archiva las órdenes que el TTL
+    (archive_at) borró, con su historial de OrderEvents (ver common.archive).
+
+    El stream llega filtrado a los REMOVE del TTL (filterPatterns en
+    serverless.yml); se verifica igual por si la función se conecta sin
+    filtro. Con ReportBatchItemFailures se devuelve el primer registro que
+    falló para que Lambda reintente desde ahí.
+    """
+    archived = 0
+    events_moved = 0
+    for record in event.get("Records", []):
+        if not _expired_by_ttl(record):
+            continue
+        ddb = record.get("dynamodb", {})
+        order = {k: _deserializer.deserialize(v) for k, v in (ddb.get("OldImage") or {}).items()}
+        if not order.get("order_id"):
+            continue
+        try:
+            events_moved += archive_order(order)
+        except Exception as e:
+            print(f"Error archivando la orden {order['order_id']}: {e}")
+            print(f"{archived} órdenes archivadas antes del error")
+            return {"batchItemFailures": [{"itemIdentifier": ddb["SequenceNumber"]}]}
+        archived += 1
+
+    print(f"{archived} órdenes archivadas, {events_moved} eventos movidos al archivo")
+    return {"batchItemFailures": []}
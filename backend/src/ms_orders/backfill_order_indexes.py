@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from common.archive import ARCHIVE_TTL_FIELD, archive_time
+from common.db import orders_table, order_status_key
+from common.metrics import instrumented_handler
+
+
+def delivered_archive_time(order):
+    """archive_at de una entregada antes del archivo (None si no corresponde o ya lo tiene)."""
+    if order.get("status") != "DELIVERED" or ARCHIVE_TTL_FIELD in order:
+        return None
+    delivered_at = order.get("delivered_started_at") or order.get("updated_at")
+    try:
+        return archive_time(datetime.fromisoformat(delivered_at))
+    except (TypeError, ValueError):
+        return None
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Migración única: agrega status_created_at a las órdenes antiguas para que
+    aparezcan en el índice shard-status-created-index, y archive_at a las
+    entregadas antes de common.archive para que también pasen al archivo.
+    Es idempotente.
+    """
+    table = orders_table()
+    scan_kwargs = {
+        "ProjectionExpression": (
+            "tenant_id, order_id, #s, created_at, status_created_at, "
+            "delivered_started_at, updated_at, #archive_at"
+        ),
+        "ExpressionAttributeNames": {"#s": "status", "#archive_at": ARCHIVE_TTL_FIELD},
+    }
+
+    scanned = 0
+    updated = 0
+    while True:
+        resp = table.scan(**scan_kwargs)
+        for order in resp.get("Items", []):
+            scanned += 1
+            updates = {}
+            created_at = order.get("created_at")
+            if created_at:
+                expected = order_status_key(order.get("status", "RECEIVED"), created_at)
+                if order.get("status_created_at") != expected:
+                    updates["status_created_at"] = expected
+            archive_at = delivered_archive_time(order)
+            if archive_at is not None:
+                updates[ARCHIVE_TTL_FIELD] = archive_at
+            if not updates:
+                continue
+            table.update_item(
+                Key={"tenant_id": order["tenant_id"], "order_id": order["order_id"]},
+                UpdateExpression="SET " + ", ".join(f"#f{i} = :v{i}" for i in range(len(updates))),
+                ExpressionAttributeNames={f"#f{i}": field for i, field in enumerate(updates)},
+                ExpressionAttributeValues={f":v{i}": value for i, value in enumerate(updates.values())},
+            )
+            updated += 1
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    return {"statusCode": 200, "scanned": scanned, "updated": updated}
@@ -1,10 +1,17 @@
 import json
-import uuid
-from datetime import datetime, timezone
 
-from common.db import orders_table, order_events_table
-from common.events import publish_event
+from common.db import (
+    ORDERS_TABLE, ORDER_EVENTS_TABLE, order_status_key, transact_write, transaction_canceled_error,
+)
+from common.events import outbox_record
+from common import idempotency
+from common.ids import new_order_id, order_time
+from common.serialization import dumps
+from common.sharding import order_shard
+from common.timeline import timeline_entry, epoch_ms
+from common.metrics import instrumented_handler
 
+@instrumented_handler
 def handler(event, context):
     body = json.loads(event.get("body") or "{}")
     path_params = event.get("pathParameters") or {}
@@ -17,10 +24,24 @@ def handler(event, context):
     customer_email = body.get("customer_email", "")
 
     if not items:
-        return {"statusCode": 400, "body": json.dumps({"message": "items is required"})}
+        return {"statusCode": 400, "body": dumps({"message": "items is required"})}
 
-    order_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    # Reintento de un checkout ya procesado: la respuesta guardada, sin escribir nada
+    try:
+        idempotency_key = idempotency.request_key(event, tenant_id)
+    except idempotency.IdempotencyKeyError as e:
+        return {"statusCode": 400, "body": dumps({"message": str(e)})}
+    if idempotency_key:
+        request_hash = idempotency.fingerprint(body)
+        record = idempotency.load(idempotency_key)
+        if record:
+            return idempotency.replay(record, request_hash)
+
+    # ID ordenable por tiempo (ULID); created_at es el instante del ID, así
+    # se puede derivar del order_id sin leer la orden (ver common.ids)
+    order_id = new_order_id()
+    created = order_time(order_id)
+    now = created.isoformat()
 
     order = {
         "tenant_id": tenant_id,
@@ -32,36 +53,65 @@ def handler(event, context):
         "customer_phone": customer_phone,
         "customer_email": customer_email,
         "created_at": now,
+        "created_at_ms": epoch_ms(created),
         "updated_at": now,
+        "status_created_at": order_status_key("RECEIVED", now),
+        "order_shard": order_shard(tenant_id, order_id),  # Partition key de los índices
+        # Timeline desnormalizado (ver common.timeline)
+        "timeline": [timeline_entry("RECEIVED", now, role="SYSTEM")],
+        "phase_metrics": {},
     }
 
-    orders_table().put_item(Item=order)
-
-    # Evento en tabla de eventos
-    order_events_table().put_item(
-        Item={
-            "order_id": order_id,
-            "ts": now,
-            "status": "RECEIVED",
-            "by_role": "SYSTEM",
-        }
-    )
-
-    # Publicación al bus de eventos -> Step Functions y Email Notifications
-    publish_event(
-        source="pardos.orders",
-        detail_type="order.created",
-        detail={
-            "tenant_id": tenant_id,
-            "order_id": order_id,
-            "status": "RECEIVED",
-            "customer_email": customer_email,
-            "customer_name": customer_name,
-        },
-    )
-
-    return {
+    response = {
         "statusCode": 201,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps({"order_id": order_id, "status": "RECEIVED"}),
+        "body": dumps({"order_id": order_id, "status": "RECEIVED"}),
     }
+
+    # Orden + evento inicial en una sola transacción. El evento lleva en
+    # `outbox` la publicación a EventBridge (-> Step Functions y emails), que
+    # hace publish_outbox desde el stream de OrderEvents fuera del request.
+    actions = [
+        {
+            "Put": {
+                "TableName": ORDERS_TABLE,
+                "Item": order,
+                "ConditionExpression": "attribute_not_exists(order_id)",
+            }
+        },
+        {
+            "Put": {
+                "TableName": ORDER_EVENTS_TABLE,
+                "Item": {
+                    "order_id": order_id,
+                    "ts": now,
+                    "status": "RECEIVED",
+                    "by_role": "SYSTEM",
+                    "outbox": outbox_record(
+                        source="pardos.orders",
+                        detail_type="order.created",
+                        detail={
+                            "tenant_id": tenant_id,
+                            "order_id": order_id,
+                            "status": "RECEIVED",
+                            "customer_email": customer_email,
+                            "customer_name": customer_name,
+                        },
+                    ),
+                },
+            }
+        },
+    ]
+    if idempotency_key:
+        # La respuesta queda guardada en la misma transacción que la orden
+        actions.append(idempotency.put_action(idempotency_key, request_hash, response))
+
+    try:
+        transact_write(actions)
+    except transaction_canceled_error() as e:
+        # Un reintento concurrente con la misma key ganó: devolver su respuesta
+        if idempotency_key and idempotency.lost_race(e, len(actions) - 1):
+            return idempotency.replay(idempotency.load(idempotency_key), request_hash)
+        raise
+
+    return response
@@ -1,25 +1,38 @@
-import json
-from datetime import datetime
-from boto3.dynamodb.conditions import Key
+from common.archive import get_archived_order
+from common.db import orders_table
+from common.event_log import read_events
+from common.serialization import dumps
+from common.timeline import (
+    PHASES, calculate_time_diff, timeline_entry, legacy_phase_metrics, expand_phase_metrics,
+)
+from common.metrics import instrumented_handler
 
-from common.db import orders_table, order_events_table
+# Solo lo que usa la respuesta: la lectura no crece con items ni direcciones
+METRICS_PROJECTION = ", ".join(
+    ["#s", "created_at", "customer_name", "timeline", "phase_metrics"]
+    + [f"{phase_key}_started_at, {phase_key}_by" for phase_key, _, _ in PHASES]
+)
 
 
-def calculate_time_diff(start_time_str, end_time_str):
-    """Calcula diferencia en minutos entre dos timestamps ISO"""
-    try:
-        start = datetime.fromisoformat(start_time_str)
-        end = datetime.fromisoformat(end_time_str)
-        diff_seconds = (end - start).total_seconds()
-        return {
-            "seconds": round(diff_seconds, 2),
-            "minutes": round(diff_seconds / 60, 2),
-            "hours": round(diff_seconds / 3600, 2)
-        }
-    except:
-        return None
+def metrics_etag(order_id, status, steps):
+    """Cambia con cada paso del workflow; la estimación depende solo del estado."""
+    return f'"{order_id}-{status}-{steps}"'
+
+
+def load_legacy_timeline(order_id, events=None):
+    """
+    Órdenes creadas antes del timeline desnormalizado: se arma desde
+    OrderEvents (o desde `events`, el historial de una orden archivada).
+    """
+    if events is None:
+        events = read_events(order_id, ("status", "ts", "by", "by_role"))
+    return [
+        timeline_entry(event.get("status"), event.get("ts"), event.get("by"), event.get("by_role"))
+        for event in events
+    ]
 
 
+@instrumented_handler
 def handler(event, context):
     """
     Endpoint para que el cliente vea métricas de tiempo de su orden.
@@ -32,61 +45,49 @@ def handler(event, context):
     if not tenant_id or not order_id:
         return {
             "statusCode": 400,
-            "body": json.dumps({"message": "tenantId and orderId required"})
+            "body": dumps({"message": "tenantId and orderId required"})
         }
 
-    # Obtener la orden
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+
+    # Una sola lectura: timeline y tiempos por fase vienen precalculados
+    # en la orden (los mantiene update_order_step).
     resp = orders_table().get_item(
-        Key={"tenant_id": tenant_id, "order_id": order_id}
+        Key={"tenant_id": tenant_id, "order_id": order_id},
+        ProjectionExpression=METRICS_PROJECTION,
+        ExpressionAttributeNames={"#s": "status"},
     )
 
-    if "Item" not in resp:
+    order = resp.get("Item")
+    archived_events = None
+    if order is None:
+        # Entregada hace más de ORDER_RETENTION_DAYS: está en el archivo
+        order, archived_events = get_archived_order(tenant_id, order_id, with_events=True)
+    if order is None:
         return {
             "statusCode": 404,
-            "body": json.dumps({"message": "Order not found"})
+            "body": dumps({"message": "Order not found"})
         }
 
-    order = resp["Item"]
-
-    # Obtener todos los eventos de esta orden
-    events_resp = order_events_table().query(
-        KeyConditionExpression=Key("order_id").eq(order_id),
-        ScanIndexForward=True  # Orden ascendente por timestamp
-    )
-
-    events = events_resp.get("Items", [])
-
-    # Construir timeline de la orden
-    timeline = []
-    for event in events:
-        timeline.append({
-            "status": event.get("status"),
-            "timestamp": event.get("ts"),
-            "attended_by": event.get("by", "N/A"),
-            "role": event.get("by_role", "N/A")
-        })
-
-    # Calcular tiempos de cada fase
     created_at = order.get("created_at")
-    phase_metrics = {}
+    timeline = order.get("timeline")
 
-    phases = [
-        ("cooking", "COOKING", "Cocinero preparando"),
-        ("packing", "PACKING", "Empacando pedido"),
-        ("delivering", "DELIVERING", "En camino al cliente"),
-        ("delivered", "DELIVERED", "Pedido entregado")
-    ]
+    response_headers = {
+        "Content-Type": "application/json",
+        "Cache-Control": "no-cache",  # El cliente revalida con If-None-Match
+    }
+
+    if timeline is None:
+        # Orden antigua: sin ETag, puede cambiar sin que cambie la clave
+        timeline = load_legacy_timeline(order_id, archived_events)
+    else:
+        etag = metrics_etag(order_id, order.get("status"), len(timeline))
+        response_headers["ETag"] = etag
+        if_none_match = headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return {"statusCode": 304, "headers": response_headers, "body": ""}
 
-    for phase_key, phase_status, phase_description in phases:
-        phase_start = order.get(f"{phase_key}_started_at")
-        if phase_start:
-            time_from_start = calculate_time_diff(created_at, phase_start)
-            phase_metrics[phase_status] = {
-                "description": phase_description,
-                "started_at": phase_start,
-                "time_from_order_creation": time_from_start,
-                "attended_by": order.get(f"{phase_key}_by", "N/A")
-            }
+    phase_metrics = expand_phase_metrics(order.get("phase_metrics") or legacy_phase_metrics(order))
 
     # Calcular tiempo total si está completado
     current_status = order.get("status")
@@ -135,6 +136,6 @@ def handler(event, context):
 
     return {
         "statusCode": 200,
-        "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(metrics, default=str)
+        "headers": response_headers,
+        "body": dumps(metrics)
     }
@@ -1,27 +1,82 @@
-import json
 from boto3.dynamodb.conditions import Key
-from common.db import orders_table
+from common.db import orders_table, public_order, ORDERS_STATUS_INDEX, ORDERS_CREATED_INDEX
+from common.pagination import InvalidPageRequest, parse_limit, encode_token, decode_token
+from common.sharding import tenant_shards, query_page
+from common.serialization import dumps
+from common.metrics import instrumented_handler
 
+# Cursor de la página siguiente (expuesto por CORS en serverless.yml)
+NEXT_TOKEN_HEADER = "X-Next-Token"
+
+@instrumented_handler
 def handler(event, context):
+    """
+    GET /tenants/{tenantId}/orders?status=&limit=&next_token=
+
+    Lista las órdenes de un tenant de la más reciente a la más antigua.
+    Con ?status= se consulta el índice shard + "status#created_at", así el
+    filtro se resuelve en DynamoDB y solo se lee la cola pedida. Si el
+    tenant tiene varios shards se consultan en paralelo y se mezclan.
+
+    El cuerpo sigue siendo un array de órdenes (los clientes existentes no
+    cambian); si hay más páginas el cursor va en el header X-Next-Token.
+    """
     path_params = event.get("pathParameters") or {}
     tenant_id = path_params.get("tenantId")
 
     if not tenant_id:
-        return {"statusCode": 400, "body": json.dumps({"message": "tenantId required"})}
+        return {"statusCode": 400, "body": dumps({"message": "tenantId required"})}
 
-    status_filter = (event.get("queryStringParameters") or {}).get("status")
-
-    table = orders_table()
-    resp = table.query(
-        KeyConditionExpression=Key("tenant_id").eq(tenant_id)
-    )
-    items = resp.get("Items", [])
+    query_params = event.get("queryStringParameters") or {}
+    status_filter = query_params.get("status")
 
     if status_filter:
-        items = [o for o in items if o.get("status") == status_filter]
+        index_name = ORDERS_STATUS_INDEX
+        sort_attr = "status_created_at"
+    else:
+        index_name = ORDERS_CREATED_INDEX
+        sort_attr = "created_at"
+    # El cursor solo sirve para el mismo índice y filtro que lo emitió
+    scope = {"index": index_name, "status": status_filter or ""}
+
+    try:
+        limit = parse_limit(query_params.get("limit"))
+        start_key = decode_token(query_params.get("next_token"), tenant_id=tenant_id, scope=scope)
+    except InvalidPageRequest as e:
+        return {"statusCode": 400, "body": dumps({"message": str(e)})}
+
+    def query_shard(shard, shard_start_key):
+        key_condition = Key("order_shard").eq(shard)
+        if status_filter:
+            key_condition &= Key("status_created_at").begins_with(f"{status_filter}#")
+        query_kwargs = {
+            "IndexName": index_name,
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": False,  # Más recientes primero
+            "Limit": limit,
+        }
+        if shard_start_key:
+            query_kwargs["ExclusiveStartKey"] = shard_start_key
+        return orders_table().query(**query_kwargs)
+
+    # Un cursor por shard: cada uno avanza solo hasta lo que se devolvió de él
+    shards = tenant_shards(tenant_id)
+    cursors = (start_key or {}).get("shards")
+    if start_key and (not isinstance(cursors, dict) or set(cursors) - set(shards)):
+        return {"statusCode": 400, "body": dumps({"message": "next_token is not valid"})}
+
+    orders, cursors = query_page(
+        query_shard, shards, cursors, limit, sort_attr,
+        key_attrs=("tenant_id", "order_id", "order_shard", sort_attr),
+    )
+    items = [public_order(o) for o in orders]
+    next_token = encode_token({"tenant_id": tenant_id, "shards": cursors, **scope}) if cursors else None
 
+    headers = {"Content-Type": "application/json"}
+    if next_token:
+        headers[NEXT_TOKEN_HEADER] = next_token
     return {
         "statusCode": 200,
-        "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(items),
+        "headers": headers,
+        "body": dumps(items),
     }
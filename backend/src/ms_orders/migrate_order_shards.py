@@ -0,0 +1,66 @@
+from common.db import orders_table, dashboard_table
+from common.metrics import instrumented_handler
+from common.sharding import MAX_SHARDS, order_shard
+from ms_workflow.dashboard_rollup import rollup_keys
+from ms_workflow.dashboard_seed import request_seed
+
+
+def stale_rollup_keys(tenant_id, rebuild):
+    """Registros del dashboard a borrar: los que ya no se usan, o todos si hay que reconstruir."""
+    current = set(rollup_keys(tenant_id))
+    candidates = [tenant_id] + [f"{tenant_id}#{n}" for n in range(MAX_SHARDS)]
+    return [key for key in candidates if rebuild or key not in current]
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Reubica las órdenes en sus shards según ORDER_SHARDS (ver common.sharding).
+    Correrla después de cambiar ORDER_SHARDS o para rellenar order_shard en
+    órdenes antiguas; es idempotente.
+
+    Los registros del dashboard de los tenants con órdenes movidas se borran
+    y se pide su reconstrucción a seedDashboardRollups (asíncrona; hasta que
+    termine, GET /dashboard calcula el resumen desde las órdenes). Con
+    {"rebuild_rollups": true} se borran los de todos los tenants (p. ej.
+    para agregar contadores nuevos a los registros existentes).
+    """
+    rebuild_all = bool((event or {}).get("rebuild_rollups"))
+    table = orders_table()
+    scan_kwargs = {"ProjectionExpression": "tenant_id, order_id, order_shard"}
+
+    scanned = 0
+    updated = 0
+    tenants = {}  # tenant_id -> hubo órdenes que cambiaron de shard
+    while True:
+        resp = table.scan(**scan_kwargs)
+        for order in resp.get("Items", []):
+            scanned += 1
+            tenant_id = order["tenant_id"]
+            tenants.setdefault(tenant_id, False)
+            expected = order_shard(tenant_id, order["order_id"])
+            if order.get("order_shard") == expected:
+                continue
+            table.update_item(
+                Key={"tenant_id": tenant_id, "order_id": order["order_id"]},
+                UpdateExpression="SET order_shard = :shard",
+                ExpressionAttributeValues={":shard": expected},
+            )
+            updated += 1
+            if order.get("order_shard"):
+                tenants[tenant_id] = True
+
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    deleted = 0
+    for tenant_id, moved in tenants.items():
+        rebuild = moved or rebuild_all
+        for key in stale_rollup_keys(tenant_id, rebuild=rebuild):
+            resp = dashboard_table().delete_item(Key={"tenant_id": key}, ReturnValues="ALL_OLD")
+            deleted += 1 if resp.get("Attributes") else 0
+        if rebuild:
+            request_seed(tenant_id)
+
+    return {"statusCode": 200, "scanned": scanned, "updated": updated, "rollups_deleted": deleted}
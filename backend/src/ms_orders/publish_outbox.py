@@ -0,0 +1,111 @@
+import time
+
+from boto3.dynamodb.types import TypeDeserializer
+
+from common.db import ORDERS_TABLE, orders_table
+from common.events import build_entry, put_entries
+from common.metrics import instrumented_handler
+from common.workflow import resume_order_workflow
+
+_deserializer = TypeDeserializer()
+
+MAX_BATCH_GET_ATTEMPTS = 5
+BATCH_GET_LIMIT = 100  # Claves por BatchGetItem
+
+# Campos de la orden que se leen para completar eventos y reanudar workflows
+ORDER_PROJECTION = (
+    "tenant_id, order_id, #s, updated_at, customer_email, customer_name, "
+    "workflow_task_token, workflow_task_status"
+)
+
+
+def load_orders(keys):
+    """
+    {(tenant_id, order_id): orden} con una lectura consistente por lote
+    (BatchGetItem), para ver el estado que dejó la transacción del evento.
+    """
+    orders = {}
+    keys = list(keys)
+    client = orders_table().meta.client
+    for start in range(0, len(keys), BATCH_GET_LIMIT):
+        request = {ORDERS_TABLE: {
+            "Keys": [{"tenant_id": t, "order_id": o} for t, o in keys[start:start + BATCH_GET_LIMIT]],
+            "ProjectionExpression": ORDER_PROJECTION,
+            "ExpressionAttributeNames": {"#s": "status"},
+            "ConsistentRead": True,
+        }}
+        for attempt in range(MAX_BATCH_GET_ATTEMPTS):
+            resp = client.batch_get_item(RequestItems=request)
+            for order in resp.get("Responses", {}).get(ORDERS_TABLE, []):
+                orders[(order["tenant_id"], order["order_id"])] = order
+            request = resp.get("UnprocessedKeys") or {}
+            if not request:
+                break
+            time.sleep(0.05 * (2 ** attempt))
+        else:
+            raise RuntimeError("Could not read orders for outbox events")
+    return orders
+
+
+def _order_key(outbox):
+    detail = outbox["detail"]
+    return detail["tenant_id"], detail["order_id"]
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Consumidor del stream de OrderEvents: publica en EventBridge los eventos
+    guardados en el atributo `outbox` de cada registro nuevo.
+
+    Los outbox de los pasos del workflow (ms_workflow.order_steps) piden
+    además `order_fields` (datos del cliente que se agregan al detail) y
+    `resume_workflow`: las órdenes del lote se leen juntas en un
+    BatchGetItem y se reanuda el workflow que espera cada una.
+
+    Con ReportBatchItemFailures se devuelve el primer registro que falló para
+    que Lambda reintente desde ahí sin repetir los anteriores.
+    """
+    outboxes = []  # (sequence_number, outbox)
+    for record in event.get("Records", []):
+        if record.get("eventName") != "INSERT":
+            continue
+        image = record.get("dynamodb", {}).get("NewImage", {})
+        if "outbox" not in image:
+            continue
+        outbox = _deserializer.deserialize(image["outbox"])
+        outboxes.append((record["dynamodb"]["SequenceNumber"], outbox))
+
+    if not outboxes:
+        return {"batchItemFailures": []}
+
+    needs_order = {
+        _order_key(outbox) for _, outbox in outboxes
+        if outbox.get("order_fields") or outbox.get("resume_workflow")
+    }
+    orders = load_orders(needs_order) if needs_order else {}
+
+    # Un workflow por orden, con su estado actual (aunque haya varios pasos en el lote)
+    resumed = 0
+    for tenant_id, order_id in {_order_key(o) for _, o in outboxes if o.get("resume_workflow")}:
+        order = orders.get((tenant_id, order_id))
+        if order and resume_order_workflow(tenant_id, order):
+            resumed += 1
+
+    pending = []  # (sequence_number, entry)
+    for sequence_number, outbox in outboxes:
+        detail = dict(outbox["detail"])
+        order = orders.get(_order_key(outbox)) if outbox.get("order_fields") else None
+        for field, default in (outbox.get("order_fields") or {}).items():
+            detail[field] = (order or {}).get(field, default)
+        entry = build_entry(outbox["source"], outbox["detail_type"], detail)
+        pending.append((sequence_number, entry))
+
+    failed = put_entries([entry for _, entry in pending])
+    if failed:
+        first_failed = pending[min(failed)][0]
+        print(f"{len(failed)} eventos rechazados por EventBridge, reintentando desde {first_failed}")
+        return {"batchItemFailures": [{"itemIdentifier": first_failed}]}
+
+    print(f"{len(pending)} eventos publicados desde el outbox, {resumed} workflows reanudados")
+    return {"batchItemFailures": []}
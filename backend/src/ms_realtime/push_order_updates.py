@@ -0,0 +1,65 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from common.serialization import dumps_bytes
+from common.metrics import instrumented_handler
+from ms_realtime.registry import connections_for, post, remove, tenant_channel, order_channel
+
+PUSH_CONCURRENCY = int(os.environ.get("PUSH_CONCURRENCY", "16"))
+
+# Campos del evento que viajan al navegador (nada de email ni teléfono)
+DELTA_FIELDS = ("order_id", "status", "previous_status", "customer_name", "attended_by", "by_role", "timestamp")
+
+
+def build_delta(detail_type, detail):
+    delta = {"type": detail_type}
+    delta.update({k: detail[k] for k in DELTA_FIELDS if k in detail})
+    return delta
+
+
+def fan_out(channel, data):
+    """Envía `data` a todas las conexiones del canal. Devuelve (enviados, eliminados)."""
+    connection_ids = connections_for(channel)
+    if not connection_ids:
+        return 0, 0
+
+    def send(connection_id):
+        try:
+            if post(connection_id, data):
+                return True
+            remove(channel, connection_id)  # El navegador ya se fue
+        except Exception as e:
+            print(f"Error enviando a {connection_id}: {e}")
+        return False
+
+    with ThreadPoolExecutor(max_workers=min(PUSH_CONCURRENCY, len(connection_ids))) as pool:
+        sent = sum(pool.map(send, connection_ids))
+    return sent, len(connection_ids) - sent
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Consumidor de EventBridge (order.created / order.updated): empuja el
+    cambio a las apps conectadas por WebSocket en lugar de que hagan polling.
+      - canal del tenant: app del restaurante
+      - canal de la orden: cliente siguiendo su pedido
+    """
+    detail_type = event.get("detail-type", "")
+    detail = event.get("detail") or {}
+    tenant_id = detail.get("tenant_id")
+    order_id = detail.get("order_id")
+
+    if not tenant_id or not order_id:
+        print(f"Evento sin tenant_id/order_id: {detail}")
+        return {"sent": 0}
+
+    data = dumps_bytes(build_delta(detail_type, detail))
+    sent = 0
+    for channel in (tenant_channel(tenant_id), order_channel(tenant_id, order_id)):
+        channel_sent, channel_gone = fan_out(channel, data)
+        sent += channel_sent
+        if channel_gone:
+            print(f"{channel}: {channel_gone} conexiones no recibieron el mensaje")
+
+    return {"sent": sent}
@@ -0,0 +1,93 @@
+"""
+Registro de conexiones WebSocket por canal.
+
+Tabla Connections:
+  - channel (HASH):        "tenant#<tenant_id>" (app del restaurante) o
+                           "order#<tenant_id>#<order_id>" (cliente siguiendo su pedido)
+  - connection_id (RANGE): id de API Gateway
+  - índice connection-index (connection_id) para borrar en $disconnect, que
+    no trae los query params con los que se suscribió
+  - expires_at (TTL): API Gateway corta las conexiones a las 2 horas; el TTL
+    limpia las que no llegaron a disparar $disconnect
+"""
+import os
+import time
+
+from boto3.dynamodb.conditions import Key
+
+from common.aws import client
+from common.db import connections_table
+
+CONNECTIONS_BY_ID_INDEX = "connection-index"
+CONNECTION_TTL_SECONDS = 2 * 60 * 60 + 5 * 60
+
+# https://{api-id}.execute-api.{region}.amazonaws.com/{stage}
+# Con serverless-offline: http://localhost:3001
+WEBSOCKET_API_ENDPOINT = os.environ.get("WEBSOCKET_API_ENDPOINT", "")
+
+
+def tenant_channel(tenant_id):
+    return f"tenant#{tenant_id}"
+
+
+def order_channel(tenant_id, order_id):
+    return f"order#{tenant_id}#{order_id}"
+
+
+def register(connection_id, channel, tenant_id, order_id=None):
+    item = {
+        "channel": channel,
+        "connection_id": connection_id,
+        "tenant_id": tenant_id,
+        "connected_at": int(time.time()),
+        "expires_at": int(time.time()) + CONNECTION_TTL_SECONDS,
+    }
+    if order_id:
+        item["order_id"] = order_id
+    connections_table().put_item(Item=item)
+
+
+def unregister(connection_id):
+    """Borra todas las suscripciones de una conexión."""
+    resp = connections_table().query(
+        IndexName=CONNECTIONS_BY_ID_INDEX,
+        KeyConditionExpression=Key("connection_id").eq(connection_id),
+    )
+    for item in resp.get("Items", []):
+        remove(item["channel"], connection_id)
+
+
+def remove(channel, connection_id):
+    connections_table().delete_item(Key={"channel": channel, "connection_id": connection_id})
+
+
+def connections_for(channel):
+    """connection_id suscritos a un canal (paginado, solo la clave)."""
+    connection_ids = []
+    query_kwargs = {
+        "KeyConditionExpression": Key("channel").eq(channel),
+        "ProjectionExpression": "connection_id",
+    }
+    while True:
+        resp = connections_table().query(**query_kwargs)
+        connection_ids.extend(item["connection_id"] for item in resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return connection_ids
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def management_client():
+    return client("apigatewaymanagementapi", endpoint_url=WEBSOCKET_API_ENDPOINT)
+
+
+def post(connection_id, data):
+    """
+    Envía un mensaje a una conexión. Devuelve False si la conexión ya no
+    existe (GoneException) para que el llamador la saque del registro.
+    """
+    api = management_client()
+    try:
+        api.post_to_connection(ConnectionId=connection_id, Data=data)
+    except api.exceptions.GoneException:
+        return False
+    return True
@@ -0,0 +1,25 @@
+from common.metrics import instrumented_handler
+from ms_realtime.registry import register, tenant_channel, order_channel
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    $connect del API WebSocket.
+    wss://.../{stage}?tenantId=pardos-chicken              -> cambios de todas las órdenes
+    wss://.../{stage}?tenantId=pardos-chicken&orderId=...  -> cambios de una orden
+    """
+    connection_id = event["requestContext"]["connectionId"]
+    query_params = event.get("queryStringParameters") or {}
+    tenant_id = query_params.get("tenantId")
+    order_id = query_params.get("orderId")
+
+    if not tenant_id:
+        return {"statusCode": 400, "body": "tenantId required"}
+
+    if order_id:
+        register(connection_id, order_channel(tenant_id, order_id), tenant_id, order_id)
+    else:
+        register(connection_id, tenant_channel(tenant_id), tenant_id)
+
+    return {"statusCode": 200, "body": "connected"}
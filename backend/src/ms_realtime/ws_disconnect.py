@@ -0,0 +1,9 @@
+from common.metrics import instrumented_handler
+from ms_realtime.registry import unregister
+
+
+@instrumented_handler
+def handler(event, context):
+    """$disconnect del API WebSocket: saca la conexión del registro."""
+    unregister(event["requestContext"]["connectionId"])
+    return {"statusCode": 200, "body": "disconnected"}
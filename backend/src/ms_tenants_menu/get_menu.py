@@ -1,34 +1,71 @@
-import json
-from decimal import Decimal
 from boto3.dynamodb.conditions import Key
 
 from common.db import menu_table
+from common.serialization import dumps
+from common.metrics import instrumented_handler
+from ms_tenants_menu.put_menu_item import MENU_META_ID
 
+# Cache en memoria del contenedor Lambda: tenant_id -> (menu_version, body)
+# Se invalida solo: put_menu_item incrementa menu_version en el item
+# MENU_META_ID de la tabla Menu.
+_menu_cache = {}
 
-def decimal_to_native(obj):
-    if isinstance(obj, list):
-        return [decimal_to_native(v) for v in obj]
-    if isinstance(obj, dict):
-        return {k: decimal_to_native(v) for k, v in obj.items()}
-    if isinstance(obj, Decimal):
-        return int(obj) if obj % 1 == 0 else float(obj)
-    return obj
 
+def get_menu_version(tenant_id):
+    resp = menu_table().get_item(
+        Key={"tenant_id": tenant_id, "product_id": MENU_META_ID},
+        ProjectionExpression="menu_version",
+        ConsistentRead=True,
+    )
+    return int(resp.get("Item", {}).get("menu_version", 0))
+
+
+def menu_etag(tenant_id, version):
+    return f'"{tenant_id}-v{version}"'
+
+
+def load_menu_body(tenant_id):
+    items = []
+    query_kwargs = {"KeyConditionExpression": Key("tenant_id").eq(tenant_id)}
+    while True:
+        resp = menu_table().query(**query_kwargs)
+        items.extend(i for i in resp.get("Items", []) if i.get("product_id") != MENU_META_ID)
+        if "LastEvaluatedKey" not in resp:
+            break
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
 
+    return dumps(items)
+
+
+@instrumented_handler
 def handler(event, context):
     path_params = event.get("pathParameters") or {}
     tenant_id = path_params.get("tenantId", "pardos-chicken")
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
 
-    table = menu_table()
-    resp = table.query(
-        KeyConditionExpression=Key("tenant_id").eq(tenant_id)
-    )
-    items = resp.get("Items", [])
+    # Leer la versión primero: si el menú cambia justo después, la próxima
+    # petición verá una versión nueva y recargará.
+    version = get_menu_version(tenant_id)
+    etag = menu_etag(tenant_id, version)
+    response_headers = {
+        "Content-Type": "application/json",
+        "ETag": etag,
+        "Cache-Control": "no-cache",  # El navegador revalida con If-None-Match
+    }
+
+    if_none_match = headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return {"statusCode": 304, "headers": response_headers, "body": ""}
 
-    items = decimal_to_native(items)
+    cached = _menu_cache.get(tenant_id)
+    if cached and cached[0] == version:
+        body = cached[1]
+    else:
+        body = load_menu_body(tenant_id)
+        _menu_cache[tenant_id] = (version, body)
 
     return {
         "statusCode": 200,
-        "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(items),
+        "headers": response_headers,
+        "body": body,
     }
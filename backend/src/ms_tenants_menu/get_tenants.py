@@ -1,7 +1,9 @@
-import json
 from common.db import tenants_table
+from common.serialization import dumps
+from common.metrics import instrumented_handler
 
 # Para el curso, devolvemos el tenant Pardos, pero la tabla permite más.
+@instrumented_handler
 def handler(event, context):
     table = tenants_table()
 
@@ -20,5 +22,5 @@ def handler(event, context):
     return {
         "statusCode": 200,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(items),
+        "body": dumps(items),
     }
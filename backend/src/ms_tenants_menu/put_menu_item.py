@@ -1,8 +1,24 @@
 import json
 import uuid
+from decimal import Decimal, InvalidOperation
 from common.db import menu_table
-from decimal import Decimal
+from common.serialization import dumps
+from common.metrics import instrumented_handler
 
+# Item de la tabla Menu (no es un producto) con el contador menu_version del
+# tenant. Vive en Menu y no en Tenants: la mayoría de los tenants no tiene
+# fila en Tenants y un ADD ahí crearía una sin name ni active.
+MENU_META_ID = "__meta__"
+
+def bump_menu_version(tenant_id):
+    """Incrementa el contador de versión del menú del tenant."""
+    menu_table().update_item(
+        Key={"tenant_id": tenant_id, "product_id": MENU_META_ID},
+        UpdateExpression="ADD menu_version :one",
+        ExpressionAttributeValues={":one": 1},
+    )
+
+@instrumented_handler
 def handler(event, context):
     path_params = event.get("pathParameters") or {}
     tenant_id = path_params.get("tenantId", "pardos-chicken")
@@ -12,15 +28,23 @@ def handler(event, context):
     price = body.get("price")
 
     if not name or price is None:
-        return {"statusCode": 400, "body": json.dumps({"message": "name and price required"})}
+        return {"statusCode": 400, "body": dumps({"message": "name and price required"})}
+
+    # Decimal: boto3 no acepta float (como put_menu_items_batch)
+    try:
+        price = Decimal(str(price))
+    except InvalidOperation:
+        return {"statusCode": 400, "body": dumps({"message": "price must be a number"})}
 
     product_id = body.get("product_id") or str(uuid.uuid4())
+    if product_id == MENU_META_ID:
+        return {"statusCode": 400, "body": dumps({"message": "product_id is reserved"})}
 
     item = {
         "tenant_id": tenant_id,
         "product_id": product_id,
         "name": name,
-        "price": float(price),
+        "price": price,
         "category": body.get("category", "default"),
         "description": body.get("description", ""),
         "image_url": body.get("image_url", "")
@@ -29,8 +53,11 @@ def handler(event, context):
     table = menu_table()
     table.put_item(Item=item)
 
+    # Invalidar los caches de get_menu (ETag y memoria de los contenedores)
+    bump_menu_version(tenant_id)
+
     return {
         "statusCode": 201,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(item),
+        "body": dumps(item),
     }
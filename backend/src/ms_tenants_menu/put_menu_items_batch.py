@@ -0,0 +1,155 @@
+import json
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from common.db import menu_table
+from common.serialization import dumps
+from common.metrics import instrumented_handler
+from ms_tenants_menu.put_menu_item import MENU_META_ID, bump_menu_version
+
+MAX_ITEMS = 500
+BATCH_WRITE_SIZE = 25   # Límite de BatchWriteItem
+MAX_WRITE_ATTEMPTS = 6
+
+
+def stable_product_id(tenant_id, item):
+    """
+    product_id determinístico (categoría + nombre) para items que no lo traen:
+    reimportar el mismo menú sobrescribe en lugar de duplicar.
+    """
+    seed = f"{tenant_id}/{item.get('category', 'default')}/{item['name']}".lower()
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, seed))
+
+
+def validate_item(raw):
+    """Devuelve un mensaje de error o None si el item es válido."""
+    if not isinstance(raw, dict):
+        return "item must be an object"
+    if not raw.get("name"):
+        return "name required"
+    if raw.get("price") is None:
+        return "price required"
+    if raw.get("product_id") == MENU_META_ID:
+        return "product_id is reserved"
+    try:
+        price = Decimal(str(raw["price"]))
+    except InvalidOperation:
+        return "price must be a number"
+    if not price.is_finite() or price < 0:
+        return "price must be a non-negative number"
+    return None
+
+
+def build_menu_item(tenant_id, raw):
+    return {
+        "tenant_id": tenant_id,
+        "product_id": raw.get("product_id") or stable_product_id(tenant_id, raw),
+        "name": raw["name"],
+        "price": Decimal(str(raw["price"])),
+        "category": raw.get("category", "default"),
+        "description": raw.get("description", ""),
+        "image_url": raw.get("image_url", "")
+    }
+
+
+def batch_put(table, items):
+    """
+    Escribe items con BatchWriteItem en grupos de 25 y reintenta los
+    UnprocessedItems con backoff exponencial. Devuelve los product_id que
+    no se pudieron escribir.
+    """
+    client = table.meta.client
+    failed = set()
+
+    for start in range(0, len(items), BATCH_WRITE_SIZE):
+        chunk = items[start:start + BATCH_WRITE_SIZE]
+        pending = {table.name: [{"PutRequest": {"Item": item}} for item in chunk]}
+
+        for attempt in range(MAX_WRITE_ATTEMPTS):
+            resp = client.batch_write_item(RequestItems=pending)
+            pending = resp.get("UnprocessedItems") or {}
+            if not pending:
+                break
+            time.sleep(min(0.05 * (2 ** attempt), 1.0))
+
+        for request in pending.get(table.name, []):
+            failed.add(request["PutRequest"]["Item"]["product_id"])
+
+    return failed
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    POST /tenants/{tenantId}/menu:batch
+    Body: {"items": [{"name", "price", "category", ...}, ...]}
+
+    Valida todo el lote antes de escribir; si algún item es inválido no se
+    escribe nada. Responde con el resultado de cada item en el mismo orden.
+    """
+    path_params = event.get("pathParameters") or {}
+    tenant_id = path_params.get("tenantId", "pardos-chicken")
+
+    try:
+        body = json.loads(event.get("body") or "{}")
+    except ValueError:
+        return {"statusCode": 400, "body": dumps({"message": "body must be valid JSON"})}
+
+    raw_items = body.get("items") if isinstance(body, dict) else body
+    if not isinstance(raw_items, list) or not raw_items:
+        return {"statusCode": 400, "body": dumps({"message": "items is required"})}
+    if len(raw_items) > MAX_ITEMS:
+        return {"statusCode": 400, "body": dumps({"message": f"at most {MAX_ITEMS} items per batch"})}
+
+    # Validación completa antes de tocar la tabla
+    results = []
+    items = []
+    seen = {}
+    for index, raw in enumerate(raw_items):
+        error = validate_item(raw)
+        item = None
+        if not error:
+            item = build_menu_item(tenant_id, raw)
+            if item["product_id"] in seen:
+                error = f"duplicate product_id (same as item {seen[item['product_id']]})"
+            else:
+                seen[item["product_id"]] = index
+        results.append({
+            "index": index,
+            "product_id": item["product_id"] if item else (raw.get("product_id") if isinstance(raw, dict) else None),
+            "status": "error" if error else "valid",
+            **({"error": error} if error else {}),
+        })
+        if not error:
+            items.append(item)
+
+    if len(items) != len(raw_items):
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": dumps({
+                "message": "validation failed, nothing was written",
+                "results": [r for r in results if r["status"] == "error"],
+            }),
+        }
+
+    failed = batch_put(menu_table(), items)
+    for result in results:
+        result["status"] = "failed" if result["product_id"] in failed else "written"
+        if result["status"] == "failed":
+            result["error"] = "unprocessed after retries"
+
+    written = len(items) - len(failed)
+    if written:
+        bump_menu_version(tenant_id)
+
+    return {
+        "statusCode": 207 if failed else 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": dumps({
+            "written": written,
+            "failed": len(failed),
+            "results": results,
+        }),
+    }
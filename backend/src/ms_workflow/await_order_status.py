@@ -0,0 +1,52 @@
+from common.db import orders_table
+from common.workflow import resume_workflow
+from common.metrics import instrumented_handler
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Lambda invocada por Step Functions con .waitForTaskToken.
+    Guarda el task token en la orden para que el workflow se reanude cuando
+    el estado cambie (publish_outbox, al publicar el order.updated). Si el
+    estado ya cambió antes de guardar el token, reanuda el workflow de
+    inmediato.
+    """
+    tenant_id = event.get("tenant_id")
+    order_id = event.get("order_id")
+    known_status = event.get("known_status")
+    task_token = event.get("task_token")
+
+    if not tenant_id or not order_id or not task_token:
+        raise ValueError("tenant_id, order_id and task_token required")
+
+    table = orders_table()
+    try:
+        # Solo se guarda si la orden sigue en el estado que el workflow conoce.
+        # Cuando el estado cambia, publish_outbox reanuda con este token
+        # (common.workflow.resume_order_workflow) y lo quita.
+        table.update_item(
+            Key={"tenant_id": tenant_id, "order_id": order_id},
+            UpdateExpression="SET workflow_task_token = :t, workflow_task_status = :known",
+            ConditionExpression="attribute_exists(order_id) AND #s = :known",
+            ExpressionAttributeNames={"#s": "status"},
+            ExpressionAttributeValues={":t": task_token, ":known": known_status},
+        )
+        return {"registered": True}
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        pass
+
+    resp = table.get_item(
+        Key={"tenant_id": tenant_id, "order_id": order_id},
+        ProjectionExpression="#s, updated_at",
+        ExpressionAttributeNames={"#s": "status"},
+    )
+    if "Item" not in resp:
+        raise LookupError(f"Order {order_id} not found")
+
+    order = resp["Item"]
+    resume_workflow(task_token, {
+        "current_status": order.get("status"),
+        "updated_at": order.get("updated_at"),
+    })
+    return {"registered": False, "current_status": order.get("status")}
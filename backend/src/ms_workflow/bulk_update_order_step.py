@@ -0,0 +1,81 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from common.serialization import dumps
+from common.metrics import instrumented_handler
+from ms_workflow.order_steps import VALID_STATES, StepError, apply_step
+
+# Órdenes por request y transacciones en paralelo
+MAX_BULK_ORDERS = 50
+BULK_WORKERS = 10
+
+
+def _step(tenant_id, order_id, new_status, attended_by, role):
+    """Resultado de un paso para la respuesta: {"order_id", "statusCode", ...}."""
+    try:
+        body = apply_step(tenant_id, order_id, new_status, attended_by=attended_by, role=role)
+        return {"statusCode": 200, **body}
+    except StepError as e:
+        return {"order_id": order_id, "statusCode": e.status_code, **e.body}
+    except Exception as e:
+        print(f"Error aplicando {new_status} a la orden {order_id}: {e}")
+        return {"order_id": order_id, "statusCode": 500, "message": "Internal error"}
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    POST /tenants/{tenantId}/orders:step
+    Body: {"order_ids": [...], "status": "DELIVERING", "attended_by": "...", "role": "..."}
+
+    Mismo paso para varias órdenes (p. ej. un repartidor que sale con ocho
+    pedidos). Cada orden es una transacción condicional independiente
+    (ms_workflow.order_steps), en paralelo: que una falle no afecta a las
+    demás. Los order.updated salen por el outbox y publish_outbox los
+    publica en lotes.
+    """
+    path_params = event.get("pathParameters") or {}
+    tenant_id = path_params.get("tenantId")
+
+    if not tenant_id:
+        return {"statusCode": 400, "body": dumps({"message": "tenantId required"})}
+
+    try:
+        body = json.loads(event.get("body") or "{}")
+    except ValueError:
+        return {"statusCode": 400, "body": dumps({"message": "body must be valid JSON"})}
+    if not isinstance(body, dict):
+        return {"statusCode": 400, "body": dumps({"message": "body must be a JSON object"})}
+
+    new_status = body.get("status")
+    attended_by = body.get("attended_by", "")
+    role = body.get("role", "")
+    raw_ids = body.get("order_ids")
+
+    if new_status not in VALID_STATES:
+        return {"statusCode": 400, "body": dumps({"message": "Invalid status"})}
+    # Validación antes de tocar la lista: tipo y tamaño del request tal como llegó
+    if not isinstance(raw_ids, list) or not raw_ids or not all(isinstance(o, str) and o for o in raw_ids):
+        return {"statusCode": 400, "body": dumps({"message": "order_ids must be a non-empty list of ids"})}
+    if len(raw_ids) > MAX_BULK_ORDERS:
+        return {
+            "statusCode": 400,
+            "body": dumps({"message": f"At most {MAX_BULK_ORDERS} orders per request"}),
+        }
+    order_ids = list(dict.fromkeys(raw_ids))  # Sin repetidos, en orden
+
+    with ThreadPoolExecutor(max_workers=min(BULK_WORKERS, len(order_ids))) as pool:
+        results = list(pool.map(
+            lambda order_id: _step(tenant_id, order_id, new_status, attended_by, role), order_ids
+        ))
+
+    updated = sum(1 for r in results if r["statusCode"] == 200)
+    return {
+        "statusCode": 200,
+        "body": dumps({
+            "status": new_status,
+            "updated": updated,
+            "failed": len(results) - updated,
+            "results": results,
+        }),
+    }
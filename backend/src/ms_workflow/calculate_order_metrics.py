@@ -1,15 +1,50 @@
-import json
-from datetime import datetime, timezone
-from common.db import order_events_table
-from boto3.dynamodb.conditions import Key
+from datetime import datetime
+from decimal import Decimal
+from common.db import orders_table
+from common.event_log import read_events
+from common.metrics import instrumented_handler
 
+# Campos que usa el cálculo (sin `outbox` ni el resto del evento)
+EVENT_ATTRIBUTES = ("status", "ts", "by", "by_role")
 
+
+def save_final_metrics(tenant_id, order_id, metrics):
+    """
+    Guarda en la orden (final_metrics) el resumen de las métricas: segundos
+    por estado y total. El detalle por transición no se guarda, ya está en
+    el timeline de la orden.
+    """
+    final_metrics = {
+        "total_events": metrics["total_events"],
+        "state_seconds": {
+            status: Decimal(str(duration["seconds"]))
+            for status, duration in metrics["state_durations"].items()
+        },
+    }
+    if "total_duration" in metrics:
+        final_metrics["total_seconds"] = Decimal(str(metrics["total_duration"]["seconds"]))
+
+    table = orders_table()
+    try:
+        table.update_item(
+            Key={"tenant_id": tenant_id, "order_id": order_id},
+            UpdateExpression="SET final_metrics = :m",
+            ConditionExpression="attribute_exists(order_id)",
+            ExpressionAttributeValues={":m": final_metrics},
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        print(f"Orden {order_id} no encontrada: no se guardan sus métricas finales")
+
+
+@instrumented_handler
 def handler(event, context):
     """
     Lambda para calcular métricas de tiempo de una orden.
-    Calcula tiempo en cada estado del workflow.
+    Calcula tiempo en cada estado del workflow. Con tenant_id (así la llama
+    el workflow) guarda además el resumen en la orden.
     """
     order_id = event.get("order_id")
+    tenant_id = event.get("tenant_id")
 
     if not order_id:
         return {
@@ -18,12 +53,7 @@ def handler(event, context):
         }
 
     # Obtener todos los eventos de esta orden ordenados por tiempo
-    events_resp = order_events_table().query(
-        KeyConditionExpression=Key("order_id").eq(order_id),
-        ScanIndexForward=True  # Orden ascendente por timestamp
-    )
-
-    events = events_resp.get("Items", [])
+    events = read_events(order_id, EVENT_ATTRIBUTES)
 
     if not events:
         return {
@@ -79,6 +109,9 @@ def handler(event, context):
             "hours": round(total_seconds / 3600, 2)
         }
 
+    if tenant_id:
+        save_final_metrics(tenant_id, order_id, metrics)
+
     return {
         "statusCode": 200,
         "metrics": metrics
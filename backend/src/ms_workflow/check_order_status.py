@@ -1,12 +1,22 @@
-import json
-from common.db import orders_table, order_events_table
-from boto3.dynamodb.conditions import Key
+from common.db import orders_table
+from common.event_log import transition_times
+from common.metrics import instrumented_handler
 
+# Atributos que lee el modo probe: lo único que necesita un Choice del workflow
+PROBE_PROJECTION = "#s, updated_at"
 
+
+@instrumented_handler
 def handler(event, context):
     """
     Lambda llamada por Step Functions para verificar el estado actual de una orden.
-    Retorna el estado actual y los tiempos registrados.
+    Retorna el estado actual y cuándo entró a cada estado (no el historial
+    completo: el resultado viaja en el estado de la ejecución).
+
+    Con "mode": "probe" solo lee status y updated_at (sin OrderEvents) y
+    devuelve esos dos campos: es lo que usan los workflows en cada
+    verificación, así que el costo y el tamaño del estado no crecen con el
+    historial de la orden.
     """
     tenant_id = event.get("tenant_id")
     order_id = event.get("order_id")
@@ -17,9 +27,13 @@ def handler(event, context):
             "error": "tenant_id and order_id required"
         }
 
+    probe = event.get("mode") == "probe"
+
     # Obtener la orden actual
     resp = orders_table().get_item(
-        Key={"tenant_id": tenant_id, "order_id": order_id}
+        Key={"tenant_id": tenant_id, "order_id": order_id},
+        ProjectionExpression=PROBE_PROJECTION if probe else "#s, created_at, updated_at",
+        ExpressionAttributeNames={"#s": "status"},
     )
 
     if "Item" not in resp:
@@ -29,14 +43,14 @@ def handler(event, context):
         }
 
     order = resp["Item"]
+    if probe:
+        return {
+            "statusCode": 200,
+            "current_status": order.get("status"),
+            "updated_at": order.get("updated_at"),
+        }
 
-    # Obtener todos los eventos de esta orden para calcular tiempos
-    events_resp = order_events_table().query(
-        KeyConditionExpression=Key("order_id").eq(order_id),
-        ScanIndexForward=True  # Ordenar por timestamp ascendente
-    )
-
-    events = events_resp.get("Items", [])
+    transitions = transition_times(order_id)
 
     return {
         "statusCode": 200,
@@ -45,6 +59,6 @@ def handler(event, context):
         "current_status": order.get("status"),
         "created_at": order.get("created_at"),
         "updated_at": order.get("updated_at"),
-        "workflow_events": events,
-        "total_events": len(events)
+        "transitions": transitions,
+        "total_events": len(transitions)
     }
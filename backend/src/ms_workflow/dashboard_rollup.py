@@ -0,0 +1,348 @@
+"""
+Agregado incremental del dashboard por tenant.
+
+En lugar de leer todas las órdenes en cada GET /dashboard, se mantiene un
+registro por tenant en la tabla de rollups con:
+  - status_<ESTADO>:         cantidad de órdenes en cada estado
+  - total_orders
+  - sum_<fase>_minutes / n_<fase>: sumas y conteos para los promedios
+  - hist_<fase>_<i>:         órdenes por bucket del histograma de la fase
+                             (common.analytics), de donde salen los percentiles
+  - recent_orders:           las RECENT_ORDERS_LIMIT órdenes más recientes
+  - recent_version:          versión para actualizar recent_orders sin carreras
+
+Los contadores usan ADD (atómico); cuando cambia recent_orders la escritura
+se condiciona a recent_version y se reintenta si otro evento ganó.
+
+Cada transición se aplica una sola vez: EventBridge entrega al menos una
+vez y publish_outbox reenvía desde el primer fallo, así que un evento
+puede llegar repetido. El ADD va en una transacción con el Put de una
+marca "<registro>#<order_id>#<estado>" en la tabla DashboardApplied,
+condicionado a que no exista; si ya existe, el evento se ignora. Las
+marcas llevan la `generation` del registro (cambia cada vez que se crea
+de nuevo, p. ej. al reconstruirlo), así las de un registro anterior no
+cuentan, y expiran por TTL después de APPLIED_TTL_SECONDS.
+
+Los registros se crean fuera de las peticiones (ms_workflow.dashboard_seed):
+mientras no existan, los eventos no suman (el seed ya los cuenta) y
+GET /dashboard calcula el resumen desde las órdenes.
+
+Si el tenant tiene varios shards (common.sharding) hay un registro por shard
+("<tenant_id>#<n>") para no concentrar todas las escrituras en un solo item;
+load_rollup los lee juntos y merge_rollups los combina.
+"""
+import time
+import uuid
+from decimal import Decimal
+
+from common.analytics import (
+    TIMED_PHASES, HISTOGRAM_EDGES, bucket_index, histogram_buckets, order_phase_minutes,
+    percentiles_from_histogram,
+)
+from common.db import (
+    DASHBOARD_APPLIED_TABLE, DASHBOARD_TABLE, dashboard_table, transact_write,
+    transaction_canceled_error,
+)
+from common.sharding import order_shard, shard_count, tenant_shards
+from common.timeline import calculate_time_diff
+
+RECENT_ORDERS_LIMIT = 10
+MAX_WRITE_ATTEMPTS = 5
+
+# Vida de las marcas de transiciones aplicadas: más que los reintentos de
+# EventBridge (24 h) más la retención del stream de OrderEvents (24 h)
+APPLIED_TTL_SECONDS = 3 * 24 * 3600
+
+
+def _minutes_between(start, end):
+    diff = calculate_time_diff(start, end)
+    return diff["minutes"] if diff else None
+
+
+def get_order_timeline_metrics(order):
+    """Calcula métricas de tiempo para una orden individual"""
+    metrics = {
+        "order_id": order.get("order_id"),
+        "status": order.get("status"),
+        "created_at": order.get("created_at"),
+        "customer_name": order.get("customer_name", "Sin nombre"),
+        "customer_address": order.get("customer_address", "Sin dirección"),
+        "customer_phone": order.get("customer_phone", ""),
+        "customer_email": order.get("customer_email", ""),
+        "items": order.get("items", []),
+        "phases": {}
+    }
+
+    created_at = order.get("created_at")
+
+    # Analizar cada fase del workflow
+    phases = ["cooking", "packing", "delivering", "delivered"]
+    for phase in phases:
+        phase_start = order.get(f"{phase}_started_at")
+        if phase_start:
+            time_from_creation = _minutes_between(created_at, phase_start)
+            metrics["phases"][phase] = {
+                "started_at": phase_start,
+                "time_from_creation_minutes": time_from_creation,
+                "attended_by": order.get(f"{phase}_by", "N/A")
+            }
+
+    # Calcular tiempo total si la orden está completada
+    if order.get("status") == "DELIVERED" and order.get("delivered_started_at"):
+        total_time = _minutes_between(created_at, order.get("delivered_started_at"))
+        metrics["total_time_minutes"] = total_time
+
+    return metrics
+
+
+def to_dynamo(obj):
+    """DynamoDB no acepta float: convierte a Decimal recursivamente."""
+    if isinstance(obj, list):
+        return [to_dynamo(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: to_dynamo(v) for k, v in obj.items()}
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    return obj
+
+
+def rollup_key(tenant_id, order_id):
+    """Registro del agregado al que suma una orden."""
+    return tenant_id if shard_count(tenant_id) == 1 else order_shard(tenant_id, order_id)
+
+
+def rollup_keys(tenant_id):
+    return [tenant_id] if shard_count(tenant_id) == 1 else tenant_shards(tenant_id)
+
+
+def applied_key(key, order_id, status):
+    """Marca de que la transición de la orden a `status` ya se sumó al registro `key`."""
+    return f"{key}#{order_id}#{status}"
+
+
+def applied_put(key, generation, order_id, status):
+    """Put de la marca; falla si la transición ya se aplicó en esta generación del registro."""
+    return {
+        "TableName": DASHBOARD_APPLIED_TABLE,
+        "Item": {
+            "applied_id": applied_key(key, order_id, status),
+            "generation": generation,
+            "expires_at": int(time.time()) + APPLIED_TTL_SECONDS,
+        },
+        "ConditionExpression": "attribute_not_exists(applied_id) OR generation <> :gen",
+        "ExpressionAttributeValues": {":gen": generation},
+    }
+
+
+def rollup_ready(rollup):
+    """El registro existe y su seed terminó: ya se puede servir."""
+    return rollup is not None and not rollup.get("seeding")
+
+
+def load_rollup(tenant_id):
+    """
+    Agregado completo del tenant: un get_item, o un batch_get_item de los
+    registros por shard combinados. None si falta algún registro o su
+    seed no terminó (no se crean aquí, ver ms_workflow.dashboard_seed).
+    """
+    keys = rollup_keys(tenant_id)
+    table = dashboard_table()
+
+    if len(keys) == 1:
+        rollup = table.get_item(Key={"tenant_id": tenant_id}).get("Item")
+        return rollup if rollup_ready(rollup) else None
+
+    found = {}
+    request = {DASHBOARD_TABLE: {"Keys": [{"tenant_id": key} for key in keys]}}
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        resp = table.meta.client.batch_get_item(RequestItems=request)
+        for item in resp.get("Responses", {}).get(DASHBOARD_TABLE, []):
+            found[item["tenant_id"]] = item
+        request = resp.get("UnprocessedKeys") or {}
+        if not request:
+            break
+        time.sleep(0.05 * (2 ** attempt))
+
+    if not all(rollup_ready(found.get(key)) for key in keys):
+        return None
+    return merge_rollups(tenant_id, [found[key] for key in keys])
+
+
+def merge_rollups(tenant_id, rollups):
+    """Suma los registros por shard en uno solo con la forma de un registro normal."""
+    merged = {"tenant_id": tenant_id, "recent_orders": []}
+    for rollup in rollups:
+        for attr, value in rollup.items():
+            if attr in ("tenant_id", "recent_version", "generation", "seeding_started"):
+                continue
+            if attr == "recent_orders":
+                merged["recent_orders"].extend(value)
+            elif isinstance(value, Decimal):
+                merged[attr] = merged.get(attr, 0) + value
+    merged["recent_orders"] = sorted(
+        merged["recent_orders"], key=lambda x: x.get("created_at", ""), reverse=True
+    )[:RECENT_ORDERS_LIMIT]
+    return merged
+
+
+def summary_from_rollup(rollup):
+    """Transforma el registro agregado en la respuesta de GET /dashboard."""
+    by_status = {
+        key[len("status_"):]: int(value)
+        for key, value in rollup.items()
+        if key.startswith("status_") and value
+    }
+    total_orders = int(rollup.get("total_orders", 0))
+    completed = by_status.get("DELIVERED", 0)
+
+    def average(phase):
+        count = rollup.get(f"n_{phase}", 0)
+        if not count:
+            return 0
+        return round(float(rollup.get(f"sum_{phase}_minutes", 0)) / float(count), 2)
+
+    def phase_histogram(phase):
+        return [rollup.get(f"hist_{phase}_{i}", 0) for i in range(len(HISTOGRAM_EDGES))]
+
+    avg_total_time = average("total")
+    phases = [phase for phase, _, _ in TIMED_PHASES]
+
+    return {
+        "tenant_id": rollup.get("tenant_id"),
+        "total_orders": total_orders,
+        "by_status": by_status,
+        "completed_orders": completed,
+        "in_progress_orders": total_orders - completed,
+        "average_times": {
+            "total_delivery_minutes": avg_total_time,
+            "total_delivery_hours": round(avg_total_time / 60, 2) if avg_total_time else 0,
+            "phases": {
+                "cooking_minutes": average("cooking"),
+                "packing_minutes": average("packing"),
+                "delivering_minutes": average("delivering")
+            }
+        },
+        # Aproximados desde el histograma de cada fase (en minutos)
+        "percentiles": {phase: percentiles_from_histogram(phase_histogram(phase)) for phase in phases},
+        "histograms": {phase: histogram_buckets(phase_histogram(phase)) for phase in phases},
+        "recent_orders": rollup.get("recent_orders", [])
+    }
+
+
+def counter_deltas(order, status, previous_status, is_new):
+    """Incrementos ADD para contadores y sumas producidos por un evento."""
+    deltas = {}
+    if is_new:
+        deltas["total_orders"] = 1
+    elif previous_status:
+        deltas[f"status_{previous_status}"] = -1
+    deltas[f"status_{status}"] = deltas.get(f"status_{status}", 0) + 1
+
+    if status == "DELIVERED" and previous_status != "DELIVERED":
+        for phase, minutes in order_phase_minutes(order).items():
+            deltas[f"sum_{phase}_minutes"] = minutes
+            deltas[f"n_{phase}"] = 1
+            deltas[f"hist_{phase}_{bucket_index(minutes)}"] = 1
+    return deltas
+
+
+def merge_recent(recent, entry):
+    """Inserta o reemplaza la orden en la lista de recientes. None si no cambia."""
+    others = [o for o in recent if o.get("order_id") != entry["order_id"]]
+    if len(others) == len(recent) and len(recent) >= RECENT_ORDERS_LIMIT:
+        oldest = min(o.get("created_at", "") for o in recent)
+        if (entry.get("created_at") or "") <= oldest:
+            return None
+    merged = sorted(others + [entry], key=lambda x: x.get("created_at", ""), reverse=True)
+    return merged[:RECENT_ORDERS_LIMIT]
+
+
+def _assign_generation(key):
+    """Registros creados antes de las marcas de transiciones: les da una generación."""
+    table = dashboard_table()
+    try:
+        table.update_item(
+            Key={"tenant_id": key},
+            UpdateExpression="SET generation = :gen",
+            ConditionExpression="attribute_exists(tenant_id) AND attribute_not_exists(generation)",
+            ExpressionAttributeValues={":gen": uuid.uuid4().hex},
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        pass  # Ya la tiene, o el registro se borró
+
+
+def apply_order_change(tenant_id, order, status, previous_status=None, is_new=False):
+    """
+    Aplica al agregado del tenant una transición previous_status -> status
+    (o la creación de la orden). `order` es el item actual de la tabla Orders,
+    usado para los tiempos de fase y la entrada de recent_orders.
+
+    Devuelve True si la sumó, False si ya estaba aplicada (evento repetido,
+    o incluida en el seed del registro) y None si el registro todavía no
+    existe: el seed que lo cree la va a contar (hay que pedirlo).
+    """
+    key = rollup_key(tenant_id, order["order_id"])
+    table = dashboard_table()
+    deltas = to_dynamo(counter_deltas(order, status, previous_status, is_new))
+    entry = to_dynamo(get_order_timeline_metrics(order))
+
+    names = {}
+    values = {}
+    add_clauses = []
+    for i, (attr, delta) in enumerate(deltas.items()):
+        names[f"#c{i}"] = attr
+        values[f":c{i}"] = delta
+        add_clauses.append(f"#c{i} :c{i}")
+
+    for _ in range(MAX_WRITE_ATTEMPTS):
+        current = table.get_item(
+            Key={"tenant_id": key},
+            ProjectionExpression="tenant_id, recent_orders, recent_version, generation",
+            ConsistentRead=True,
+        ).get("Item")
+
+        if not current:
+            return None
+        generation = current.get("generation")
+        if generation is None:
+            _assign_generation(key)
+            continue
+
+        version = current.get("recent_version", 0)
+        recent = merge_recent(current.get("recent_orders", []), entry)
+
+        update = {
+            "TableName": DASHBOARD_TABLE,
+            "Key": {"tenant_id": key},
+            "ExpressionAttributeNames": dict(names),
+            "ExpressionAttributeValues": dict(values, **{":gen": generation}),
+            "ConditionExpression": "generation = :gen",
+        }
+        expression = "ADD " + ", ".join(add_clauses)
+
+        if recent is not None:
+            expression = "SET recent_orders = :recent, recent_version = :next_version " + expression
+            update["ExpressionAttributeValues"].update({
+                ":recent": recent,
+                ":next_version": version + 1,
+                ":version": version,
+            })
+            update["ConditionExpression"] += (
+                " AND (attribute_not_exists(recent_version) OR recent_version = :version)"
+            )
+
+        update["UpdateExpression"] = expression
+
+        try:
+            transact_write([
+                {"Put": applied_put(key, generation, order["order_id"], status)},
+                {"Update": update},
+            ])
+            return True
+        except transaction_canceled_error() as e:
+            reasons = e.response.get("CancellationReasons") or []
+            if reasons and reasons[0].get("Code") == "ConditionalCheckFailed":
+                return False  # Transición ya aplicada
+            continue  # Otro evento actualizó recent_orders o el registro cambió; releer y reintentar
+
+    raise RuntimeError(f"Could not update dashboard rollup for tenant {tenant_id}")
@@ -0,0 +1,264 @@
+"""
+Creación de los registros del dashboard (ver ms_workflow.dashboard_rollup).
+
+Un registro se construye leyendo todas las órdenes del tenant (Orders y el
+archivo, common.archive), así que no se hace en el camino de una petición:
+lo hace seedDashboardRollups (ms_workflow/seed_dashboard_rollups.py), que
+get_dashboard_summary y update_dashboard_rollup invocan de forma
+asíncrona (request_seed) cuando falta un registro. Mientras tanto GET
+/dashboard calcula el resumen desde las órdenes (fallback_rollup).
+
+El seed reclama el registro (vacío, `seeding`) antes de leer las órdenes:
+desde ese momento los eventos suman con su marca. De las órdenes que
+todavía pueden recibir eventos (actualizadas dentro de APPLIED_TTL_SECONDS)
+solo cuenta las transiciones cuya marca puede crear, así una transición
+se suma una sola vez, la aplique el evento o el seed.
+"""
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from boto3.dynamodb.conditions import Key
+
+from common.analytics import PhaseStats, chunks, phase_columns
+from common.archive import archived_tenant_orders
+from common.aws import client
+from common.db import dashboard_table, dashboard_applied_table, orders_table
+from common.serialization import dumps
+from ms_workflow.dashboard_rollup import (
+    APPLIED_TTL_SECONDS, MAX_WRITE_ATTEMPTS, RECENT_ORDERS_LIMIT, applied_put, counter_deltas,
+    get_order_timeline_metrics, merge_recent, rollup_key, rollup_keys, to_dynamo,
+)
+from ms_workflow.order_steps import VALID_STATES
+
+# Lambda que hace el seed (vacío: no se pide, p. ej. en pruebas locales)
+DASHBOARD_SEED_FUNCTION = os.environ.get("DASHBOARD_SEED_FUNCTION", "")
+# Un seed que no terminó en este tiempo (timeout de la Lambda) se puede reclamar
+SEED_TIMEOUT_SECONDS = 900
+# Marcas escritas en paralelo durante el seed
+SEED_WORKERS = 16
+
+
+def build_rollup(tenant_id, orders):
+    """Construye el agregado completo a partir de todas las órdenes."""
+    rollup = {"tenant_id": tenant_id, "total_orders": len(orders), "recent_version": 0}
+
+    for order in orders:
+        status_attr = f"status_{order.get('status', 'UNKNOWN')}"
+        rollup[status_attr] = rollup.get(status_attr, 0) + 1
+
+    # Tiempos de las entregadas, por tandas (columnas, ver common.analytics)
+    phases = {}
+    for chunk in chunks(o for o in orders if o.get("status") == "DELIVERED"):
+        _, minutes = phase_columns(chunk)
+        for phase, values in minutes.items():
+            phases.setdefault(phase, PhaseStats()).add(values)
+    for phase, stats in phases.items():
+        if not stats.count:
+            continue
+        rollup[f"sum_{phase}_minutes"] = round(stats.total, 2)
+        rollup[f"n_{phase}"] = stats.count
+        for i, count in enumerate(stats.counts):
+            if count:
+                rollup[f"hist_{phase}_{i}"] = count
+
+    recent = sorted(orders, key=lambda x: x.get("created_at", ""), reverse=True)[:RECENT_ORDERS_LIMIT]
+    rollup["recent_orders"] = [get_order_timeline_metrics(o) for o in recent]
+
+    return to_dynamo(rollup)
+
+
+def tenant_orders(tenant_id):
+    """Órdenes del tenant en Orders y en el archivo."""
+    orders = []
+    query_kwargs = {"KeyConditionExpression": Key("tenant_id").eq(tenant_id)}
+    while True:
+        resp = orders_table().query(**query_kwargs)
+        orders.extend(resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            break
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    return orders + archived_tenant_orders(tenant_id)
+
+
+def fallback_rollup(tenant_id):
+    """Agregado calculado desde las órdenes, para servir mientras no hay registro."""
+    return build_rollup(tenant_id, tenant_orders(tenant_id))
+
+
+def request_seed(tenant_id):
+    """Pide (asíncrono) el seed de los registros que le faltan al tenant."""
+    if not DASHBOARD_SEED_FUNCTION:
+        print(f"DASHBOARD_SEED_FUNCTION no configurada: no se pide el seed de {tenant_id}")
+        return False
+    try:
+        client("lambda").invoke(
+            FunctionName=DASHBOARD_SEED_FUNCTION,
+            InvocationType="Event",
+            Payload=dumps({"tenant_ids": [tenant_id]}),
+        )
+    except Exception as e:
+        # El siguiente evento o lectura lo vuelve a pedir
+        print(f"No se pudo pedir el seed del dashboard de {tenant_id}: {e}")
+        return False
+    return True
+
+
+def order_transitions(order):
+    """[(estado, estado anterior, es_nueva)] por los que pasó la orden hasta su estado actual."""
+    status = order.get("status", "RECEIVED")
+    if status not in VALID_STATES:
+        return [(status, None, True)]
+    path = VALID_STATES[:VALID_STATES.index(status) + 1]
+    return [(s, path[i - 1] if i else None, i == 0) for i, s in enumerate(path)]
+
+
+def claim_rollup(key):
+    """
+    Crea el registro vacío en estado `seeding` con una generación nueva.
+    Devuelve la generación, o None si el registro ya existe (y no es un
+    seed abandonado).
+    """
+    table = dashboard_table()
+    generation = uuid.uuid4().hex
+    now = int(time.time())
+    try:
+        table.put_item(
+            Item={
+                "tenant_id": key,
+                "generation": generation,
+                "seeding": True,
+                "seeding_started": now,
+                "recent_orders": [],
+                "recent_version": 0,
+            },
+            ConditionExpression="attribute_not_exists(tenant_id) OR seeding_started < :stale",
+            ExpressionAttributeValues={":stale": now - SEED_TIMEOUT_SECONDS},
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return None
+    return generation
+
+
+def _unapplied_deltas(key, generation, order):
+    """Incrementos de las transiciones de la orden que ningún evento aplicó todavía."""
+    table = dashboard_applied_table()
+    deltas = {}
+    for status, previous_status, is_new in order_transitions(order):
+        put = applied_put(key, generation, order["order_id"], status)
+        try:
+            table.put_item(
+                Item=put["Item"],
+                ConditionExpression=put["ConditionExpression"],
+                ExpressionAttributeValues=put["ExpressionAttributeValues"],
+            )
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            continue  # Ya la aplicó un evento
+        for attr, delta in counter_deltas(order, status, previous_status, is_new).items():
+            deltas[attr] = deltas.get(attr, 0) + delta
+    return deltas
+
+
+def seed_counters(key, generation, orders):
+    """
+    Contadores y recientes del seed. Las órdenes que todavía pueden recibir
+    eventos suman solo las transiciones cuya marca se pudo crear (en
+    paralelo); las demás se cuentan enteras.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=APPLIED_TTL_SECONDS)).isoformat()
+    settled = [o for o in orders if (o.get("updated_at") or "") < cutoff]
+    live = [o for o in orders if (o.get("updated_at") or "") >= cutoff]
+
+    rollup = build_rollup(key, settled)
+    with ThreadPoolExecutor(max_workers=SEED_WORKERS) as pool:
+        for deltas in pool.map(lambda order: _unapplied_deltas(key, generation, order), live):
+            for attr, delta in to_dynamo(deltas).items():
+                rollup[attr] = rollup.get(attr, 0) + delta
+    recent = sorted(orders, key=lambda x: x.get("created_at", ""), reverse=True)[:RECENT_ORDERS_LIMIT]
+    rollup["recent_orders"] = to_dynamo([get_order_timeline_metrics(o) for o in recent])
+    return rollup
+
+
+def finish_seed(key, generation, rollup):
+    """Suma el seed al registro reclamado (donde pueden haber sumado eventos) y lo da por listo."""
+    table = dashboard_table()
+    conditional_failed = table.meta.client.exceptions.ConditionalCheckFailedException
+    counters = {
+        attr: value for attr, value in rollup.items()
+        if attr not in ("tenant_id", "recent_orders", "recent_version") and value
+    }
+    names = {f"#c{i}": attr for i, attr in enumerate(counters)}
+    values = {f":c{i}": value for i, value in enumerate(counters.values())}
+    add = ("ADD " + ", ".join(f"#c{i} :c{i}" for i in range(len(counters)))) if counters else ""
+
+    for _ in range(MAX_WRITE_ATTEMPTS):
+        current = table.get_item(Key={"tenant_id": key}, ConsistentRead=True).get("Item") or {}
+        if current.get("generation") != generation:
+            return None  # Otro proceso reclamó el registro (seed abandonado)
+        recent = current.get("recent_orders", [])
+        for entry in rollup["recent_orders"]:
+            recent = merge_recent(recent, entry) or recent
+        version = current.get("recent_version", 0)
+        update_kwargs = {
+            "Key": {"tenant_id": key},
+            "UpdateExpression": (
+                "SET recent_orders = :recent, recent_version = :next_version "
+                f"REMOVE seeding, seeding_started {add}"
+            ),
+            "ConditionExpression": "generation = :gen AND recent_version = :version",
+            "ExpressionAttributeValues": dict(values, **{
+                ":recent": recent,
+                ":next_version": version + 1,
+                ":version": version,
+                ":gen": generation,
+            }),
+        }
+        if names:
+            update_kwargs["ExpressionAttributeNames"] = names
+        try:
+            table.update_item(**update_kwargs)
+        except conditional_failed:
+            continue  # Un evento cambió recent_orders; releer y reintentar
+        return table.get_item(Key={"tenant_id": key}, ConsistentRead=True)["Item"]
+
+    raise RuntimeError(f"Could not finish dashboard rollup seed for {key}")
+
+
+def seed_rollups(tenant_id, keys=None):
+    """
+    Crea los registros `keys` del agregado (por defecto todos los del
+    tenant) leyendo las órdenes una sola vez. Devuelve {key: registro} de
+    los que se crearon; los que ya existían o reclamó otro proceso no
+    aparecen.
+    """
+    claimed = {}
+    for key in keys or rollup_keys(tenant_id):
+        generation = claim_rollup(key)
+        if generation is not None:
+            claimed[key] = generation
+    if not claimed:
+        return {}
+
+    by_key = {key: [] for key in claimed}
+    for order in tenant_orders(tenant_id):
+        key = rollup_key(tenant_id, order["order_id"])
+        if key in by_key:
+            by_key[key].append(order)
+
+    created = {}
+    for key, generation in claimed.items():
+        rollup = finish_seed(key, generation, seed_counters(key, generation, by_key[key]))
+        if rollup is not None:
+            created[key] = rollup
+    return created
+
+
+def seed_rollup(tenant_id, key=None):
+    """
+    Crea un registro del agregado (por defecto el del tenant sin shards).
+    Devuelve el registro creado, o None si ya existía.
+    """
+    key = key or tenant_id
+    return seed_rollups(tenant_id, [key]).get(key)
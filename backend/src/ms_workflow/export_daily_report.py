@@ -1,34 +1,322 @@
 import os
-import json
-from datetime import datetime, timezone
-import boto3
+import io
+import gzip
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
 from boto3.dynamodb.conditions import Key
 
-from common.db import orders_table
+from common.analytics import DeliveryTimeStats
+from common.aws import client
+from common.db import orders_table, tenant_ids, ORDERS_CREATED_INDEX
+from common import history
+from common.serialization import dumps, dumps_bytes
+from common.sharding import tenant_shards
+from common.metrics import instrumented_handler
 
-s3 = boto3.client("s3")
 REPORTS_BUCKET = os.environ["REPORTS_BUCKET"]
 
-def handler(event, context):
-    # Exporta todas las órdenes del día actual (simplificado)
-    now = datetime.now(timezone.utc)
-    date_prefix = now.strftime("%Y-%m-%d")
-
-    # En escenario real filtrarías por fecha; aquí exportamos todo.
-    table = orders_table()
-    # Para demo: scan (si crece mucho, habría que paginar)
-    scan = table.scan()
-    orders = scan.get("Items", [])
-
-    key = f"pardos-chicken/{date_prefix}/orders.json"
-    s3.put_object(
+# El día se divide en franjas que se consultan en paralelo sobre el índice
+# (repartidas entre los shards del tenant si tiene más de uno)
+EXPORT_SLICES = int(os.environ.get("EXPORT_SLICES", "8"))
+# S3 exige partes de al menos 5 MiB (salvo la última)
+PART_SIZE = 8 * 1024 * 1024
+# Páginas en vuelo entre los lectores y el escritor: acota la memoria
+MAX_PENDING_PAGES = 16
+# Cada cuánto un lector bloqueado en la cola revisa si el export se detuvo
+QUEUE_POLL_SECONDS = 0.5
+
+
+def report_key(tenant_id, date_str):
+    return f"daily/date={date_str}/tenant={tenant_id}/orders.ndjson.gz"
+
+
+def delivery_times_key(tenant_id, date_str):
+    return f"daily/date={date_str}/tenant={tenant_id}/delivery_times.json"
+
+
+class MultipartUpload:
+    """
+    Objeto de S3 que se escribe como un archivo (write de bytes) y se sube
+    por multipart upload a medida que se llena cada parte, sin tenerlo
+    completo en memoria.
+    """
+
+    def __init__(self, bucket, key, **object_args):
+        self.bucket = bucket
+        self.key = key
+        self.upload_id = client("s3").create_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            **object_args,
+        )["UploadId"]
+        self.parts = []
+        self.buffer = io.BytesIO()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer.write(data)
+        self.position += len(data)
+        if self.buffer.tell() >= PART_SIZE:
+            self._flush_part()
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass  # Las partes se suben al llenarse; la última en close()
+
+    def _flush_part(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        part_number = len(self.parts) + 1
+        resp = client("s3").upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        self.parts.append({"PartNumber": part_number, "ETag": resp["ETag"]})
+
+    def close(self):
+        if self.closed:
+            return
+        self._flush_part()
+        client("s3").complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts},
+        )
+        self.closed = True
+
+    def abort(self):
+        if self.closed:
+            return
+        self.closed = True
+        client("s3").abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+
+class MultipartGzipWriter:
+    """Comprime líneas NDJSON con gzip y las sube a S3 (MultipartUpload)."""
+
+    def __init__(self, bucket, key):
+        self.upload = MultipartUpload(
+            bucket,
+            key,
+            ContentType="application/x-ndjson",
+            ContentEncoding="gzip",
+        )
+        self.gzip = gzip.GzipFile(fileobj=self.upload, mode="wb")
+        self.lines = 0
+
+    def write(self, record):
+        self.gzip.write(dumps_bytes(record) + b"\n")
+        self.lines += 1
+
+    def close(self):
+        self.gzip.close()  # Escribe el trailer de gzip en la última parte
+        self.upload.close()
+
+    def abort(self):
+        self.upload.abort()
+
+
+class HistoryUpload:
+    """
+    Partición Parquet del día en el histórico (common.history), escrita por
+    páginas (un row group cada una) en un MultipartUpload.
+    """
+
+    def __init__(self, bucket, key):
+        self.key = key
+        self.upload = MultipartUpload(bucket, key, ContentType="application/vnd.apache.parquet")
+        try:
+            self.writer = history.HistoryWriter(self.upload)
+        except Exception:
+            self.upload.abort()
+            raise
+
+    def write(self, orders):
+        self.writer.write(orders)
+
+    def close(self):
+        self.writer.close()  # Escribe el footer del Parquet
+        self.upload.close()
+
+    def abort(self):
+        self.upload.abort()
+
+
+def day_slices(date_str, slices):
+    """Divide el día UTC en `slices` rangos [inicio, fin) de timestamps ISO."""
+    day_start = datetime.fromisoformat(date_str).replace(tzinfo=timezone.utc)
+    step = timedelta(days=1) / slices
+    bounds = [day_start + step * i for i in range(slices + 1)]
+    return [(bounds[i].isoformat(), bounds[i + 1].isoformat()) for i in range(slices)]
+
+
+def _put_page(pages, page, stop):
+    """
+    Encola una página. Si la cola está llena espera, pero deja de esperar
+    cuando se detiene el export (devuelve False): nadie la va a vaciar.
+    """
+    while not stop.is_set():
+        try:
+            pages.put(page, timeout=QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_slice(shard, start, end, pages, stop):
+    """
+    Lee un rango de created_at de un shard del índice, paginando, y encola
+    cada página. Termina antes si el export se detiene (`stop`).
+    """
+    query_kwargs = {
+        "IndexName": ORDERS_CREATED_INDEX,
+        # created_at < end: el último instante pertenece a la franja siguiente
+        "KeyConditionExpression": Key("order_shard").eq(shard)
+        & Key("created_at").between(start, end),
+    }
+    while not stop.is_set():
+        resp = orders_table().query(**query_kwargs)
+        items = [o for o in resp.get("Items", []) if o.get("created_at") != end]
+        if items and not _put_page(pages, items, stop):
+            return
+        if "LastEvaluatedKey" not in resp:
+            return
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def export_tenant_day(tenant_id, date_str):
+    """
+    Exporta las órdenes de un tenant creadas en date_str: el NDJSON, la
+    partición del histórico (si pyarrow está instalado) y las estadísticas
+    de tiempos, todo por páginas a medida que llegan. Devuelve
+    (key, filas, stats, history_key); history_key es None sin pyarrow.
+    """
+    key = report_key(tenant_id, date_str)
+    writer = MultipartGzipWriter(REPORTS_BUCKET, key)
+    uploads = [writer]
+    history_upload = None
+    pages = queue.Queue(maxsize=MAX_PENDING_PAGES)
+    stats = DeliveryTimeStats()
+    errors = []
+    done = object()
+    # Se activa si falla un lector o el escritor: los lectores dejan de leer
+    # y de esperar lugar en la cola
+    stop = threading.Event()
+
+    def reader(shard, start, end):
+        try:
+            _read_slice(shard, start, end, pages, stop)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put_page(pages, done, stop)
+
+    threads = []
+    try:
+        if history.available():
+            history_upload = HistoryUpload(REPORTS_BUCKET, history.history_key(tenant_id, date_str))
+            uploads.append(history_upload)
+        else:
+            print("pyarrow no disponible: se omite el histórico Parquet")
+
+        shards = tenant_shards(tenant_id)
+        slices = day_slices(date_str, max(1, EXPORT_SLICES // len(shards)))
+        threads = [
+            threading.Thread(target=reader, args=(shard, start, end), daemon=True)
+            for shard in shards
+            for start, end in slices
+        ]
+        for thread in threads:
+            thread.start()
+
+        finished = 0
+        while finished < len(threads) and not stop.is_set():
+            try:
+                page = pages.get(timeout=QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if page is done:
+                finished += 1
+                continue
+            for order in page:
+                writer.write(order)
+            stats.add(page)
+            if history_upload:
+                history_upload.write(page)
+        if errors:
+            raise errors[0]
+        for upload in uploads:
+            upload.close()
+    except Exception:
+        stop.set()
+        for upload in uploads:
+            upload.abort()
+        raise
+    finally:
+        for thread in threads:
+            thread.join()
+
+    return key, writer.lines, stats, history_upload and history_upload.key
+
+
+def export_delivery_times(tenant_id, date_str, stats):
+    """Percentiles, histogramas y desglose por hora del día (common.analytics) a S3."""
+    key = delivery_times_key(tenant_id, date_str)
+    report = stats.report()
+    report.update({"tenant_id": tenant_id, "date": date_str})
+    client("s3").put_object(
         Bucket=REPORTS_BUCKET,
         Key=key,
-        Body=json.dumps(orders).encode("utf-8"),
+        Body=dumps_bytes(report),
         ContentType="application/json",
     )
+    return key
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Exporta las órdenes creadas en un día (UTC) a S3, un objeto NDJSON
+    comprimido con gzip por tenant, más el reporte de tiempos de entrega:
+        daily/date=YYYY-MM-DD/tenant=<tenant_id>/orders.ndjson.gz
+        daily/date=YYYY-MM-DD/tenant=<tenant_id>/delivery_times.json
+    y la partición del histórico columnar (ver common.history):
+        history/date=YYYY-MM-DD/tenant=<tenant_id>/orders.parquet
+
+    Parámetros opcionales del evento:
+      - date:       día a exportar (por defecto hoy)
+      - tenant_ids: lista de tenants (por defecto todos los de la tabla Tenants)
+    """
+    event = event or {}
+    date_str = event.get("date") or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    selected = event.get("tenant_ids") or tenant_ids()
+
+    reports = []
+    for tenant_id in selected:
+        key, rows, stats, history_key = export_tenant_day(tenant_id, date_str)
+        times_key = export_delivery_times(tenant_id, date_str, stats)
+        print(f"Reporte {key}: {rows} órdenes")
+        reports.append({
+            "tenant_id": tenant_id,
+            "key": key,
+            "delivery_times_key": times_key,
+            "history_key": history_key,
+            "orders": rows,
+        })
 
     return {
         "statusCode": 200,
-        "body": json.dumps({"message": "report generated", "key": key}),
+        "body": dumps({"message": "report generated", "date": date_str, "reports": reports}),
     }
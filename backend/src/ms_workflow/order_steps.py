@@ -0,0 +1,297 @@
+"""
+Cambio de estado de una orden (un paso del workflow) sin leerla antes.
+
+La transición se valida en la misma escritura: una transacción con
+  - Update de la orden condicionado a "status = <estado anterior>"
+    (cada estado tiene un solo estado anterior, VALID_TRANSITIONS)
+  - Put del evento en OrderEvents, con order.updated en el outbox
+así que de dos pasos simultáneos sobre la misma orden solo uno se aplica,
+y la orden y su historial nunca quedan desalineados.
+
+El Update necesita created_at (status_created_at, segundos de la fase);
+en las órdenes con ULID sale del order_id (common.ids.order_time) y se
+verifica en la condición. Si la condición falla, ALL_OLD de la
+cancelación trae la orden: o el estado no era el esperado (error), o es
+una orden anterior a estos campos y se reintenta con sus datos reales.
+Las órdenes con UUID se leen primero, como antes.
+
+Al entregarse la orden se le pone archive_at (TTL de Orders, ver
+common.archive) para que pase al archivo al vencer la retención.
+
+Como una transacción no devuelve valores, los datos del cliente para los
+emails y el task token del workflow los resuelve publish_outbox al
+publicar el evento (ver common.workflow.resume_order_workflow).
+"""
+from datetime import datetime, timezone
+
+from boto3.dynamodb.types import TypeDeserializer
+
+from common.archive import ARCHIVE_TTL_FIELD, archive_time
+from common.db import (
+    ORDERS_TABLE, ORDER_EVENTS_TABLE, orders_table, order_status_key, transact_write,
+    transaction_canceled_error,
+)
+from common.events import outbox_record
+from common.ids import order_time
+from common.timeline import PHASE_DESCRIPTIONS, timeline_entry, phase_entry, legacy_phase_metrics, epoch_ms
+
+# Estados válidos y transiciones permitidas
+VALID_STATES = ["RECEIVED", "COOKING", "PACKING", "DELIVERING", "DELIVERED"]
+
+# Definir transiciones válidas (flujo del workflow)
+VALID_TRANSITIONS = {
+    "RECEIVED": ["COOKING"],
+    "COOKING": ["PACKING"],
+    "PACKING": ["DELIVERING"],
+    "DELIVERING": ["DELIVERED"],
+    "DELIVERED": []  # Estado final, no hay transiciones
+}
+
+# Estado desde el que se llega a cada estado (el que exige la condición)
+PREVIOUS_STATUS = {
+    target: source for source, targets in VALID_TRANSITIONS.items() for target in targets
+}
+
+# Roles esperados para cada transición
+EXPECTED_ROLES = {
+    "COOKING": "KITCHEN_STAFF",      # Cocinero
+    "PACKING": "PACKER",             # Despachador
+    "DELIVERING": "DELIVERY_DRIVER", # Repartidor
+    "DELIVERED": "DELIVERY_DRIVER"   # Repartidor confirma entrega
+}
+
+# Intentos ante TransactionConflict (otra transacción sobre la misma orden)
+MAX_STEP_ATTEMPTS = 3
+
+# Campos de la orden que publish_outbox agrega al order.updated (y su valor por defecto)
+NOTIFICATION_FIELDS = {"customer_email": "", "customer_name": "Cliente"}
+
+_deserializer = TypeDeserializer()
+
+
+class StepError(Exception):
+    """Paso rechazado: status_code y cuerpo de la respuesta."""
+
+    def __init__(self, status_code, body):
+        super().__init__(body.get("message"))
+        self.status_code = status_code
+        self.body = body
+
+
+def _invalid_transition(current_status, new_status):
+    if current_status == new_status:
+        # Típico de dos personas marcando el mismo paso a la vez
+        return StepError(409, {
+            "message": f"Order is already {new_status}",
+            "current_status": current_status,
+            "allowed_next_states": VALID_TRANSITIONS.get(current_status, []),
+        })
+    return StepError(400, {
+        "message": f"Invalid transition from {current_status} to {new_status}",
+        "current_status": current_status,
+        "allowed_next_states": VALID_TRANSITIONS.get(current_status, []),
+    })
+
+
+def _order_update(tenant_id, order_id, expected, new_status, attended_by, role, changed_at, current):
+    """
+    Update condicional de la orden. `current` es la orden leída (órdenes
+    antiguas o reintento) o None para el camino sin lectura.
+    """
+    now = changed_at.isoformat()
+
+    # Crear campos dinámicos para rastrear tiempos de cada fase
+    # Por ejemplo: cooking_started_at, packing_started_at, etc. (y su
+    # versión en milisegundos epoch, cooking_started_at_ms, para analítica)
+    phase_field = f"{new_status.lower()}_started_at"
+    phase_by_field = f"{new_status.lower()}_by"
+
+    names = {
+        "#s": "status",
+        "#phase": phase_field,
+        "#phase_ms": f"{phase_field}_ms",
+        "#phase_by": phase_by_field,
+    }
+    condition = "#s = :expected AND created_at = :created"
+
+    if current is None:
+        # Orden nueva: timeline y phase_metrics existen y se agregan en el lugar
+        created_at = order_time(order_id).isoformat()
+        condition += " AND attribute_exists(timeline) AND attribute_exists(phase_metrics)"
+        set_metrics = "phase_metrics.#metric = :metric"
+        names["#metric"] = new_status
+        metrics_value = phase_entry(created_at, now, attended_by)
+        has_timeline = True
+    else:
+        # Timeline y tiempos por fase precalculados para get_order_metrics.
+        # Las órdenes anteriores a este campo no tienen timeline: se siguen
+        # sirviendo desde OrderEvents y no se les agrega uno parcial.
+        created_at = current.get("created_at", now)
+        metrics_value = dict(current.get("phase_metrics") or legacy_phase_metrics(current))
+        if new_status in PHASE_DESCRIPTIONS:
+            metrics_value[new_status] = phase_entry(created_at, now, attended_by)
+        set_metrics = "phase_metrics = :metric"
+        has_timeline = "timeline" in current
+        if "created_at" not in current:
+            condition = "#s = :expected AND attribute_not_exists(created_at)"
+
+    update_expression = (
+        "SET #s = :s, updated_at = :u, status_created_at = :sc, #phase = :phase_time, "
+        f"#phase_ms = :phase_ms, #phase_by = :phase_by, {set_metrics}"
+    )
+    values = {
+        ":s": new_status,
+        ":u": now,
+        ":sc": order_status_key(new_status, created_at),
+        ":phase_time": now,
+        ":phase_ms": epoch_ms(changed_at),
+        ":phase_by": attended_by,
+        ":metric": metrics_value,
+        ":expected": expected,
+    }
+    if "created_at = :created" in condition:
+        values[":created"] = created_at
+    if has_timeline:
+        update_expression += ", timeline = list_append(timeline, :step)"
+        values[":step"] = [timeline_entry(new_status, now, attended_by, role)]
+    archive_at = archive_time(changed_at) if new_status == "DELIVERED" else None
+    if archive_at is not None:
+        update_expression += ", #archive_at = :archive_at"
+        names["#archive_at"] = ARCHIVE_TTL_FIELD
+        values[":archive_at"] = archive_at
+
+    return {
+        "Update": {
+            "TableName": ORDERS_TABLE,
+            "Key": {"tenant_id": tenant_id, "order_id": order_id},
+            "UpdateExpression": update_expression,
+            "ConditionExpression": condition,
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+    }
+
+
+def _event_put(tenant_id, order_id, expected, new_status, attended_by, role, now):
+    """Registro del paso en OrderEvents; order.updated sale por el outbox."""
+    outbox = outbox_record(
+        source="pardos.orders",
+        detail_type="order.updated",
+        detail={
+            "tenant_id": tenant_id,
+            "order_id": order_id,
+            "status": new_status,
+            "previous_status": expected,
+            "by_role": role,
+            "attended_by": attended_by,
+        },
+    )
+    # publish_outbox completa los datos del cliente y reanuda el workflow
+    outbox["order_fields"] = NOTIFICATION_FIELDS
+    outbox["resume_workflow"] = True
+    return {
+        "Put": {
+            "TableName": ORDER_EVENTS_TABLE,
+            "Item": {
+                "order_id": order_id,
+                "ts": now,
+                "status": new_status,
+                "by": attended_by,
+                "by_role": role,
+                "previous_status": expected,
+                "tenant_id": tenant_id,
+                "outbox": outbox,
+            },
+        }
+    }
+
+
+def _read_order(tenant_id, order_id):
+    return orders_table().get_item(
+        Key={"tenant_id": tenant_id, "order_id": order_id}, ConsistentRead=True
+    ).get("Item")
+
+
+def _old_order(error):
+    """Orden al momento de fallar la condición del Update (None si no existe)."""
+    reasons = error.response.get("CancellationReasons") or []
+    if not reasons or reasons[0].get("Code") != "ConditionalCheckFailed":
+        return None, False
+    item = reasons[0].get("Item")
+    if not item:
+        return None, True
+    return {k: _deserializer.deserialize(v) for k, v in item.items()}, True
+
+
+def _conflict(error):
+    reasons = error.response.get("CancellationReasons") or []
+    return any(r.get("Code") == "TransactionConflict" for r in reasons)
+
+
+def apply_step(tenant_id, order_id, new_status, attended_by="", role=""):
+    """
+    Aplica un paso del workflow. Devuelve el cuerpo de la respuesta;
+    lanza StepError si el paso no se puede aplicar.
+    """
+    if new_status not in VALID_STATES:
+        raise StepError(400, {"message": "Invalid status"})
+
+    expected = PREVIOUS_STATUS.get(new_status)
+    if expected is None:
+        raise StepError(400, {
+            "message": f"Invalid transition to {new_status}",
+            "allowed_next_states": [],
+        })
+
+    # Órdenes con UUID: no se puede derivar created_at, se leen primero
+    current = None
+    if order_time(order_id) is None:
+        current = _read_order(tenant_id, order_id)
+        if current is None:
+            raise StepError(404, {"message": "Order not found"})
+        if current.get("status", "RECEIVED") != expected:
+            raise _invalid_transition(current.get("status", "RECEIVED"), new_status)
+
+    changed_at = datetime.now(timezone.utc)
+    for _ in range(MAX_STEP_ATTEMPTS):
+        now = changed_at.isoformat()
+        try:
+            transact_write([
+                _order_update(tenant_id, order_id, expected, new_status, attended_by, role, changed_at, current),
+                _event_put(tenant_id, order_id, expected, new_status, attended_by, role, now),
+            ])
+            break
+        except transaction_canceled_error() as e:
+            if _conflict(e):
+                changed_at = datetime.now(timezone.utc)
+                continue
+            old, condition_failed = _old_order(e)
+            if not condition_failed:
+                raise
+            if old is None:
+                raise StepError(404, {"message": "Order not found"})
+            if old.get("status", "RECEIVED") != expected:
+                raise _invalid_transition(old.get("status", "RECEIVED"), new_status)
+            if current is not None:
+                raise  # Ya era el camino con la orden leída: no debería pasar
+            # Orden sin timeline / phase_metrics o created_at con otro formato
+            current = old
+    else:
+        raise RuntimeError(f"Could not update order {order_id}: too many conflicting transactions")
+
+    response_body = {
+        "order_id": order_id,
+        "status": new_status,
+        "previous_status": expected,
+        "attended_by": attended_by,
+        "role": role,
+        "timestamp": changed_at.isoformat(),
+    }
+
+    # Advertir si el rol no es el esperado (no bloquear, solo advertir)
+    expected_role = EXPECTED_ROLES.get(new_status)
+    if expected_role and role != expected_role:
+        response_body["warning"] = f"Expected role {expected_role} but got {role}"
+
+    return response_body
@@ -0,0 +1,28 @@
+from common.db import tenant_ids
+from common.metrics import instrumented_handler
+from ms_workflow.dashboard_seed import seed_rollups
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Crea los registros del dashboard que les faltan a los tenants (ver
+    ms_workflow.dashboard_seed). La invocan de forma asíncrona
+    get_dashboard_summary y update_dashboard_rollup, y migrateOrderShards
+    después de borrar registros; a mano, después del primer deploy:
+        sls invoke -f seedDashboardRollups
+
+    Parámetros opcionales del evento:
+      - tenant_ids: lista de tenants (por defecto todos los de la tabla Tenants)
+
+    Es idempotente: los registros que ya existen no se tocan.
+    """
+    event = event or {}
+    seeded = {}
+    for tenant_id in event.get("tenant_ids") or tenant_ids():
+        created = seed_rollups(tenant_id)
+        if created:
+            seeded[tenant_id] = sorted(created)
+            print(f"Dashboard de {tenant_id}: {len(created)} registros creados")
+
+    return {"statusCode": 200, "seeded": seeded}
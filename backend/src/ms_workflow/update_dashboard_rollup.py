@@ -0,0 +1,88 @@
+from boto3.dynamodb.types import TypeDeserializer
+
+from common.db import orders_table
+from common.metrics import instrumented_handler
+from ms_workflow.dashboard_rollup import apply_order_change
+from ms_workflow.dashboard_seed import request_seed
+
+_deserializer = TypeDeserializer()
+
+
+def _from_stream_image(image):
+    return {k: _deserializer.deserialize(v) for k, v in (image or {}).items()}
+
+
+def _apply(tenant_id, order, status, previous_status, is_new, unseeded):
+    """
+    Aplica la transición. Si el registro del tenant todavía no existe se
+    pide su seed (una vez por lote): el seed ya cuenta esta transición.
+    """
+    applied = apply_order_change(tenant_id, order, status=status, previous_status=previous_status, is_new=is_new)
+    if applied is None and tenant_id not in unseeded:
+        unseeded.add(tenant_id)
+        request_seed(tenant_id)
+    return bool(applied)
+
+
+def _apply_stream_records(records):
+    applied = 0
+    unseeded = set()
+    for record in records:
+        if record.get("eventName") not in ("INSERT", "MODIFY"):
+            continue
+        ddb = record.get("dynamodb", {})
+        new_order = _from_stream_image(ddb.get("NewImage"))
+        old_order = _from_stream_image(ddb.get("OldImage"))
+        status = new_order.get("status")
+        previous_status = old_order.get("status")
+
+        if record["eventName"] == "MODIFY" and status == previous_status:
+            continue  # Cambio que no afecta al dashboard
+
+        applied += _apply(
+            new_order["tenant_id"],
+            new_order,
+            status,
+            previous_status,
+            record["eventName"] == "INSERT",
+            unseeded,
+        )
+    return applied
+
+
+@instrumented_handler
+def handler(event, context):
+    """
+    Mantiene el agregado del dashboard al día.
+    Se dispara desde EventBridge (order.created / order.updated) o, si se
+    conecta, desde el stream de la tabla Orders.
+    """
+    if "Records" in event:
+        applied = _apply_stream_records(event["Records"])
+        return {"statusCode": 200, "applied": applied}
+
+    detail = event.get("detail", {})
+    detail_type = event.get("detail-type", "")
+    tenant_id = detail.get("tenant_id")
+    order_id = detail.get("order_id")
+
+    if not tenant_id or not order_id:
+        return {"statusCode": 400, "error": "tenant_id and order_id required"}
+
+    resp = orders_table().get_item(
+        Key={"tenant_id": tenant_id, "order_id": order_id}
+    )
+    if "Item" not in resp:
+        return {"statusCode": 404, "error": "Order not found"}
+
+    applied = _apply(
+        tenant_id,
+        resp["Item"],
+        detail.get("status"),
+        detail.get("previous_status"),
+        detail_type == "order.created",
+        set(),
+    )
+
+    # 0: evento repetido o agregado sin crear (el seed ya cuenta la transición)
+    return {"statusCode": 200, "applied": int(applied)}
@@ -0,0 +1,134 @@
+"""
+Fixtures comunes: AWS simulado con moto y las tablas de serverless.yml.
+
+Uso (desde backend/):
+    python -m pytest -q tests
+"""
+import json
+import os
+import sys
+
+import pytest
+import yaml
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, SRC_DIR)
+
+# Variables que el código lee al importar (como benchmarks/bench_cold_start.py)
+TEST_ENV = {
+    "TENANTS_TABLE": "test-Tenants",
+    "MENU_TABLE": "test-MenuItems",
+    "ORDERS_TABLE": "test-Orders",
+    "ORDER_EVENTS_TABLE": "test-OrderEvents",
+    "DASHBOARD_TABLE": "test-DashboardRollups",
+    "DASHBOARD_APPLIED_TABLE": "test-DashboardApplied",
+    "CONNECTIONS_TABLE": "test-WebSocketConnections",
+    "IDEMPOTENCY_TABLE": "test-IdempotencyKeys",
+    "ORDERS_ARCHIVE_TABLE": "test-OrdersArchive",
+    "EVENTS_BUS_NAME": "test-pardos-orders-bus",
+    "REPORTS_BUCKET": "test-pardos-orders-reports",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "DDB_METRICS": "0",
+}
+os.environ.update(TEST_ENV)
+
+from moto import mock_aws  # noqa: E402
+
+from common import aws, db  # noqa: E402
+
+
+class _CloudFormationLoader(yaml.SafeLoader):
+    """Ignora los tags de CloudFormation (!GetAtt, !Ref, ...)."""
+
+
+_CloudFormationLoader.add_multi_constructor("!", lambda loader, suffix, node: None)
+
+
+# Condiciones de serverless.yml con sus valores por defecto (estado final del stack)
+TEST_CONDITIONS = {
+    "OrdersShardCreatedIndex": True,
+}
+
+
+def _resolve_conditions(value):
+    """Aplica Fn::If con TEST_CONDITIONS y quita los AWS::NoValue."""
+    if isinstance(value, list):
+        resolved = [_resolve_conditions(v) for v in value]
+        return [v for v in resolved if v is not None]
+    if isinstance(value, dict):
+        if "Fn::If" in value:
+            condition, if_true, if_false = value["Fn::If"]
+            return _resolve_conditions(if_true if TEST_CONDITIONS[condition] else if_false)
+        if value == {"Ref": "AWS::NoValue"}:
+            return None
+        return {k: _resolve_conditions(v) for k, v in value.items()}
+    return value
+
+
+def _table_definitions():
+    """Propiedades de cada AWS::DynamoDB::Table de serverless.yml, con el nombre de la tabla de prueba."""
+    with open(os.path.join(SRC_DIR, "serverless.yml"), encoding="utf-8") as f:
+        config = yaml.load(f, Loader=_CloudFormationLoader)
+    env_by_table = {
+        "${self:provider.environment.%s}" % name: value for name, value in TEST_ENV.items()
+    }
+    for resource in config["resources"]["Resources"].values():
+        if resource.get("Type") != "AWS::DynamoDB::Table":
+            continue
+        props = _resolve_conditions(resource["Properties"])
+        props["TableName"] = env_by_table[props["TableName"]]
+        yield props
+
+
+def _create_tables():
+    client = aws.client("dynamodb")
+    for props in _table_definitions():
+        kwargs = {
+            key: props[key]
+            for key in ("TableName", "AttributeDefinitions", "KeySchema", "GlobalSecondaryIndexes", "BillingMode")
+            if key in props
+        }
+        if "StreamSpecification" in props:
+            kwargs["StreamSpecification"] = dict(props["StreamSpecification"], StreamEnabled=True)
+        client.create_table(**kwargs)
+
+
+@pytest.fixture
+def aws_env():
+    """AWS simulado, con las tablas DynamoDB y el bucket de reportes creados."""
+    with mock_aws():
+        aws._clients.clear()
+        aws._resources.clear()
+        db._tables.clear()
+        _create_tables()
+        aws.client("s3").create_bucket(Bucket=TEST_ENV["REPORTS_BUCKET"])
+        aws.client("events").create_event_bus(Name=TEST_ENV["EVENTS_BUS_NAME"])
+        yield
+        aws._clients.clear()
+        aws._resources.clear()
+        db._tables.clear()
+
+
+@pytest.fixture
+def create_order():
+    """
+    Crea una orden con el handler de POST /orders y devuelve el cuerpo de
+    la respuesta (order_id, status, ...). Requiere aws_env.
+    """
+    from ms_orders import create_order as create_order_handler
+
+    def create(tenant_id="pardos-chicken", product_id="p1", quantity=1, price="62.90"):
+        response = create_order_handler.handler({
+            "pathParameters": {"tenantId": tenant_id},
+            "body": json.dumps({
+                "items": [{"product_id": product_id, "name": "Pollo Entero", "quantity": quantity, "price": price}],
+                "customer_name": "Juan Pérez",
+                "customer_email": "juan@example.com",
+            }),
+        }, None)
+        assert response["statusCode"] == 201, response
+        return json.loads(response["body"])
+
+    return create
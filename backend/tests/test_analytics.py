@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from common import analytics
+from common.analytics import delivery_time_report, describe
+
+BASE_MS = int(datetime(2025, 1, 28, 10, 0, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _order(created, cooking=None, packing=None, delivering=None, delivered=None):
+    """Orden con instantes en minutos desde las 10:00 UTC (campos _ms)."""
+    moments = {
+        "created_at_ms": created,
+        "cooking_started_at_ms": cooking,
+        "packing_started_at_ms": packing,
+        "delivering_started_at_ms": delivering,
+        "delivered_started_at_ms": delivered,
+    }
+    return {field: BASE_MS + minutes * 60_000 for field, minutes in moments.items() if minutes is not None}
+
+
+ORDERS = [
+    _order(0, 2, 12, 15, 20),
+    _order(30, 31, 39, 40, 70),
+    _order(60, 65, 80),
+    # Orden anterior a los campos _ms: se lee del ISO
+    {"created_at": "2025-01-28T11:30:00+00:00", "delivered_started_at": "2025-01-28T12:35:00+00:00"},
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def numpy_mode(request, monkeypatch):
+    if request.param == "numpy" and analytics.np is None:
+        pytest.skip("requiere numpy")
+    if request.param == "python":
+        monkeypatch.setattr(analytics, "np", None)
+    return request.param
+
+
+def test_report_uses_running_counts_and_histograms(numpy_mode):
+    report = delivery_time_report(ORDERS)
+
+    assert report["orders"] == 4
+    total = report["phases"]["total"]
+    assert total["count"] == 3
+    assert total["mean_minutes"] == 41.67  # 20, 40 y 65 minutos
+    assert (total["p50"], total["p90"], total["p99"]) == (37.5, 81.0, 89.1)
+    assert [b["orders"] for b in total["histogram"]] == [0, 0, 0, 0, 1, 1, 0, 1, 0, 0]
+    assert report["phases"]["cooking"]["count"] == 3
+    assert report["phases"]["cooking"]["mean_minutes"] == 11.0
+
+    assert sorted(report["by_hour"]) == ["10", "11"]
+    assert report["by_hour"]["10"]["orders"] == 2
+    assert report["by_hour"]["10"]["phases"]["total"]["mean_minutes"] == 30.0
+    assert report["by_hour"]["11"]["phases"]["total"]["count"] == 1
+
+
+def test_chunks_give_the_same_report(numpy_mode):
+    # Cualquier iterable, de a una orden por tanda
+    assert delivery_time_report(iter(ORDERS), chunk_size=1) == delivery_time_report(ORDERS)
+
+
+def test_empty_report(numpy_mode):
+    report = delivery_time_report([])
+
+    assert report["orders"] == 0
+    assert report["by_hour"] == {}
+    assert report["phases"]["total"] == dict(
+        count=0, mean_minutes=None, p50=None, p90=None, p99=None,
+        histogram=analytics.histogram_buckets([0] * len(analytics.HISTOGRAM_EDGES)),
+    )
+
+
+def test_describe_gives_exact_percentiles(numpy_mode):
+    stats = describe([20.0, None, 40.0, 65.0])
+
+    assert stats == {"count": 3, "mean_minutes": 41.67, "p50": 40.0, "p90": 60.0, "p99": 64.5}
+
+
+def test_numpy_and_pure_python_agree(monkeypatch):
+    if analytics.np is None:
+        pytest.skip("requiere numpy")
+    with_numpy = delivery_time_report(ORDERS, chunk_size=3)
+    monkeypatch.setattr(analytics, "np", None)
+
+    assert delivery_time_report(ORDERS, chunk_size=3) == with_numpy
@@ -0,0 +1,104 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from boto3.dynamodb.types import TypeSerializer
+
+from common import archive
+from common.db import orders_archive_table, orders_table
+from common.event_log import read_events
+from ms_orders import archive_orders, get_order
+from ms_workflow.order_steps import apply_step
+
+TENANT = "pardos-chicken"
+
+_serializer = TypeSerializer()
+
+
+def _deliver(order_id):
+    for status in ("COOKING", "PACKING", "DELIVERING", "DELIVERED"):
+        apply_step(TENANT, order_id, status)
+
+
+def _order(order_id):
+    return orders_table().get_item(Key={"tenant_id": TENANT, "order_id": order_id}).get("Item")
+
+
+def _removed(order, principal=archive_orders.TTL_PRINCIPAL, sequence="1"):
+    """Registro REMOVE del stream de Orders con la imagen anterior de la orden."""
+    record = {
+        "eventName": "REMOVE",
+        "dynamodb": {
+            "SequenceNumber": sequence,
+            "OldImage": {k: _serializer.serialize(v) for k, v in order.items()},
+        },
+    }
+    if principal:
+        record["userIdentity"] = {"type": "Service", "principalId": principal}
+    return record
+
+
+def _expire(order_id):
+    """Como el TTL de DynamoDB: borra la orden de Orders y devuelve el registro del stream."""
+    order = _order(order_id)
+    orders_table().delete_item(Key={"tenant_id": TENANT, "order_id": order_id})
+    return _removed(order)
+
+
+def test_only_delivered_orders_get_the_retention_cutoff(aws_env, create_order):
+    delivered, cooking = create_order()["order_id"], create_order()["order_id"]
+    _deliver(delivered)
+    apply_step(TENANT, cooking, "COOKING")
+
+    archive_at = _order(delivered)[archive.ARCHIVE_TTL_FIELD]
+    expected = datetime.now(timezone.utc) + timedelta(days=archive.ORDER_RETENTION_DAYS)
+    assert abs(int(archive_at) - expected.timestamp()) < 60
+    assert archive.ARCHIVE_TTL_FIELD not in _order(cooking)
+
+
+def test_expired_order_moves_to_the_archive_with_its_events(aws_env, create_order):
+    order_id = create_order()["order_id"]
+    _deliver(order_id)
+    statuses = [e["status"] for e in read_events(order_id)]
+
+    result = archive_orders.handler({"Records": [_expire(order_id)]}, None)
+
+    assert result == {"batchItemFailures": []}
+    item = orders_archive_table().get_item(Key={"tenant_id": TENANT, "order_id": order_id})["Item"]
+    assert item["status"] == "DELIVERED"
+    assert archive.ARCHIVE_TTL_FIELD not in item
+    assert [e["status"] for e in archive.archived_events(item)] == statuses
+    assert read_events(order_id) == []
+
+    # Un reintento del mismo registro no pisa el archivo
+    assert archive_orders.handler({"Records": [_removed(item)]}, None) == {"batchItemFailures": []}
+    assert [e["status"] for e in archive.get_archived_order(TENANT, order_id, with_events=True)[1]] == statuses
+
+
+def test_only_ttl_removals_are_archived(aws_env, create_order):
+    order_id = create_order()["order_id"]
+    _deliver(order_id)
+    order = _order(order_id)
+
+    archive_orders.handler({"Records": [
+        _removed(order, principal=None),  # Borrado de la aplicación
+        dict(_removed(order), eventName="MODIFY"),
+    ]}, None)
+
+    assert "Item" not in orders_archive_table().get_item(Key={"tenant_id": TENANT, "order_id": order_id})
+    assert len(read_events(order_id)) == 5
+
+
+def test_get_order_falls_back_to_the_archive(aws_env, create_order):
+    order_id = create_order()["order_id"]
+    _deliver(order_id)
+    archive_orders.handler({"Records": [_expire(order_id)]}, None)
+
+    response = get_order.handler({"pathParameters": {"tenantId": TENANT, "orderId": order_id}}, None)
+
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["order_id"] == order_id
+    assert body["status"] == "DELIVERED"
+    assert archive.EVENTS_FIELD not in body
+    missing = get_order.handler({"pathParameters": {"tenantId": TENANT, "orderId": "missing"}}, None)
+    assert missing["statusCode"] == 404
@@ -0,0 +1,12 @@
+from common import aws
+
+
+def test_clients_are_cached_per_arguments(aws_env):
+    default = aws.client("stepfunctions")
+    local = aws.client("stepfunctions", endpoint_url="http://localhost:8083")
+
+    assert local is not default
+    assert local.meta.endpoint_url == "http://localhost:8083"
+    assert default.meta.endpoint_url != "http://localhost:8083"
+    assert aws.client("stepfunctions") is default
+    assert aws.client("stepfunctions", endpoint_url="http://localhost:8083") is local
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from common.db import orders_table
+from ms_workflow import bulk_update_order_step
+from ms_workflow.order_steps import apply_step
+
+TENANT = "pardos-chicken"
+
+
+def _bulk(body):
+    response = bulk_update_order_step.handler({
+        "pathParameters": {"tenantId": TENANT},
+        "body": body if isinstance(body, str) else json.dumps(body),
+    }, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+def _status(order_id):
+    return orders_table().get_item(Key={"tenant_id": TENANT, "order_id": order_id})["Item"]["status"]
+
+
+@pytest.mark.parametrize("order_ids", [
+    None,
+    [],
+    "01JABCDEFGHJKMNPQRSTVWXYZ0",  # Un string se recorrería letra por letra
+    {"id": "x"},
+    [["nested"]],
+    ["ok", 3],
+    ["ok", ""],
+])
+def test_invalid_order_ids_are_rejected_before_any_write(aws_env, create_order, order_ids):
+    order_id = create_order()["order_id"]
+
+    code, body = _bulk({"order_ids": order_ids, "status": "COOKING", "attended_by": "Chef Carlos"})
+
+    assert code == 400
+    assert body["message"] == "order_ids must be a non-empty list of ids"
+    assert _status(order_id) == "RECEIVED"
+
+
+def test_request_size_is_capped_before_removing_duplicates(aws_env, create_order):
+    order_id = create_order()["order_id"]
+    order_ids = [order_id] * (bulk_update_order_step.MAX_BULK_ORDERS + 1)
+
+    code, body = _bulk({"order_ids": order_ids, "status": "COOKING"})
+
+    assert code == 400
+    assert "At most" in body["message"]
+    assert _status(order_id) == "RECEIVED"
+
+
+@pytest.mark.parametrize("raw_body", ["{not json", "[1, 2]"])
+def test_malformed_body_is_a_bad_request(aws_env, raw_body):
+    code, _ = _bulk(raw_body)
+
+    assert code == 400
+
+
+def test_each_order_is_stepped_independently(aws_env, monkeypatch, create_order):
+    # Un worker: moto no serializa las transacciones de hilos distintos (DynamoDB sí)
+    monkeypatch.setattr(bulk_update_order_step, "BULK_WORKERS", 1)
+    first, second, cooking = (create_order()["order_id"] for _ in range(3))
+    apply_step(TENANT, cooking, "COOKING")
+
+    code, body = _bulk({
+        "order_ids": [first, second, first, cooking, "missing"],
+        "status": "COOKING",
+        "attended_by": "Chef Carlos",
+        "role": "KITCHEN_STAFF",
+    })
+
+    assert code == 200
+    assert (body["updated"], body["failed"]) == (2, 2)
+    # Sin repetidos, en el orden del request
+    assert [(r["order_id"], r["statusCode"]) for r in body["results"]] == [
+        (first, 200), (second, 200), (cooking, 409), ("missing", 404),
+    ]
+    assert _status(first) == _status(second) == "COOKING"
@@ -0,0 +1,26 @@
+from common.db import orders_table
+from ms_workflow import calculate_order_metrics
+from ms_workflow.order_steps import apply_step
+
+TENANT = "pardos-chicken"
+
+
+def test_final_metrics_are_saved_on_the_order(aws_env, create_order):
+    order_id = create_order()["order_id"]
+    for status in ("COOKING", "PACKING", "DELIVERING", "DELIVERED"):
+        apply_step(TENANT, order_id, status)
+
+    result = calculate_order_metrics.handler({"tenant_id": TENANT, "order_id": order_id}, None)
+
+    assert result["statusCode"] == 200
+    order = orders_table().get_item(Key={"tenant_id": TENANT, "order_id": order_id})["Item"]
+    assert order["final_metrics"]["total_events"] == 5
+    assert set(order["final_metrics"]["state_seconds"]) == {"RECEIVED", "COOKING", "PACKING", "DELIVERING"}
+    assert "total_seconds" in order["final_metrics"]
+
+
+def test_missing_order_is_not_created(aws_env):
+    result = calculate_order_metrics.handler({"tenant_id": TENANT, "order_id": "no-existe"}, None)
+
+    assert result["statusCode"] == 404
+    assert "Item" not in orders_table().get_item(Key={"tenant_id": TENANT, "order_id": "no-existe"})
@@ -0,0 +1,126 @@
+import json
+
+from common.db import dashboard_table, orders_table
+from ms_workflow import get_dashboard_summary, update_dashboard_rollup
+from ms_workflow.dashboard_rollup import load_rollup, summary_from_rollup
+from ms_workflow.dashboard_seed import claim_rollup, finish_seed, seed_counters, seed_rollup, tenant_orders
+from ms_workflow.order_steps import apply_step
+
+TENANT = "pardos-chicken"
+
+
+def _event(detail_type, order_id, status, previous_status=None):
+    detail = {"tenant_id": TENANT, "order_id": order_id, "status": status}
+    if previous_status:
+        detail["previous_status"] = previous_status
+    return {"detail-type": detail_type, "source": "pardos.orders", "detail": detail}
+
+
+def _summary():
+    return summary_from_rollup(load_rollup(TENANT))
+
+
+def test_redelivered_events_are_counted_once(aws_env, create_order):
+    seed_rollup(TENANT)  # Registro vacío: los eventos suman desde aquí
+    order_id = create_order()["order_id"]
+    created = _event("order.created", order_id, "RECEIVED")
+
+    assert update_dashboard_rollup.handler(created, None)["applied"] == 1
+    assert update_dashboard_rollup.handler(created, None)["applied"] == 0
+
+    apply_step(TENANT, order_id, "COOKING")
+    cooking = _event("order.updated", order_id, "COOKING", "RECEIVED")
+    assert update_dashboard_rollup.handler(cooking, None)["applied"] == 1
+    assert update_dashboard_rollup.handler(cooking, None)["applied"] == 0
+
+    summary = _summary()
+    assert summary["total_orders"] == 1
+    assert summary["by_status"] == {"COOKING": 1}
+
+
+def test_events_before_the_seed_are_counted_by_the_seed(aws_env, create_order):
+    first, second = create_order()["order_id"], create_order()["order_id"]
+    apply_step(TENANT, first, "COOKING")
+
+    # Sin registro los eventos no escriben nada (se pide el seed)
+    assert update_dashboard_rollup.handler(_event("order.created", second, "RECEIVED"), None)["applied"] == 0
+    assert load_rollup(TENANT) is None
+
+    seed_rollup(TENANT)
+
+    # Los eventos repetidos de lo que el seed ya contó no suman
+    assert update_dashboard_rollup.handler(_event("order.created", first, "RECEIVED"), None)["applied"] == 0
+    assert update_dashboard_rollup.handler(
+        _event("order.updated", first, "COOKING", "RECEIVED"), None
+    )["applied"] == 0
+
+    # Lo que pasa después del seed sí suma
+    apply_step(TENANT, first, "PACKING")
+    assert update_dashboard_rollup.handler(
+        _event("order.updated", first, "PACKING", "COOKING"), None
+    )["applied"] == 1
+
+    summary = _summary()
+    assert summary["total_orders"] == 2
+    assert summary["by_status"] == {"RECEIVED": 1, "PACKING": 1}
+
+
+def test_event_during_the_seed_is_counted_once(aws_env, create_order):
+    order_id = create_order()["order_id"]
+
+    # El seed reclama el registro; llega el evento antes de que termine
+    generation = claim_rollup(TENANT)
+    assert load_rollup(TENANT) is None  # A medio crear: no se sirve
+    assert update_dashboard_rollup.handler(_event("order.created", order_id, "RECEIVED"), None)["applied"] == 1
+
+    finish_seed(TENANT, generation, seed_counters(TENANT, generation, tenant_orders(TENANT)))
+
+    summary = _summary()
+    assert summary["total_orders"] == 1
+    assert summary["by_status"] == {"RECEIVED": 1}
+    assert [o["order_id"] for o in summary["recent_orders"]] == [order_id]
+
+
+def test_dashboard_without_rollup_is_computed_from_the_orders(aws_env, create_order):
+    create_order()
+    order_id = create_order()["order_id"]
+    apply_step(TENANT, order_id, "COOKING")
+
+    response = get_dashboard_summary.handler({"pathParameters": {"tenantId": TENANT}}, None)
+
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["total_orders"] == 2
+    assert body["by_status"] == {"RECEIVED": 1, "COOKING": 1}
+    # La lectura no crea el registro: lo hace el seed
+    assert "Item" not in dashboard_table().get_item(Key={"tenant_id": TENANT})
+
+
+def test_rebuilt_rollup_ignores_marks_of_the_previous_one(aws_env, create_order):
+    seed_rollup(TENANT)
+    order_id = create_order()["order_id"]
+    update_dashboard_rollup.handler(_event("order.created", order_id, "RECEIVED"), None)
+
+    # Como migrateOrderShards con rebuild_rollups: se borra y se vuelve a sembrar
+    dashboard_table().delete_item(Key={"tenant_id": TENANT})
+    seed_rollup(TENANT)
+    assert _summary()["total_orders"] == 1
+
+    apply_step(TENANT, order_id, "COOKING")
+    update_dashboard_rollup.handler(_event("order.updated", order_id, "COOKING", "RECEIVED"), None)
+    assert _summary()["by_status"] == {"COOKING": 1}
+
+
+def test_rollups_created_before_marks_keep_working(aws_env, create_order):
+    order_id = create_order()["order_id"]
+    dashboard_table().put_item(Item={
+        "tenant_id": TENANT, "total_orders": 1, "status_RECEIVED": 1,
+        "recent_orders": [], "recent_version": 0,
+    })
+
+    apply_step(TENANT, order_id, "COOKING")
+    cooking = _event("order.updated", order_id, "COOKING", "RECEIVED")
+    assert update_dashboard_rollup.handler(cooking, None)["applied"] == 1
+    assert update_dashboard_rollup.handler(cooking, None)["applied"] == 0
+    assert _summary()["by_status"] == {"COOKING": 1}
+    assert orders_table().get_item(Key={"tenant_id": TENANT, "order_id": order_id})["Item"]["status"] == "COOKING"
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from common import events
+
+
+class EventsStub:
+    """Cliente de EventBridge que rechaza las entradas cuyo detail está en `reject` (las veces indicadas)."""
+
+    def __init__(self, reject=None):
+        self.reject = dict(reject or {})
+        self.calls = []
+
+    def put_events(self, Entries):
+        self.calls.append([json.loads(e["Detail"])["n"] for e in Entries])
+        results = []
+        for entry in Entries:
+            n = json.loads(entry["Detail"])["n"]
+            if self.reject.get(n):
+                self.reject[n] -= 1
+                results.append({"ErrorCode": "ThrottlingException", "ErrorMessage": "Rate exceeded"})
+            else:
+                results.append({"EventId": f"event-{n}"})
+        return {"FailedEntryCount": sum(1 for r in results if "ErrorCode" in r), "Entries": results}
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(events.time, "sleep", sleeps.append)
+
+    def install(reject=None):
+        client = EventsStub(reject)
+        client.sleeps = sleeps
+        monkeypatch.setattr(events, "client", lambda service: client)
+        return client
+
+    return install
+
+
+def _entries(count, padding=0):
+    return [
+        events.build_entry("pardos.orders", "order.updated", {"n": n, "pad": "x" * padding})
+        for n in range(count)
+    ]
+
+
+def test_entries_are_sent_in_calls_of_ten(stub):
+    client = stub()
+
+    assert events.put_entries(_entries(25)) == []
+    assert [len(call) for call in client.calls] == [10, 10, 5]
+    assert sum(client.calls, []) == list(range(25))
+
+
+def test_calls_stay_under_256_kb(stub):
+    client = stub()
+    entries = _entries(5, padding=100 * 1024)
+
+    assert events.put_entries(entries) == []
+    assert [len(call) for call in client.calls] == [2, 2, 1]
+    for call in client.calls:
+        assert sum(events._entry_size(entries[n]) for n in call) <= events.MAX_REQUEST_BYTES
+
+
+def test_only_rejected_entries_are_retried(stub):
+    client = stub(reject={3: 1, 12: 2})
+
+    assert events.put_entries(_entries(15)) == []
+    assert client.calls == [list(range(10)), [10, 11, 12, 13, 14], [3, 12], [12]]
+    assert len(client.sleeps) == 2
+
+
+def test_gives_up_after_the_retry_limit(stub):
+    client = stub(reject={1: 100})
+
+    failed = events.put_entries(_entries(3), max_attempts=3)
+
+    assert failed == [1]
+    assert client.calls == [[0, 1, 2], [1], [1]]
+    assert len(client.sleeps) == 2  # Sin espera después del último intento
@@ -0,0 +1,119 @@
+import gzip
+import json
+import os
+import threading
+
+import pytest
+
+from common import history
+from common.aws import client
+from common.ids import order_time
+from ms_workflow import export_daily_report
+from ms_workflow.order_steps import apply_step
+
+TENANT = "pardos-chicken"
+BUCKET = os.environ["REPORTS_BUCKET"]
+
+
+def _deliver(order_id):
+    for status, by, role in [
+        ("COOKING", "Chef Carlos", "KITCHEN_STAFF"),
+        ("PACKING", "Ana", "PACKER"),
+        ("DELIVERING", "Luis", "DELIVERY_DRIVER"),
+        ("DELIVERED", "Luis", "DELIVERY_DRIVER"),
+    ]:
+        apply_step(TENANT, order_id, status, attended_by=by, role=role)
+
+
+@pytest.mark.skipif(not history.available(), reason="requiere pyarrow y numpy")
+def test_export_writes_every_report_and_history_is_queryable(aws_env, tmp_path, create_order):
+    delivered = create_order()
+    _deliver(delivered["order_id"])
+    create_order(product_id="p2", quantity=2)
+    date_str = order_time(delivered["order_id"]).strftime("%Y-%m-%d")
+
+    response = export_daily_report.handler({"date": date_str, "tenant_ids": [TENANT]}, None)
+
+    assert response["statusCode"] == 200
+    report = json.loads(response["body"])["reports"][0]
+    assert report["orders"] == 2
+    assert report["history_key"] == history.history_key(TENANT, date_str)
+
+    s3 = client("s3")
+    lines = gzip.decompress(s3.get_object(Bucket=BUCKET, Key=report["key"])["Body"].read()).splitlines()
+    assert len(lines) == 2
+    times = json.loads(s3.get_object(Bucket=BUCKET, Key=report["delivery_times_key"])["Body"].read())
+    assert times["phases"]["total"]["count"] == 1
+
+    # El histórico se consulta igual desde un directorio local con el mismo layout
+    parquet = s3.get_object(Bucket=BUCKET, Key=report["history_key"])["Body"].read()
+    local_file = tmp_path / report["history_key"]
+    local_file.parent.mkdir(parents=True)
+    local_file.write_bytes(parquet)
+
+    result = history.history_report(str(tmp_path / history.HISTORY_PREFIX), TENANT, date_str, date_str)
+
+    assert result["orders"] == 2
+    assert result["by_status"] == {"DELIVERED": 1, "RECEIVED": 1}
+    assert result["phases"]["total"]["count"] == 1
+    assert result["staff"]["cooking"]["Chef Carlos"]["orders"] == 1
+    assert result["products"]["p2"]["units"] == 2
+    assert result["products"]["p1"]["revenue"] == 62.9
+
+
+@pytest.mark.skipif(not history.available(), reason="requiere pyarrow y numpy")
+def test_history_gets_a_row_group_per_page(aws_env, monkeypatch, create_order):
+    # Una orden por página: el Parquet se escribe a medida que llegan
+    put_page = export_daily_report._put_page
+
+    def one_order_pages(pages, page, stop):
+        if not isinstance(page, list):
+            return put_page(pages, page, stop)
+        return all(put_page(pages, [order], stop) for order in page)
+
+    monkeypatch.setattr(export_daily_report, "_put_page", one_order_pages)
+    monkeypatch.setattr(export_daily_report, "EXPORT_SLICES", 1)
+    _deliver(create_order()["order_id"])
+    order = create_order()
+    date_str = order_time(order["order_id"]).strftime("%Y-%m-%d")
+
+    key, lines, stats, history_key = export_daily_report.export_tenant_day(TENANT, date_str)
+
+    parquet = client("s3").get_object(Bucket=BUCKET, Key=history_key)["Body"].read()
+    metadata = history.pq.read_metadata(history.pa.BufferReader(parquet))
+    assert lines == 2
+    assert metadata.num_rows == 2
+    assert metadata.num_row_groups == 2
+    assert stats.report()["phases"]["total"]["count"] == 1
+
+
+def test_export_skips_history_without_pyarrow(aws_env, monkeypatch, create_order):
+    monkeypatch.setattr(history, "pa", None)
+    order = create_order()
+    date_str = order_time(order["order_id"]).strftime("%Y-%m-%d")
+
+    response = export_daily_report.handler({"date": date_str, "tenant_ids": [TENANT]}, None)
+
+    report = json.loads(response["body"])["reports"][0]
+    assert report["orders"] == 1
+    assert report["history_key"] is None
+
+
+def test_failed_write_stops_the_readers(aws_env, monkeypatch, create_order):
+    # Cola de una página y varias franjas: sin la señal de parada, los
+    # lectores que no caben en la cola quedarían esperando para siempre
+    monkeypatch.setattr(export_daily_report, "MAX_PENDING_PAGES", 1)
+    monkeypatch.setattr(export_daily_report, "EXPORT_SLICES", 8)
+
+    def failing_write(self, record):
+        raise OSError("S3 no disponible")
+
+    monkeypatch.setattr(export_daily_report.MultipartGzipWriter, "write", failing_write)
+    order = create_order()
+    date_str = order_time(order["order_id"]).strftime("%Y-%m-%d")
+    threads_before = threading.active_count()
+
+    with pytest.raises(OSError):
+        export_daily_report.export_tenant_day(TENANT, date_str)
+
+    assert threading.active_count() == threads_before
@@ -0,0 +1,88 @@
+import json
+
+from boto3.dynamodb.conditions import Key
+
+from common import idempotency
+from common.db import idempotency_table, orders_table
+from ms_orders import create_order
+
+TENANT = "pardos-chicken"
+BODY = {
+    "items": [{"product_id": "p1", "name": "Pollo Entero", "quantity": 1, "price": "62.90"}],
+    "customer_name": "Juan Pérez",
+    "customer_email": "juan@example.com",
+}
+
+
+def _create(key, body=BODY):
+    return create_order.handler({
+        "pathParameters": {"tenantId": TENANT},
+        "headers": {"Idempotency-Key": key},
+        "body": json.dumps(body),
+    }, None)
+
+
+def _order_ids():
+    items = orders_table().query(KeyConditionExpression=Key("tenant_id").eq(TENANT))["Items"]
+    return [item["order_id"] for item in items]
+
+
+def test_retry_with_the_same_key_replays_the_response(aws_env):
+    first = _create("checkout-1")
+    retry = _create("checkout-1")
+
+    assert first["statusCode"] == retry["statusCode"] == 201
+    assert json.loads(retry["body"]) == json.loads(first["body"])
+    assert retry["headers"]["Idempotent-Replayed"] == "true"
+    assert _order_ids() == [json.loads(first["body"])["order_id"]]
+
+
+def test_same_key_with_another_body_is_rejected(aws_env):
+    _create("checkout-1")
+
+    response = _create("checkout-1", dict(BODY, customer_name="Ana"))
+
+    assert response["statusCode"] == 422
+    assert len(_order_ids()) == 1
+
+
+def test_concurrent_creates_with_one_key_make_one_order(aws_env, monkeypatch):
+    # Los dos requests leyeron antes de que alguno escribiera: el segundo
+    # pierde la condición de la transacción y responde con la del primero.
+    # (En serie: moto no serializa transacciones de hilos distintos.)
+    load = idempotency.load
+    reads = []
+
+    def load_before_any_write(key):
+        reads.append(key)
+        return None if len(reads) <= 2 else load(key)
+
+    monkeypatch.setattr(idempotency, "load", load_before_any_write)
+
+    winner = _create("checkout-1")
+    loser = _create("checkout-1")
+
+    assert winner["statusCode"] == loser["statusCode"] == 201
+    assert json.loads(loser["body"])["order_id"] == json.loads(winner["body"])["order_id"]
+    assert loser["headers"]["Idempotent-Replayed"] == "true"
+    assert len(_order_ids()) == 1
+
+
+def test_expired_record_is_not_replayed(aws_env):
+    first = _create("checkout-1")
+    # Vencido pero todavía sin borrar por el TTL de DynamoDB
+    key = f"{TENANT}#checkout-1"
+    idempotency_table().update_item(
+        Key={"idempotency_key": key},
+        UpdateExpression="SET expires_at = :past",
+        ExpressionAttributeValues={":past": 1},
+    )
+
+    again = _create("checkout-1")
+
+    assert again["statusCode"] == 201
+    assert "Idempotent-Replayed" not in (again.get("headers") or {})
+    assert json.loads(again["body"])["order_id"] != json.loads(first["body"])["order_id"]
+    assert len(_order_ids()) == 2
+    # El registro nuevo reemplaza al vencido
+    assert idempotency.load(key)["response"]["body"] == again["body"]
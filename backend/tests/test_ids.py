@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from common import ids
+from common.ids import is_time_ordered, new_order_id, order_time, short_order_ref
+
+MOMENT = datetime(2025, 1, 28, 10, 30, 15, 123000, tzinfo=timezone.utc)
+
+
+def _random_part(order_id):
+    value = 0
+    for c in order_id[10:]:
+        value = value * 32 + ids._DECODE[c]
+    return value
+
+
+def test_ids_in_the_same_millisecond_are_strictly_increasing():
+    generated = [new_order_id(MOMENT) for _ in range(1000)]
+
+    assert generated == sorted(generated)
+    assert len(set(generated)) == len(generated)
+    assert {order_id[:10] for order_id in generated} == {generated[0][:10]}
+    randoms = [_random_part(order_id) for order_id in generated]
+    assert all(b == a + 1 for a, b in zip(randoms, randoms[1:]))
+
+
+def test_ids_sort_by_creation_time():
+    earlier = new_order_id(MOMENT)
+    later = new_order_id(MOMENT + timedelta(milliseconds=1))
+    much_later = new_order_id(MOMENT + timedelta(days=400))
+
+    assert earlier < later < much_later
+
+
+def test_order_time_round_trip():
+    order_id = new_order_id(MOMENT)
+
+    assert is_time_ordered(order_id)
+    assert len(order_id) == ids.ID_LENGTH
+    assert order_time(order_id) == MOMENT
+
+    # Precisión de milisegundos: los microsegundos se truncan
+    assert order_time(new_order_id(MOMENT + timedelta(microseconds=999))) == MOMENT
+
+
+def test_legacy_uuid_ids_and_short_refs():
+    legacy = str(uuid.uuid4())
+
+    assert not is_time_ordered(legacy)
+    assert order_time(legacy) is None
+    assert short_order_ref(legacy) == legacy[:8]
+    order_id = new_order_id(MOMENT)
+    assert short_order_ref(order_id) == order_id[-8:]
@@ -0,0 +1,41 @@
+import json
+
+from ms_orders import list_orders
+from ms_orders.list_orders import NEXT_TOKEN_HEADER
+
+TENANT = "pardos-chicken"
+
+
+def _list(**params):
+    return list_orders.handler({
+        "pathParameters": {"tenantId": TENANT},
+        "queryStringParameters": params,
+    }, None)
+
+
+def _next_token(response):
+    return response["headers"].get(NEXT_TOKEN_HEADER)
+
+
+def test_body_is_still_an_array_and_the_cursor_a_header(aws_env, create_order):
+    created = {create_order()["order_id"] for _ in range(3)}
+
+    first = _list(status="RECEIVED", limit="2")
+    second = _list(status="RECEIVED", limit="2", next_token=_next_token(first))
+
+    first_items, second_items = json.loads(first["body"]), json.loads(second["body"])
+    assert isinstance(first_items, list) and len(first_items) == 2
+    assert {o["order_id"] for o in first_items + second_items} == created
+    assert _next_token(second) is None
+
+
+def test_token_replayed_with_another_filter_is_rejected(aws_env, create_order):
+    for _ in range(2):
+        create_order()
+    by_status = _next_token(_list(status="RECEIVED", limit="1"))
+    unfiltered = _next_token(_list(limit="1"))
+
+    assert _list(next_token=by_status)["statusCode"] == 400
+    assert _list(status="COOKING", next_token=by_status)["statusCode"] == 400
+    assert _list(status="RECEIVED", next_token=unfiltered)["statusCode"] == 400
+    assert _list(next_token=unfiltered)["statusCode"] == 200
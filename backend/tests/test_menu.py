@@ -0,0 +1,44 @@
+import json
+
+from common.db import tenants_table
+from ms_tenants_menu import get_menu, get_tenants, put_menu_item, put_menu_items_batch
+
+TENANT = "pardos-chicken"
+
+
+def _api(body=None, headers=None):
+    return {
+        "pathParameters": {"tenantId": TENANT},
+        "headers": headers or {},
+        "body": json.dumps(body) if body is not None else None,
+    }
+
+
+def test_menu_writes_do_not_create_tenant_rows(aws_env):
+    response = put_menu_item.handler(_api({"name": "Pollo Entero", "price": 62.9}), None)
+    assert response["statusCode"] == 201
+    put_menu_items_batch.handler(_api({"items": [{"name": "Chicha", "price": "8.50"}]}), None)
+
+    assert tenants_table().scan()["Items"] == []
+    tenants = json.loads(get_tenants.handler({}, None)["body"])
+    assert tenants == [{"tenant_id": TENANT, "name": "Pardos Chicken", "active": True}]
+
+
+def test_menu_version_changes_the_etag_and_is_not_a_product(aws_env):
+    first = get_menu.handler(_api(), None)
+    put_menu_item.handler(_api({"name": "Pollo Entero", "price": "62.90"}), None)
+
+    second = get_menu.handler(_api(headers={"If-None-Match": first["headers"]["ETag"]}), None)
+
+    assert second["statusCode"] == 200
+    assert second["headers"]["ETag"] != first["headers"]["ETag"]
+    assert [item["name"] for item in json.loads(second["body"])] == ["Pollo Entero"]
+    revalidated = get_menu.handler(_api(headers={"If-None-Match": second["headers"]["ETag"]}), None)
+    assert revalidated["statusCode"] == 304
+
+
+def test_reserved_product_id_is_rejected(aws_env):
+    response = put_menu_item.handler(
+        _api({"product_id": put_menu_item.MENU_META_ID, "name": "x", "price": 1}), None
+    )
+    assert response["statusCode"] == 400
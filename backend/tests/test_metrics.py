@@ -0,0 +1,25 @@
+from common.metrics import MAX_METRIC_VALUES, emf_record
+
+
+def _calls(latencies):
+    return [{"ms": ms, "items": 1, "rcu": 0.5, "wcu": 0} for ms in latencies]
+
+
+def test_latency_values_fit_in_one_emf_line():
+    calls = _calls(range(1, 1001))
+
+    record = emf_record("fn", "pardos-chicken", calls, 1500)
+
+    latencies = record["DynamoDBLatency"]
+    assert len(latencies) == MAX_METRIC_VALUES
+    assert latencies[0] == 1 and latencies[-1] == 1000
+    assert latencies == sorted(latencies)
+    assert record["DynamoDBCalls"] == 1000
+    assert record["DynamoDBItemsReturned"] == 1000
+
+
+def test_few_calls_keep_every_latency():
+    record = emf_record("fn", None, _calls([12, 3, 7]), 30)
+
+    assert sorted(record["DynamoDBLatency"]) == [3, 7, 12]
+    assert emf_record("fn", None, [], 1)["DynamoDBLatency"] == [0]
@@ -0,0 +1,150 @@
+import json
+import uuid
+from datetime import timedelta
+
+from boto3.dynamodb.types import TypeSerializer
+
+from common import workflow
+from common.db import orders_table, order_status_key
+from common.event_log import read_events
+from common.ids import new_order_id, order_time
+from ms_orders import publish_outbox
+from ms_workflow import await_order_status, update_order_step
+
+TENANT = "pardos-chicken"
+
+_serializer = TypeSerializer()
+
+
+def _step(order_id, status, by="Chef Carlos", role="KITCHEN_STAFF"):
+    response = update_order_step.handler({
+        "pathParameters": {"tenantId": TENANT, "orderId": order_id},
+        "body": json.dumps({"status": status, "attended_by": by, "role": role}),
+    }, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+def _order(order_id):
+    return orders_table().get_item(Key={"tenant_id": TENANT, "order_id": order_id})["Item"]
+
+
+def _stream_records(order_id, status):
+    """Registros INSERT del stream de OrderEvents para el evento `status` de la orden."""
+    return {"Records": [
+        {
+            "eventName": "INSERT",
+            "dynamodb": {
+                "SequenceNumber": str(i),
+                "NewImage": {k: _serializer.serialize(v) for k, v in event.items()},
+            },
+        }
+        for i, event in enumerate(read_events(order_id))
+        if event["status"] == status
+    ]}
+
+
+def _capture_resumes(monkeypatch):
+    resumed = []
+    monkeypatch.setattr(workflow, "resume_workflow", lambda token, output: resumed.append((token, output)) or True)
+    monkeypatch.setattr(await_order_status, "resume_workflow", lambda token, output: resumed.append((token, output)) or True)
+    return resumed
+
+
+def _save_token(order_id, known_status, token="token-1"):
+    return await_order_status.handler({
+        "tenant_id": TENANT, "order_id": order_id, "known_status": known_status, "task_token": token,
+    }, None)
+
+
+def test_second_tap_of_the_same_step_is_a_conflict(aws_env, create_order):
+    # Dos personas marcan el mismo paso: la segunda transacción falla la
+    # condición "status = RECEIVED" (moto no serializa hilos, DynamoDB sí)
+    order_id = create_order()["order_id"]
+
+    first = _step(order_id, "COOKING")
+    code, body = _step(order_id, "COOKING", by="Chef Ana")
+
+    assert first[0] == 200
+    assert code == 409
+    assert body["current_status"] == "COOKING"
+    assert [e["status"] for e in read_events(order_id)] == ["RECEIVED", "COOKING"]
+    assert [t["status"] for t in _order(order_id)["timeline"]] == ["RECEIVED", "COOKING"]
+
+
+def test_invalid_transition_is_rejected_without_writing(aws_env, create_order):
+    order_id = create_order()["order_id"]
+
+    code, body = _step(order_id, "DELIVERING", by="Luis", role="DELIVERY_DRIVER")
+
+    assert code == 400
+    assert body["current_status"] == "RECEIVED"
+    assert body["allowed_next_states"] == ["COOKING"]
+    assert _order(order_id)["status"] == "RECEIVED"
+    assert len(read_events(order_id)) == 1
+
+
+def test_legacy_uuid_order_is_read_first(aws_env):
+    order_id = str(uuid.uuid4())
+    created_at = "2025-01-28T10:00:00+00:00"
+    orders_table().put_item(Item={
+        "tenant_id": TENANT, "order_id": order_id, "status": "RECEIVED", "created_at": created_at,
+    })
+
+    code, body = _step(order_id, "COOKING")
+
+    assert code == 200
+    order = _order(order_id)
+    assert order["status"] == "COOKING"
+    assert order["status_created_at"] == order_status_key("COOKING", created_at)
+    assert "timeline" not in order  # Sin timeline parcial: se sigue sirviendo desde OrderEvents
+    assert "COOKING" in order["phase_metrics"]
+    assert _step(order_id, "COOKING")[0] == 409
+
+
+def test_ulid_order_with_its_own_created_at_retries_with_the_stored_one(aws_env):
+    # Orden anterior a que created_at saliera del ULID: difiere del instante del ID
+    order_id = new_order_id()
+    created_at = (order_time(order_id) - timedelta(seconds=3)).isoformat()
+    orders_table().put_item(Item={
+        "tenant_id": TENANT, "order_id": order_id, "status": "RECEIVED", "created_at": created_at,
+        "timeline": [], "phase_metrics": {},
+    })
+
+    code, _ = _step(order_id, "COOKING")
+
+    assert code == 200
+    order = _order(order_id)
+    assert order["status"] == "COOKING"
+    assert order["created_at"] == created_at
+    assert order["status_created_at"] == order_status_key("COOKING", created_at)
+    assert [t["status"] for t in order["timeline"]] == ["COOKING"]
+    assert _step(order_id, "PACKING", by="Ana", role="PACKER")[0] == 200
+
+
+def test_outbox_resumes_the_waiting_workflow(aws_env, monkeypatch, create_order):
+    resumed = _capture_resumes(monkeypatch)
+    order_id = create_order()["order_id"]
+    assert _save_token(order_id, "RECEIVED") == {"registered": True}
+
+    _step(order_id, "COOKING")
+    publish_outbox.handler(_stream_records(order_id, "COOKING"), None)
+
+    assert resumed == [("token-1", {"current_status": "COOKING", "updated_at": _order(order_id)["updated_at"]})]
+    assert "workflow_task_token" not in _order(order_id)
+
+
+def test_token_saved_after_the_change(aws_env, monkeypatch, create_order):
+    resumed = _capture_resumes(monkeypatch)
+    order_id = create_order()["order_id"]
+    _step(order_id, "COOKING")
+
+    # El workflow todavía cree que está en RECEIVED: se reanuda en el acto
+    assert _save_token(order_id, "RECEIVED")["registered"] is False
+    assert [output["current_status"] for _, output in resumed] == ["COOKING"]
+
+    # Ya espera el paso siguiente a COOKING: el order.updated de COOKING no lo reanuda
+    assert _save_token(order_id, "COOKING", token="token-2") == {"registered": True}
+    publish_outbox.handler(_stream_records(order_id, "COOKING"), None)
+
+    assert len(resumed) == 1
+    assert _order(order_id)["workflow_task_token"] == "token-2"
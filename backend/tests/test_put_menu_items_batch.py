@@ -0,0 +1,128 @@
+import json
+
+from boto3.dynamodb.conditions import Key
+
+from common.db import menu_table
+from ms_tenants_menu import put_menu_items_batch
+from ms_tenants_menu.put_menu_item import MENU_META_ID
+
+TENANT = "pardos-chicken"
+
+
+def _batch(items):
+    response = put_menu_items_batch.handler({
+        "pathParameters": {"tenantId": TENANT},
+        "body": json.dumps({"items": items}),
+    }, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+def _items(count):
+    return [{"name": f"Plato {i}", "price": "10.50", "category": "pollos"} for i in range(count)]
+
+
+def _products():
+    items = menu_table().query(KeyConditionExpression=Key("tenant_id").eq(TENANT))["Items"]
+    return {i["product_id"]: i for i in items if i["product_id"] != MENU_META_ID}
+
+
+def _menu_version():
+    item = menu_table().get_item(Key={"tenant_id": TENANT, "product_id": MENU_META_ID}).get("Item")
+    return item and item["menu_version"]
+
+
+def _flaky_writes(monkeypatch, unprocessed):
+    """
+    batch_write_item que deja en UnprocessedItems los productos de
+    `unprocessed` ({name: veces}) y escribe el resto. Devuelve los tamaños
+    de cada llamada.
+    """
+    table = menu_table()
+    client = table.meta.client
+    write = client.batch_write_item
+    calls = []
+
+    def batch_write_item(RequestItems):
+        requests = RequestItems[table.name]
+        calls.append(len(requests))
+        rejected, accepted = [], []
+        for request in requests:
+            name = request["PutRequest"]["Item"]["name"]
+            if unprocessed.get(name):
+                unprocessed[name] -= 1
+                rejected.append(request)
+            else:
+                accepted.append(request)
+        if accepted:
+            write(RequestItems={table.name: accepted})
+        return {"UnprocessedItems": {table.name: rejected} if rejected else {}}
+
+    monkeypatch.setattr(client, "batch_write_item", batch_write_item)
+    monkeypatch.setattr(put_menu_items_batch.time, "sleep", lambda seconds: None)
+    return calls
+
+
+def test_invalid_items_are_reported_and_nothing_is_written(aws_env):
+    code, body = _batch([
+        {"name": "Pollo Entero", "price": "62.90"},
+        {"price": "10"},
+        {"name": "Gratis", "price": "-1"},
+        {"name": "Raro", "price": "abc"},
+        {"name": "Reservado", "price": "1", "product_id": MENU_META_ID},
+        "no soy un objeto",
+        {"name": "Pollo Entero", "price": "70"},  # Mismo product_id que el primero
+    ])
+
+    assert code == 400
+    assert [(r["index"], r["error"]) for r in body["results"]] == [
+        (1, "name required"),
+        (2, "price must be a non-negative number"),
+        (3, "price must be a number"),
+        (4, "product_id is reserved"),
+        (5, "item must be an object"),
+        (6, "duplicate product_id (same as item 0)"),
+    ]
+    assert _products() == {}
+    assert _menu_version() is None
+
+
+def test_items_are_written_in_batches_and_reimports_overwrite(aws_env, monkeypatch):
+    calls = _flaky_writes(monkeypatch, {})
+
+    code, body = _batch(_items(30))
+
+    assert code == 200
+    assert (body["written"], body["failed"]) == (30, 0)
+    assert calls == [25, 5]
+    assert len(_products()) == 30
+    assert _menu_version() == 1
+
+    # product_id estable: reimportar el mismo menú no duplica
+    assert _batch(_items(30))[0] == 200
+    assert len(_products()) == 30
+
+
+def test_unprocessed_items_are_retried(aws_env, monkeypatch):
+    calls = _flaky_writes(monkeypatch, {"Plato 3": 1, "Plato 27": 2})
+
+    code, body = _batch(_items(30))
+
+    assert code == 200
+    assert body["failed"] == 0
+    # Cada grupo reenvía solo lo que quedó sin procesar
+    assert calls == [25, 1, 5, 1, 1]
+    assert len(_products()) == 30
+
+
+def test_items_still_unprocessed_after_retries_are_reported(aws_env, monkeypatch):
+    calls = _flaky_writes(monkeypatch, {"Plato 1": 100})
+
+    code, body = _batch(_items(3))
+
+    assert code == 207
+    assert (body["written"], body["failed"]) == (2, 1)
+    assert [r["status"] for r in body["results"]] == ["written", "failed", "written"]
+    assert body["results"][1]["error"] == "unprocessed after retries"
+    assert len(calls) == put_menu_items_batch.MAX_WRITE_ATTEMPTS
+    assert len(_products()) == 2
+    assert _menu_version() == 1
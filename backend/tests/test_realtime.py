@@ -0,0 +1,135 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from common.db import connections_table
+from ms_realtime import push_order_updates, registry, ws_connect, ws_disconnect
+
+TENANT = "pardos-chicken"
+OTHER_TENANT = "otro-restaurante"
+
+
+class ManagementApiStub(BaseHTTPRequestHandler):
+    """
+    API de administración de conexiones de API Gateway en local
+    (POST /@connections/{id}): 410 GoneException para las conexiones que
+    ya se cerraron, como cuando el navegador se fue sin $disconnect.
+    """
+
+    def do_POST(self):
+        connection_id = self.path.rsplit("/", 1)[-1]
+        data = self.rfile.read(int(self.headers["Content-Length"]))
+        if connection_id in self.server.gone:
+            body = json.dumps({"message": "Gone"}).encode()
+            self.send_response(410)
+            self.send_header("x-amzn-ErrorType", "GoneException")
+        else:
+            self.server.received.append((connection_id, json.loads(data)))
+            body = b""
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def websocket(aws_env, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ManagementApiStub)
+    server.received = []
+    server.gone = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(registry, "WEBSOCKET_API_ENDPOINT", f"http://127.0.0.1:{server.server_port}")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _connect(connection_id, tenant_id, order_id=None):
+    params = {"tenantId": tenant_id}
+    if order_id:
+        params["orderId"] = order_id
+    return ws_connect.handler({
+        "requestContext": {"connectionId": connection_id},
+        "queryStringParameters": params,
+    }, None)
+
+
+def _disconnect(connection_id):
+    return ws_disconnect.handler({"requestContext": {"connectionId": connection_id}}, None)
+
+
+def _subscriptions():
+    return sorted((i["channel"], i["connection_id"]) for i in connections_table().scan()["Items"])
+
+
+def _updated(tenant_id, order_id, status="COOKING"):
+    return {
+        "detail-type": "order.updated",
+        "detail": {
+            "tenant_id": tenant_id,
+            "order_id": order_id,
+            "status": status,
+            "previous_status": "RECEIVED",
+            "customer_name": "Juan Pérez",
+            "customer_email": "juan@example.com",
+        },
+    }
+
+
+def test_connect_and_disconnect_update_the_registry(aws_env):
+    assert _connect("c1", TENANT)["statusCode"] == 200
+    assert _connect("c2", TENANT, "order-1")["statusCode"] == 200
+    assert _connect("c3", None)["statusCode"] == 400
+
+    assert _subscriptions() == [("order#pardos-chicken#order-1", "c2"), ("tenant#pardos-chicken", "c1")]
+    item = connections_table().get_item(Key={"channel": "order#pardos-chicken#order-1", "connection_id": "c2"})["Item"]
+    assert item["order_id"] == "order-1"
+    assert item["expires_at"] > item["connected_at"]
+
+    assert _disconnect("c2")["statusCode"] == 200
+    assert _subscriptions() == [("tenant#pardos-chicken", "c1")]
+
+
+def test_disconnect_removes_every_subscription_of_the_connection(aws_env):
+    registry.register("c1", registry.tenant_channel(TENANT), TENANT)
+    registry.register("c1", registry.order_channel(TENANT, "order-1"), TENANT, "order-1")
+    _connect("c2", TENANT)
+
+    _disconnect("c1")
+
+    assert _subscriptions() == [("tenant#pardos-chicken", "c2")]
+
+
+def test_updates_reach_only_the_tenant_connections(websocket):
+    _connect("kitchen", TENANT)
+    _connect("customer", TENANT, "order-1")
+    _connect("other-customer", TENANT, "order-2")
+    _connect("other-kitchen", OTHER_TENANT)
+
+    result = push_order_updates.handler(_updated(TENANT, "order-1"), None)
+
+    assert result == {"sent": 2}
+    assert sorted(connection_id for connection_id, _ in websocket.received) == ["customer", "kitchen"]
+    delta = websocket.received[0][1]
+    assert delta["type"] == "order.updated"
+    assert delta["status"] == "COOKING"
+    assert "customer_email" not in delta
+
+
+def test_gone_connections_are_removed(websocket):
+    _connect("kitchen", TENANT)
+    _connect("closed-tab", TENANT)
+    websocket.gone.add("closed-tab")
+
+    assert push_order_updates.handler(_updated(TENANT, "order-1"), None) == {"sent": 1}
+    assert _subscriptions() == [("tenant#pardos-chicken", "kitchen")]
+
+    # El siguiente evento ya no la intenta
+    push_order_updates.handler(_updated(TENANT, "order-1", "PACKING"), None)
+    assert [connection_id for connection_id, _ in websocket.received] == ["kitchen", "kitchen"]
@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ms_notifications import send_email_batch, sendgrid_client
+
+# Respuesta del SendGrid local según el destinatario del request
+RESPONSES = {"limited@example.com": 429, "down@example.com": 503}
+
+
+class SendGridStub(BaseHTTPRequestHandler):
+    """SendGrid local con keep-alive: anota la conexión y los destinatarios de cada request."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        emails = [p["to"][0]["email"] for p in payload["personalizations"]]
+        self.server.requests.append((self.client_address, emails))
+
+        status = RESPONSES.get(emails[0], 202)
+        body = b"" if status == 202 else json.dumps({"errors": [{"message": "try later"}]}).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Message-Id", f"msg-{len(self.server.requests)}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sendgrid(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SendGridStub)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    url = f"http://127.0.0.1:{server.server_port}/v3/mail/send"
+    monkeypatch.setattr(send_email_batch, "SENDGRID_API_KEY", "test-key")
+    monkeypatch.setattr(sendgrid_client, "SENDGRID_API_KEY", "test-key")
+    # Un solo worker y una conexión en el pool: los grupos del lote van en serie
+    monkeypatch.setattr(send_email_batch, "SENDGRID_POOL_SIZE", 1)
+    monkeypatch.setattr(sendgrid_client, "_pool", sendgrid_client.ConnectionPool(url, size=1))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _record(message_id, status, email):
+    detail = {
+        "tenant_id": "pardos-chicken",
+        "order_id": f"order-{message_id}",
+        "status": status,
+        "customer_email": email,
+        "customer_name": "Juan Pérez",
+    }
+    return {"messageId": message_id, "body": json.dumps({"detail-type": "order.updated", "detail": detail})}
+
+
+def test_batch_reuses_one_keep_alive_connection(sendgrid):
+    records = [
+        _record("m1", "COOKING", "ana@example.com"),
+        _record("m2", "COOKING", "luis@example.com"),
+        _record("m3", "PACKING", "ana@example.com"),
+        _record("m4", "DELIVERING", "carla@example.com"),
+    ]
+
+    result = send_email_batch.handler({"Records": records}, None)
+
+    assert result == {"batchItemFailures": []}
+    # Un request por grupo (estado), todos por la misma conexión
+    assert [emails for _, emails in sendgrid.requests] == [
+        ["ana@example.com", "luis@example.com"], ["ana@example.com"], ["carla@example.com"],
+    ]
+    assert len({address for address, _ in sendgrid.requests}) == 1
+
+
+def test_rate_limited_and_server_errors_are_retried_by_sqs(sendgrid):
+    records = [
+        _record("m1", "COOKING", "ok@example.com"),
+        _record("m2", "PACKING", "limited@example.com"),
+        _record("m3", "DELIVERING", "down@example.com"),
+        _record("m4", "DELIVERED", "ok@example.com"),
+    ]
+
+    result = send_email_batch.handler({"Records": records}, None)
+
+    # Solo los mensajes de los requests con 429/5xx vuelven a la cola
+    assert result == {"batchItemFailures": [{"itemIdentifier": "m2"}, {"itemIdentifier": "m3"}]}
+    # Los enviados no se reintentan: un request por grupo; y los errores no cierran la conexión
+    assert len(sendgrid.requests) == 4
+    assert len({address for address, _ in sendgrid.requests}) == 1
@@ -2,6 +2,10 @@
 let menu = [];
 let cart = [];
 let currentOrderId = null;
+let trackingSocket = null;
+// Idempotency-Key del checkout en curso: se reutiliza en los reintentos del
+// mismo pedido para que el backend no cree órdenes duplicadas
+let pendingCheckout = null;
 
 // Cargar menú al iniciar
 document.addEventListener('DOMContentLoaded', () => {
@@ -209,20 +213,23 @@ async function createOrder() {
         customer_address: customerAddress
     };
 
+    const payload = JSON.stringify(orderData);
+    if (!pendingCheckout || pendingCheckout.payload !== payload) {
+        pendingCheckout = { key: newIdempotencyKey(), payload };
+    }
+
     try {
-        const response = await fetch(
+        const response = await postWithRetry(
             `${API_CONFIG.baseURL}/tenants/${API_CONFIG.tenantId}/orders`,
-            {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(orderData)
-            }
+            payload,
+            pendingCheckout.key
         );
 
         if (!response.ok) throw new Error('Error al crear el pedido');
 
         const result = await response.json();
         currentOrderId = result.order_id;
+        pendingCheckout = null;
 
         showNotification(
             `¡Pedido creado exitosamente! 🎉\nTu ID de pedido es: ${result.order_id}\n\nGuarda este ID para rastrear tu pedido.`,
@@ -249,6 +256,32 @@ async function createOrder() {
     }
 }
 
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+// POST con Idempotency-Key: reintenta ante errores de red o 5xx sin riesgo
+// de duplicar el pedido (el backend devuelve la respuesta del primero)
+async function postWithRetry(url, body, idempotencyKey, attempts = 3) {
+    for (let attempt = 1; ; attempt++) {
+        try {
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': idempotencyKey
+                },
+                body
+            });
+            if (response.status < 500 || attempt >= attempts) return response;
+        } catch (error) {
+            if (attempt >= attempts) throw error;
+        }
+        await new Promise(resolve => setTimeout(resolve, 500 * 2 ** (attempt - 1)));
+    }
+}
+
 // Rastrear pedido
 async function trackOrder() {
     const orderId = document.getElementById('order_id_input').value.trim();
@@ -279,6 +312,7 @@ async function trackOrder() {
         }
 
         displayOrderStatus(order, metrics);
+        subscribeToOrder(orderId, order.status);
 
     } catch (error) {
         console.error('Error tracking order:', error);
@@ -286,6 +320,35 @@ async function trackOrder() {
     }
 }
 
+// Recibir los cambios de estado del pedido por WebSocket en lugar de
+// volver a consultarlo: solo se recarga cuando algo cambió.
+function subscribeToOrder(orderId, status) {
+    if (!API_CONFIG.wsURL) return;
+    if (trackingSocket && trackingSocket.orderId === orderId) return;
+
+    if (trackingSocket) trackingSocket.close();
+    trackingSocket = null;
+    if (status === 'DELIVERED') return;
+
+    const socket = new WebSocket(
+        `${API_CONFIG.wsURL}?tenantId=${encodeURIComponent(API_CONFIG.tenantId)}&orderId=${encodeURIComponent(orderId)}`
+    );
+    socket.orderId = orderId;
+
+    socket.onmessage = (message) => {
+        const delta = JSON.parse(message.data);
+        if (delta.order_id !== orderId) return;
+        if (delta.status === 'DELIVERED') socket.close();
+        trackOrder();
+    };
+
+    socket.onclose = () => {
+        if (trackingSocket === socket) trackingSocket = null;
+    };
+
+    trackingSocket = socket;
+}
+
 // Mostrar estado del pedido
 function displayOrderStatus(order, metrics) {
     const statusContainer = document.getElementById('order-status');
@@ -297,7 +360,7 @@ function displayOrderStatus(order, metrics) {
 
     // Información básica
     infoContainer.innerHTML = `
-        <h3>Pedido #${order.order_id.substring(0, 8)}</h3>
+        <h3>Pedido #${shortOrderId(order.order_id)}</h3>
         <p><strong>Cliente:</strong> ${order.customer_name}</p>
         <p><strong>Dirección:</strong> ${order.customer_address}</p>
         <p><strong>Estado Actual:</strong> <span class="status-badge status-${order.status}">${getStatusText(order.status)}</span></p>
@@ -350,6 +413,12 @@ function displayOrderStatus(order, metrics) {
     }
 }
 
+// Número corto del pedido: en los IDs nuevos (ULID, ordenados por tiempo)
+// los primeros caracteres son la fecha, así que se muestran los últimos.
+function shortOrderId(orderId) {
+    return /^[0-9A-HJKMNP-TV-Z]{26}$/.test(orderId) ? orderId.slice(-8) : orderId.substring(0, 8);
+}
+
 // Convertir estado a texto legible
 function getStatusText(status) {
     const statusTexts = {
@@ -1,10 +1,13 @@
 const API_CONFIG = {
     baseURL: 'https://c9sut9oprg.execute-api.us-east-1.amazonaws.com',
+    // API WebSocket (sls info -> websocket). Vacío: se usa solo polling
+    wsURL: '',
     tenantId: 'pardos-chicken'
 };
 
 // Para desarrollo local, puedes usar:
 // const API_CONFIG = {
 //     baseURL: 'http://localhost:3000',
+//     wsURL: 'ws://localhost:3001',
 //     tenantId: 'pardos-chicken'
 // };
@@ -3,15 +3,73 @@ let dashboardData = null;
 let allOrders = [];
 let currentFilter = 'all';
 let selectedOrder = null;
+let realtimeSocket = null;
+let realtimeRetryDelay = 1000;
+let pendingRefresh = null;
+// Pedidos marcados para moverlos juntos (POST /orders:step)
+let bulkSelection = new Set();
+
+// Siguiente paso de cada estado (botón rápido y acción en lote)
+const NEXT_STATES = {
+    'RECEIVED': { status: 'COOKING', label: '👨‍🍳 Iniciar Cocina', role: 'KITCHEN_STAFF' },
+    'COOKING': { status: 'PACKING', label: '📦 Empacar', role: 'PACKER' },
+    'PACKING': { status: 'DELIVERING', label: '🚗 Enviar', role: 'DELIVERY_DRIVER' },
+    'DELIVERING': { status: 'DELIVERED', label: '✅ Entregar', role: 'DELIVERY_DRIVER' }
+};
 
 // Cargar dashboard al iniciar
 document.addEventListener('DOMContentLoaded', () => {
     refreshDashboard();
     setupUpdateForm();
-    // Auto-refresh cada 30 segundos
-    setInterval(refreshDashboard, 30000);
+    connectRealtime();
+    // Auto-refresh cada 30 segundos solo si no hay WebSocket conectado
+    setInterval(() => {
+        if (!realtimeSocket || realtimeSocket.readyState !== WebSocket.OPEN) {
+            refreshDashboard();
+        }
+    }, 30000);
 });
 
+// Cambios de estado en tiempo real (canal del tenant)
+function connectRealtime() {
+    if (!API_CONFIG.wsURL) return;
+
+    realtimeSocket = new WebSocket(
+        `${API_CONFIG.wsURL}?tenantId=${encodeURIComponent(API_CONFIG.tenantId)}`
+    );
+
+    realtimeSocket.onopen = () => {
+        realtimeRetryDelay = 1000;
+        refreshDashboard(); // Lo que cambió mientras estaba desconectado
+    };
+
+    realtimeSocket.onmessage = (message) => {
+        try {
+            applyOrderDelta(JSON.parse(message.data));
+        } catch (error) {
+            console.error('Invalid realtime message:', error);
+        }
+    };
+
+    realtimeSocket.onclose = () => {
+        // Reconectar con backoff (API Gateway corta a las 2 horas)
+        setTimeout(connectRealtime, realtimeRetryDelay);
+        realtimeRetryDelay = Math.min(realtimeRetryDelay * 2, 30000);
+    };
+}
+
+// Aplicar el cambio a la lista local y refrescar los contadores una vez por ráfaga
+function applyOrderDelta(delta) {
+    const order = allOrders.find(o => o.order_id === delta.order_id);
+    if (order && delta.status) {
+        order.status = delta.status;
+        displayOrders();
+    }
+
+    clearTimeout(pendingRefresh);
+    pendingRefresh = setTimeout(refreshDashboard, 2000);
+}
+
 // Refrescar dashboard
 async function refreshDashboard() {
     try {
@@ -90,6 +148,11 @@ function displayOrders() {
     // Filtrar solo órdenes no completadas
     filteredOrders = filteredOrders.filter(order => order.status !== 'DELIVERED');
 
+    // La selección solo conserva pedidos que siguen visibles
+    const visibleIds = new Set(filteredOrders.map(order => order.order_id));
+    bulkSelection = new Set([...bulkSelection].filter(id => visibleIds.has(id)));
+    renderBulkBar();
+
     if (filteredOrders.length === 0) {
         container.innerHTML = '<p class="loading">No hay pedidos activos</p>';
         return;
@@ -103,6 +166,87 @@ function displayOrders() {
     });
 }
 
+function toggleBulkSelection(orderId, selected) {
+    if (selected) bulkSelection.add(orderId);
+    else bulkSelection.delete(orderId);
+    renderBulkBar();
+}
+
+function clearBulkSelection() {
+    bulkSelection.clear();
+    displayOrders();
+}
+
+// Barra con la acción en lote: solo si todos los seleccionados están en el mismo estado
+function renderBulkBar() {
+    const bar = document.getElementById('bulk-bar');
+    if (!bar) return;
+
+    if (bulkSelection.size === 0) {
+        bar.style.display = 'none';
+        return;
+    }
+
+    const statuses = new Set(
+        allOrders.filter(order => bulkSelection.has(order.order_id)).map(order => order.status)
+    );
+    const next = statuses.size === 1 ? NEXT_STATES[[...statuses][0]] : null;
+    const count = bulkSelection.size;
+
+    bar.style.display = 'flex';
+    bar.innerHTML = `
+        <span>${count} pedido${count !== 1 ? 's' : ''} seleccionado${count !== 1 ? 's' : ''}</span>
+        ${next
+            ? `<button class="btn btn-quick-action" onclick="bulkUpdateStatus('${next.status}', '${next.role}')">${next.label} (${count})</button>`
+            : '<span class="bulk-hint">Selecciona pedidos del mismo estado</span>'}
+        <button class="btn btn-details" onclick="clearBulkSelection()">Limpiar</button>
+    `;
+}
+
+// Mover todos los seleccionados en un solo request
+async function bulkUpdateStatus(newStatus, role) {
+    const userName = localStorage.getItem('restaurantUser') || 'admin';
+    const orderIds = [...bulkSelection];
+
+    try {
+        const response = await fetch(
+            `${API_CONFIG.baseURL}/tenants/${API_CONFIG.tenantId}/orders:step`,
+            {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    order_ids: orderIds,
+                    status: newStatus,
+                    attended_by: userName,
+                    role: role
+                })
+            }
+        );
+
+        const result = await response.json();
+        if (!response.ok) {
+            throw new Error(result.message || 'Error al actualizar los pedidos');
+        }
+
+        if (result.failed === 0) {
+            showNotification(`✅ ${result.updated} pedidos actualizados a ${getStatusText(newStatus)}`, 'success');
+        } else {
+            const failed = result.results
+                .filter(r => r.statusCode !== 200)
+                .map(r => `#${shortOrderId(r.order_id)}: ${r.message}`)
+                .join('\n');
+            showNotification(`⚠️ ${result.updated} actualizados, ${result.failed} con error:\n${failed}`, 'error');
+        }
+
+        bulkSelection.clear();
+        refreshDashboard();
+
+    } catch (error) {
+        console.error('Error updating orders:', error);
+        showNotification(`❌ Error: ${error.message}`, 'error');
+    }
+}
+
 // Crear tarjeta de orden mejorada
 function createOrderCard(order) {
     const card = document.createElement('div');
@@ -142,15 +286,16 @@ function createOrderCard(order) {
 
     // Botón de acción rápida según el estado
     let quickActionBtn = '';
-    const nextStates = {
-        'RECEIVED': { status: 'COOKING', label: '👨‍🍳 Iniciar Cocina', role: 'KITCHEN_STAFF' },
-        'COOKING': { status: 'PACKING', label: '📦 Empacar', role: 'PACKER' },
-        'PACKING': { status: 'DELIVERING', label: '🚗 Enviar', role: 'DELIVERY_DRIVER' },
-        'DELIVERING': { status: 'DELIVERED', label: '✅ Entregar', role: 'DELIVERY_DRIVER' }
-    };
-
-    if (nextStates[order.status]) {
-        const next = nextStates[order.status];
+    let bulkCheckbox = '';
+
+    if (NEXT_STATES[order.status]) {
+        const next = NEXT_STATES[order.status];
+        bulkCheckbox = `
+            <input type="checkbox" class="bulk-select" title="Seleccionar para mover en lote"
+                ${bulkSelection.has(order.order_id) ? 'checked' : ''}
+                onclick="event.stopPropagation()"
+                onchange="toggleBulkSelection('${order.order_id}', this.checked)">
+        `;
         quickActionBtn = `
             <button class="btn btn-quick-action" onclick="quickUpdateStatus('${order.order_id}', '${next.status}', '${next.role}')">
                 ${next.label}
@@ -162,7 +307,8 @@ function createOrderCard(order) {
         <div class="order-card-inner ${urgencyClass}">
             <div class="order-header" onclick="toggleOrderDetails('${order.order_id}')">
                 <div class="order-title">
-                    <span class="order-id">📋 #${order.order_id.substring(0, 8)}</span>
+                    ${bulkCheckbox}
+                    <span class="order-id">📋 #${shortOrderId(order.order_id)}</span>
                     <span class="order-time ${urgencyClass}">⏱️ ${minutesElapsed} min</span>
                 </div>
                 <span class="status-badge status-${order.status}">${getStatusText(order.status)}</span>
@@ -278,7 +424,7 @@ function displayRecentOrders() {
 
         item.innerHTML = `
             <div class="timeline-content">
-                <h4>Pedido #${order.order_id.substring(0, 8)}</h4>
+                <h4>Pedido #${shortOrderId(order.order_id)}</h4>
                 <p><span class="status-badge status-${order.status}">${getStatusText(order.status)}</span></p>
                 <p><strong>Creado:</strong> ${new Date(order.created_at).toLocaleString('es-PE')}</p>
                 ${order.total_time_minutes ? `<p><strong>Tiempo Total:</strong> ${order.total_time_minutes} minutos</p>` : ''}
@@ -310,7 +456,7 @@ function openUpdateModal(order) {
     const modalInfo = document.getElementById('modal-order-info');
 
     modalInfo.innerHTML = `
-        <p><strong>Pedido:</strong> #${order.order_id.substring(0, 8)}</p>
+        <p><strong>Pedido:</strong> #${shortOrderId(order.order_id)}</p>
         <p><strong>Cliente:</strong> ${order.customer_name}</p>
         <p><strong>Estado Actual:</strong> <span class="status-badge status-${order.status}">${getStatusText(order.status)}</span></p>
     `;
@@ -419,7 +565,7 @@ async function viewOrderDetails(orderId) {
 
         // Crear modal personalizado para timeline
         let timelineHTML = '<div class="timeline-modal">';
-        timelineHTML += `<h3>📊 Timeline del Pedido #${orderId.substring(0, 8)}</h3>`;
+        timelineHTML += `<h3>📊 Timeline del Pedido #${shortOrderId(orderId)}</h3>`;
         timelineHTML += `<div class="timeline-info">`;
         timelineHTML += `<p><strong>Cliente:</strong> ${metrics.customer_name}</p>`;
         timelineHTML += `<p><strong>Estado:</strong> <span class="status-badge status-${metrics.current_status}">${getStatusText(metrics.current_status)}</span></p>`;
@@ -472,6 +618,12 @@ async function viewOrderDetails(orderId) {
     }
 }
 
+// Número corto del pedido: en los IDs nuevos (ULID, ordenados por tiempo)
+// los primeros caracteres son la fecha, así que se muestran los últimos.
+function shortOrderId(orderId) {
+    return /^[0-9A-HJKMNP-TV-Z]{26}$/.test(orderId) ? orderId.slice(-8) : orderId.substring(0, 8);
+}
+
 // Convertir estado a texto legible
 function getStatusText(status) {
     const statusTexts = {